@@ -5,34 +5,89 @@ from django.contrib import admin
 # Register your models here.
 
 
-from .models import Customer, Product, Order, Vendor
+from .models import Customer, Product, Order, Vendor, DailySales, ImportJob
+from .exports import StreamingExportMixin
+from .imports import BackgroundImportMixin
+from .pagination import LargeTableAdminMixin
+from .rollups import summarize
+from .search import FullTextSearchMixin
 
 
 #(ImportExportModelAdmin)
 
 @admin.register(Customer)
-class CustomerAdmin(ImportExportModelAdmin):
+class CustomerAdmin(FullTextSearchMixin, LargeTableAdminMixin, BackgroundImportMixin,
+                    StreamingExportMixin, ImportExportModelAdmin):
     list_display = ("name", "email", "age", "city")
     search_fields = ("name", "email", "city")
     list_filter = ("city",)
 
 
 @admin.register(Product)
-class ProductAdmin(ImportExportModelAdmin):
+class ProductAdmin(FullTextSearchMixin, BackgroundImportMixin, StreamingExportMixin,
+                   ImportExportModelAdmin):
     list_display = ("name", "category", "price")
     search_fields = ("name", "category")
     list_filter = ("category",)
 
 
 @admin.register(Order)
-class OrderAdmin(ImportExportModelAdmin):
-    list_display = ("customer", "product", "quantity", "order_date")
+class OrderAdmin(LargeTableAdminMixin, StreamingExportMixin, ImportExportModelAdmin):
+    list_display = ("customer", "product", "quantity", "order_date", "line_total")
+    readonly_fields = ("unit_price", "line_total")
+    keyset_ordering = ("-order_date", "-id")
+    # customer/product (and Order.__str__) come from one joined query
+    list_select_related = ("customer", "product")
     list_filter = ("order_date", "product__category")
     search_fields = ("customer__name", "product__name")
 
 ''''''
 @admin.register(Vendor)
-class VendorAdmin(ImportExportModelAdmin):
+class VendorAdmin(BackgroundImportMixin, StreamingExportMixin, ImportExportModelAdmin):
     list_display = ("name", "email", "city")
     list_filter = ("name", "city")
     search_fields = ("city",)
+
+
+@admin.register(DailySales)
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = ("date", "category", "city", "order_count", "quantity", "revenue")
+    list_filter = ("category", "city")
+    date_hierarchy = "date"
+    ordering = ("-date", "category", "city")
+    show_full_result_count = False
+    change_list_template = "admin/AnJuShop/daily_sales_change_list.html"
+
+    # Rows are maintained by AnJuShop.rollups, never by hand
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        cl = getattr(response, 'context_data', {}).get('cl')
+        if cl is not None:
+            # Totals of the filtered rows (date hierarchy, category, city)
+            response.context_data['summaries'] = [
+                ("Category", "category", summarize(cl.queryset, 'category')),
+                ("City", "city", summarize(cl.queryset, 'city')),
+            ]
+        return response
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "model_name", "status", "processed_rows", "loaded_rows",
+                    "rejected_rows", "issue_rows", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "model_name")
+    list_select_related = ("created_by",)
+    readonly_fields = [field.name for field in ImportJob._meta.fields]
+
+    def has_add_permission(self, request):
+        # Jobs are queued from the Customer/Product/Vendor "Background import" pages
+        return False
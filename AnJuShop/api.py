@@ -0,0 +1,241 @@
+"""
+Building blocks of the read-only JSON API (views in AnJuShop/views.py).
+
+RESOURCES
+    The exposed models with the fields a client may ask for (?fields=) and
+    the query parameters they can be filtered on, and the permission a
+    user needs to read them (none for public resources). Rows are read
+    with .values() projections, never as model instances.
+Pages
+    Ordered by id and continued with ?after=<last id> (the "next" URL), so
+    deep pages cost the same as the first one. Pages up to PAGE_LIMIT rows
+    are built in memory; larger ones (up to MAX_LIMIT) are streamed in
+    STREAM_BATCH row batches.
+dumps() / loads()
+    orjson when it is installed, the standard library otherwise.
+"""
+import json
+from datetime import date
+from decimal import Decimal
+from itertools import islice
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BigIntegerField
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .models import Customer, Order, Product, Vendor
+
+try:
+    import orjson
+except ImportError:  # optional: serialization is ~10x slower without it
+    orjson = None
+
+
+DEFAULT_LIMIT = 50
+PAGE_LIMIT = 500
+MAX_LIMIT = 100_000
+STREAM_BATCH = 2000
+# Ids are BigAutoFields: larger numbers overflow the database parameter
+MAX_ID = BigIntegerField.MAX_BIGINT
+
+CONTENT_TYPE = 'application/json'
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ────────────────────────────────────────────────
+# JSON encoding
+# ────────────────────────────────────────────────
+
+def _default(obj):
+    # Same representation as DjangoJSONEncoder: exact decimals as strings
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """obj as compact JSON bytes; dates as ISO 8601, decimals as strings."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def loads(data):
+    """Parse JSON bytes/str; raises ValueError when it is not valid JSON."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# ────────────────────────────────────────────────
+# Resources
+# ────────────────────────────────────────────────
+
+def _text(value):
+    return value
+
+
+def _int(value, low=0, high=MAX_ID):
+    try:
+        number = int(value)
+    except ValueError:
+        raise BadRequest(f"{value!r} is not an integer")
+    if not low <= number <= high:
+        raise BadRequest(f"{value!r} is not between {low} and {high}")
+    return number
+
+
+def _date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"{value!r} is not a date (YYYY-MM-DD)")
+
+
+# fields: what ?fields= may select; without ?fields= the first `default` of them (all
+# when there is no `default`) are returned
+# filters: query parameter -> (lookup, parser)
+# permission: needed to read the resource (personal data); no permission = public
+RESOURCES = {
+    'products': {
+        'model': Product,
+        'fields': ('id', 'name', 'category', 'price'),
+        'filters': {'category': ('category', _text)},
+    },
+    'customers': {
+        'model': Customer,
+        'fields': ('id', 'name', 'email', 'age', 'city'),
+        'filters': {'city': ('city', _text), 'email': ('email', _text)},
+        'permission': 'AnJuShop.view_customer',
+    },
+    'vendors': {
+        'model': Vendor,
+        'fields': ('id', 'name', 'email', 'city'),
+        'filters': {'city': ('city', _text), 'email': ('email', _text)},
+        'permission': 'AnJuShop.view_vendor',
+    },
+    'orders': {
+        'model': Order,
+        'fields': ('id', 'customer_id', 'product_id', 'quantity', 'order_date', 'unit_price',
+                   'line_total', 'customer__name', 'customer__city', 'product__name',
+                   'product__category'),
+        'default': 7,
+        'filters': {
+            'customer': ('customer_id', _int),
+            'product': ('product_id', _int),
+            'since': ('order_date__gte', _date),
+            'until': ('order_date__lte', _date),
+        },
+    },
+}
+
+
+def selected_fields(request, resource):
+    """?fields=name,price -> ('id', 'name', 'price'); id is always included (cursor)."""
+    allowed = resource['fields']
+    if not request.GET.get('fields'):
+        return allowed[:resource.get('default', len(allowed))]
+    fields = ['id']
+    for field in request.GET['fields'].split(','):
+        field = field.strip()
+        if field not in allowed:
+            raise BadRequest(f"unknown field {field!r}, choose from {', '.join(allowed)}")
+        if field not in fields:
+            fields.append(field)
+    return tuple(fields)
+
+
+def filtered(request, resource):
+    filters = {}
+    for param, (lookup, parse) in resource['filters'].items():
+        if request.GET.get(param):
+            filters[lookup] = parse(request.GET[param])
+    return resource['model'].objects.filter(**filters)
+
+
+def page_params(request):
+    """(limit, after) from ?limit= and ?after=."""
+    limit = _int(request.GET.get('limit') or DEFAULT_LIMIT, 1, MAX_LIMIT)
+    after = request.GET.get('after')
+    return limit, _int(after) if after else None
+
+
+# ────────────────────────────────────────────────
+# Responses
+# ────────────────────────────────────────────────
+
+class PageWriter:
+    """Writes {"count"?, "results": [...], "next": url} one batch of rows at a time."""
+
+    def __init__(self, request, limit, count=None):
+        self.request = request
+        self.limit = limit
+        self.count = count
+        self.rows = 0
+        self.last_id = None
+
+    def start(self):
+        head = b'{' if self.count is None else b'{"count":%d,' % self.count
+        return head + b'"results":['
+
+    def batch(self, rows):
+        data = dumps(rows)[1:-1]
+        if self.rows:
+            data = b',' + data
+        self.rows += len(rows)
+        self.last_id = rows[-1]['id']
+        return data
+
+    def end(self):
+        next_url = None
+        if self.rows == self.limit:
+            query = self.request.GET.copy()
+            query['after'] = self.last_id
+            next_url = f"{self.request.path}?{query.urlencode()}"
+        return b'],"next":' + dumps(next_url) + b'}'
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), content_type=CONTENT_TYPE, status=status)
+
+
+def page_response(writer, rows):
+    body = writer.start() + (writer.batch(rows) if rows else b'') + writer.end()
+    return HttpResponse(body, content_type=CONTENT_TYPE)
+
+
+def _sync_stream(writer, queryset):
+    yield writer.start()
+    rows = queryset.iterator(chunk_size=STREAM_BATCH)
+    while batch := list(islice(rows, STREAM_BATCH)):
+        yield writer.batch(batch)
+    yield writer.end()
+
+
+async def _async_stream(writer, queryset):
+    yield writer.start()
+    batch = []
+    async for row in queryset.aiterator(chunk_size=STREAM_BATCH):
+        batch.append(row)
+        if len(batch) == STREAM_BATCH:
+            yield writer.batch(batch)
+            batch = []
+    if batch:
+        yield writer.batch(batch)
+    yield writer.end()
+
+
+def stream_response(request, writer, queryset):
+    """
+    Streamed page. The iterator must match the server: Django buffers an
+    async iterator under WSGI and a sync one under ASGI.
+    """
+    if isinstance(request, ASGIRequest):
+        content = _async_stream(writer, queryset)
+    else:
+        content = _sync_stream(writer, queryset)
+    return StreamingHttpResponse(content, content_type=CONTENT_TYPE)
@@ -5,3 +5,6 @@ from django.apps import AppConfig
 class AnjushopConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'AnJuShop'
+
+    def ready(self):
+        from . import rollups  # noqa: F401  (registers the DailySales signal handlers)
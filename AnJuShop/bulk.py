@@ -0,0 +1,165 @@
+"""
+Bulk order creation for the POST /api/orders/bulk/ endpoint.
+
+    [{"customer_id": 12, "product_name": "Yoga Mat", "quantity": 2, "order_date": "2025-01-31"},
+     {"customer_email": "alice@example.com", "product_id": 7, "quantity": 1}, ...]
+
+Each order names its customer by customer_id or customer_email and its
+product by product_id or product_name (the lowest id wins when names
+repeat, as in AnJuShop.loaders); order_date defaults to today. All
+references are resolved with at most four queries, the valid orders are
+inserted with bulk_create in one transaction and every item gets a result:
+{"index": i, "id": pk} or {"index": i, "errors": {field: message}}.
+"""
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from .api import MAX_ID
+from .models import Customer, Order, Product
+from .signals import orders_bulk_created
+
+
+BULK_LIMIT = 10_000
+BATCH_SIZE = 1000
+
+FIELDS = {'customer_id', 'customer_email', 'product_id', 'product_name', 'quantity', 'order_date'}
+
+
+class BulkError(ValueError):
+    """The request as a whole cannot be used (not a list, too many orders)."""
+
+
+# ────────────────────────────────────────────────
+# Validation
+# ────────────────────────────────────────────────
+
+def _reference(item, id_field, key_field, label, errors):
+    """('id', 12), ('key', 'alice@example.com') or None when missing/invalid."""
+    if (item.get(id_field) is None) == (item.get(key_field) is None):
+        errors[label] = f"give exactly one of {id_field} or {key_field}"
+        return None
+    if item.get(id_field) is not None:
+        value = item[id_field]
+        if isinstance(value, bool) or not isinstance(value, int):
+            errors[id_field] = "must be an integer"
+            return None
+        if not 1 <= value <= MAX_ID:
+            errors[id_field] = f"must be between 1 and {MAX_ID}"
+            return None
+        return ('id', value)
+    value = item[key_field]
+    if not isinstance(value, str) or not value.strip():
+        errors[key_field] = "must be a non-empty string"
+        return None
+    return ('key', value.strip())
+
+
+def _quantity(item, errors):
+    value = item.get('quantity')
+    # JSON numbers only: the model field would accept "3" or truncate 2.5
+    if isinstance(value, bool) or not isinstance(value, int):
+        errors['quantity'] = "must be an integer"
+        return None
+    try:
+        return Order._meta.get_field('quantity').clean(value, None)
+    except ValidationError as error:
+        errors['quantity'] = ' '.join(error.messages)
+        return None
+
+
+def _order_date(item, errors):
+    value = item.get('order_date')
+    if value is None:
+        return timezone.localdate()
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        errors['order_date'] = "must be a date (YYYY-MM-DD)"
+        return None
+
+
+def validate(item):
+    """(customer ref, product ref, quantity, order_date), errors"""
+    if not isinstance(item, dict):
+        return None, {'item': "must be a JSON object"}
+    errors = {}
+    unknown = sorted(set(item) - FIELDS)
+    if unknown:
+        errors['item'] = f"unknown fields: {', '.join(unknown)}"
+    values = (_reference(item, 'customer_id', 'customer_email', 'customer', errors),
+              _reference(item, 'product_id', 'product_name', 'product', errors),
+              _quantity(item, errors),
+              _order_date(item, errors))
+    return (None, errors) if errors else (values, None)
+
+
+# ────────────────────────────────────────────────
+# Reference resolution
+# ────────────────────────────────────────────────
+
+def _resolve(model, refs, key_field):
+    """{('id', 12): 12, ('key', 'alice@example.com'): 3, ...} for the refs that exist."""
+    ids = {value for kind, value in refs if kind == 'id'}
+    keys = {value for kind, value in refs if kind == 'key'}
+    found = {}
+    if ids:
+        found.update((('id', pk), pk) for pk in model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+    if keys:
+        rows = model.objects.filter(**{f'{key_field}__in': keys}).order_by('-id').values_list(key_field, 'id')
+        found.update((('key', key), pk) for key, pk in rows)
+    return found
+
+
+# ────────────────────────────────────────────────
+# Creation
+# ────────────────────────────────────────────────
+
+def create_orders(items, atomic=False):
+    """
+    Validate, resolve and insert `items`; returns the per-item results.
+    With atomic=True nothing is inserted unless every item is valid.
+    """
+    if not isinstance(items, list):
+        raise BulkError("expected a JSON array of orders")
+    if len(items) > BULK_LIMIT:
+        raise BulkError(f"at most {BULK_LIMIT} orders per request")
+
+    validated = [validate(item) for item in items]
+    valid = [values for values, _ in validated if values]
+    customers = _resolve(Customer, {values[0] for values in valid}, 'email')
+    products = _resolve(Product, {values[1] for values in valid}, 'name')
+
+    results, orders = [], []
+    for index, (values, errors) in enumerate(validated):
+        if values:
+            customer, product, quantity, order_date = values
+            errors = {}
+            if customer not in customers:
+                errors['customer'] = f"no customer with {'id' if customer[0] == 'id' else 'email'} {customer[1]!r}"
+            if product not in products:
+                errors['product'] = f"no product with {'id' if product[0] == 'id' else 'name'} {product[1]!r}"
+        if errors:
+            results.append({'index': index, 'errors': errors})
+            continue
+        results.append({'index': index})
+        orders.append(Order(customer_id=customers[customer], product_id=products[product],
+                            quantity=quantity, order_date=order_date))
+
+    if atomic and len(orders) < len(items):
+        for result in results:
+            if 'errors' not in result:
+                result['errors'] = {'item': "not created: other orders in the request are invalid"}
+        return results
+
+    with transaction.atomic():
+        created = Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+        if created:
+            orders_bulk_created.send(sender=Order, orders=created)
+    created = iter(created)
+    for result in results:
+        if 'errors' not in result:
+            result['id'] = next(created).pk
+    return results
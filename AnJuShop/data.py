@@ -1,38 +1,228 @@
+"""
+Synthetic AnJuShop data for load testing (see `manage.py generate_fake_data`).
+
+Every column is generated with vectorized NumPy from one seeded Generator,
+so the same seed and sizes give the same rows. Rows get explicit ids after
+the highest existing id, which lets orders reference customers and
+products without lookups. They are written in batches with executemany
+(COPY FROM STDIN on PostgreSQL), one transaction per batch.
+
+Skew:
+- product popularity follows a Zipf law (exponent `zipf`) over a random
+  ranking of the products, customer activity a milder one;
+- quantities are mostly 1-2 (geometric), prices log-normal;
+- order dates are spread over start..end with more orders on weekends and
+  a steady growth over the range, ascending with the order ids.
+"""
 from datetime import date, timedelta
 
-#from AnJuShop.models import Customer, Product, Order
-from .models import Customer, Product, Order
-
-
-import random
-
-# Create customers
-customers = []
-for i in range(1, 11):
-    c = Customer.objects.create(
-        name=f"Customer {i}",
-        email=f"customer{i}@example.com",
-        age=random.choice([25, 30, 35, 40, None]),  # include some missing age
-        city=random.choice(["Hong Kong", "Kowloon", "New Territories", ""])
-    )
-    customers.append(c)
-
-# Create products
-products = []
-for i in range(1, 6):
-    p = Product.objects.create(
-        name=f"Product {i}",
-        category=random.choice(["Food", "Electronics", "Clothing"]),
-        price=random.choice([10.5, 20.0, 35.99, 50.0])
-    )
-    products.append(p)
-
-# Create orders (at least 20)
-today = date.today()
-for i in range(1, 25):
-    Order.objects.create(
-        customer=random.choice(customers),
-        product=random.choice(products),
-        quantity=random.randint(1, 5),
-        order_date=today - timedelta(days=random.randint(0, 30))
-    )
\ No newline at end of file
+import numpy as np
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .loaders import _copy_rows
+from .models import Customer, Order, Product, Vendor
+
+
+BATCH_SIZE = 200_000
+
+# SQLite page cache for the run: the foreign key indexes take random inserts
+SQLITE_CACHE_KB = 256 * 1024
+
+FIRST_NAMES = np.array(['Alice', 'Bob', 'Carol', 'David', 'Emily', 'Frank', 'Grace', 'Henry', 'Ivy',
+                        'Jack', 'Karen', 'Leo', 'Mia', 'Noah', 'Olivia', 'Peter', 'Queenie', 'Ryan',
+                        'Sophia', 'Tom', 'Una', 'Victor', 'Wendy', 'Xavier', 'Yan', 'Zoe', 'Ka Ming',
+                        'Siu Wai', 'Chi Hung', 'Mei Ling'])
+LAST_NAMES = np.array(['Chan', 'Wong', 'Lee', 'Cheung', 'Lau', 'Ng', 'Ho', 'Leung', 'Lam', 'Tsang',
+                       'Smith', 'Brown', 'Taylor', 'Martin', 'Garcia', 'Kim', 'Tanaka', 'Singh'])
+CITIES = np.array(['Hong Kong', 'Kowloon', 'New Territories', 'Macau', 'Shenzhen', 'Guangzhou',
+                   'Taipei', 'Singapore', 'Tokyo', 'Seoul', 'London', 'New York', 'Sydney',
+                   'Vancouver', 'Toronto', 'Paris', 'Berlin', 'Bangkok', 'Manila', ''])
+CATEGORIES = np.array(['Home & Kitchen', 'Electronics', 'Sports & Outdoors', 'Food', 'Clothing',
+                       'Beauty', 'Toys', 'Books', 'Office', 'Garden', 'Health', 'Pets'])
+ADJECTIVES = np.array(['Stainless', 'Wireless', 'Organic', 'Ergonomic', 'Portable', 'Vintage',
+                       'Smart', 'Bamboo', 'Ceramic', 'Waterproof', 'Compact', 'Deluxe', 'Classic',
+                       'Foldable', 'Premium', 'Eco'])
+NOUNS = np.array(['Bottle', 'Headphones', 'Tea', 'Chair', 'Speaker', 'Lamp', 'Backpack', 'Mat',
+                  'Mug', 'Keyboard', 'Jacket', 'Blender', 'Notebook', 'Tent', 'Watch', 'Pillow',
+                  'Rice Cooker', 'Sneakers', 'Umbrella', 'Desk'])
+
+
+# ────────────────────────────────────────────────
+# Vectorized generation (columns as NumPy arrays)
+# ────────────────────────────────────────────────
+
+def zipf_weights(n, exponent):
+    """Probabilities proportional to 1 / rank ** exponent for ranks 1..n."""
+    weights = 1.0 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def skewed_choice(rng, ranking, size, exponent):
+    """`size` Zipf-skewed draws from ranking (most popular first)."""
+    return ranking[rng.choice(len(ranking), size=size, p=zipf_weights(len(ranking), exponent))]
+
+
+def _pick(rng, values, size, p=None):
+    return values[rng.choice(len(values), size=size, p=p)]
+
+
+def _join(*columns):
+    result = columns[0].astype(object)
+    for column in columns[1:]:
+        result = result + column.astype(object)
+    return result
+
+
+def customer_columns(rng, ids):
+    n = len(ids)
+    first = _pick(rng, FIRST_NAMES, n)
+    last = _pick(rng, LAST_NAMES, n)
+    emails = _join(np.char.lower(np.char.replace(first, ' ', '')), np.full(n, '.'),
+                   np.char.lower(last), np.full(n, '.'), ids.astype(str), np.full(n, '@example.net'))
+    # Python ints: COPY would reject "40.0" for the integer column
+    ages = np.clip(rng.normal(38, 12, n).round(), 18, 90).astype(np.int64).astype(object)
+    ages[rng.random(n) < 0.05] = None  # some customers never tell
+    city_weights = zipf_weights(len(CITIES), 0.8)
+    return {'id': ids, 'name': _join(first, np.full(n, ' '), last), 'email': emails, 'age': ages,
+            'city': _pick(rng, CITIES, n, city_weights)}
+
+
+def vendor_columns(rng, ids):
+    n = len(ids)
+    last = _pick(rng, LAST_NAMES, n)
+    kinds = np.array([' Trading', ' Supplies', ' & Co', ' Wholesale', ' Imports'])
+    return {'id': ids, 'name': _join(last, _pick(rng, kinds, n), np.full(n, ' '), ids.astype(str)),
+            'email': _join(np.full(n, 'vendor'), ids.astype(str), np.full(n, '@example.net')),
+            'city': _pick(rng, CITIES, n)}
+
+
+def product_columns(rng, ids):
+    n = len(ids)
+    codes = rng.integers(100, 1000, n).astype(str)
+    names = _join(_pick(rng, ADJECTIVES, n), np.full(n, ' '), _pick(rng, NOUNS, n), np.full(n, ' '),
+                  codes)
+    prices = np.clip(np.exp(rng.normal(3.3, 1.0, n)), 0.5, 9999).round(2)
+    return {'id': ids, 'name': names, 'category': _pick(rng, CATEGORIES, n), 'price': prices}
+
+
+def orders_per_day(rng, count, start, end):
+    """
+    How many of `count` orders fall on each day of start..end: more on
+    weekends, growing over the range.
+    """
+    days = (end - start).days + 1
+    weights = np.linspace(1.0, 2.0, days)
+    weekdays = (np.arange(days) + start.weekday()) % 7
+    weights[weekdays >= 5] *= 1.5
+    return rng.multinomial(count, weights / weights.sum())
+
+
+def order_columns(rng, ids, positions, day_ends, start, customer_ranking, product_ids,
+                  product_prices, product_ranking, exponent):
+    """
+    Orders at `positions` of the whole run; day_ends is the cumulative
+    orders_per_day, so dates (and ids) ascend like a real order table's.
+    product_prices[i] is the price of product_ids[i] (for the price snapshot)
+    and product_ranking a permutation of those indexes, most popular first.
+    """
+    n = len(ids)
+    product_index = skewed_choice(rng, product_ranking, n, exponent)
+    offsets = np.searchsorted(day_ends, positions, side='right')
+    quantity = np.minimum(rng.geometric(0.55, n), 20)
+    unit_price = product_prices[product_index]
+    return {
+        'id': ids,
+        'customer_id': skewed_choice(rng, customer_ranking, n, 0.6),
+        'product_id': product_ids[product_index],
+        'quantity': quantity,
+        'order_date': (np.datetime64(start) + offsets).astype(str),
+        'unit_price': unit_price,
+        'line_total': (unit_price * quantity).round(2),
+    }
+
+
+# ────────────────────────────────────────────────
+# Writing
+# ────────────────────────────────────────────────
+
+def _columns(model, names):
+    return [model._meta.get_field(name).column for name in names]
+
+
+def write_rows(model, columns):
+    """Insert one batch of generated columns ({field name: array}) in a transaction."""
+    names = list(columns)
+    rows = list(zip(*(columns[name].tolist() for name in names)))
+    table = model._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            _copy_rows(cursor, table, _columns(model, names), rows)
+        else:
+            sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+                connection.ops.quote_name(table),
+                ', '.join(connection.ops.quote_name(column) for column in _columns(model, names)),
+                ', '.join(['%s'] * len(names)),
+            )
+            cursor.executemany(sql, rows)
+    return len(rows)
+
+
+def next_ids(model, count):
+    first = (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+    return np.arange(first, first + count, dtype=np.int64)
+
+
+def reset_sequences(models):
+    """Explicit ids leave PostgreSQL's sequences behind; move them past the new rows."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def generate(customers=0, products=0, vendors=0, orders=0, seed=0, start=None, end=None,
+             zipf=1.1, batch_size=BATCH_SIZE, progress=None):
+    """
+    Add the given numbers of rows; orders pick from every customer and product
+    in the database (existing and new). Returns {model name: rows written}.
+    progress(model name, rows written so far) is called after each batch.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or date.today()
+    start = start or end - timedelta(days=730)
+    written = {}
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_KB}")
+
+    def fill(model, count, build):
+        done = 0
+        ids = next_ids(model, count)
+        for offset in range(0, count, batch_size):
+            done += write_rows(model, build(ids[offset:offset + batch_size], offset))
+            if progress:
+                progress(model.__name__, done)
+        written[model.__name__] = done
+
+    fill(Customer, customers, lambda ids, _: customer_columns(rng, ids))
+    fill(Vendor, vendors, lambda ids, _: vendor_columns(rng, ids))
+    fill(Product, products, lambda ids, _: product_columns(rng, ids))
+
+    if orders:
+        customer_ids = np.fromiter(Customer.objects.values_list('id', flat=True).order_by('id'), np.int64)
+        catalog = list(Product.objects.values_list('id', 'price').order_by('id'))
+        if not len(customer_ids) or not catalog:
+            raise ValueError("orders need at least one customer and one product")
+        product_ids = np.array([pk for pk, _ in catalog], dtype=np.int64)
+        prices = np.array([float(price) for _, price in catalog])
+        day_ends = np.cumsum(orders_per_day(rng, orders, start, end))
+        customer_ranking = rng.permutation(customer_ids)
+        product_ranking = rng.permutation(len(product_ids))
+        fill(Order, orders, lambda ids, offset: order_columns(
+            rng, ids, np.arange(offset, offset + len(ids)), day_ends, start, customer_ranking,
+            product_ids, prices, product_ranking, zipf))
+
+    if connection.vendor == 'postgresql':
+        reset_sequences([Customer, Vendor, Product, Order])
+    return written
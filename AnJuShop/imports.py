@@ -0,0 +1,240 @@
+"""
+Background CSV imports for the AnJuShop admins.
+
+The admin only saves the uploaded file as an ImportJob; `manage.py
+run_import_jobs` workers (run as many as you like) claim pending jobs and
+load them in batches. Every batch is checked with the FakeDataProcessed
+validation rules: rejected rows are not saved, and all problems go to an
+issues CSV attached to the job, numbered by file line like the cleaners'
+reports. The issues hold customer data: the admin serves them to users with
+the import permission only. The admin page polls the job for progress.
+"""
+import os
+from datetime import timedelta
+
+import pandas as pd
+from django import forms
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+
+from FakeDataProcessed.columnar import RAW_DTYPE
+from FakeDataProcessed.validation import (CUSTOMER_REJECT, CUSTOMER_RULES, PRODUCT_REJECT,
+                                          PRODUCT_RULES, VENDOR_REJECT, VENDOR_RULES,
+                                          issues_report, rejected)
+
+from .loaders import DEFAULT_BATCH_SIZE, load_customers, load_products, load_vendors
+from .models import ImportJob
+
+
+IMPORTERS = {
+    'customer': {'rules': CUSTOMER_RULES, 'reject': CUSTOMER_REJECT,
+                 'columns': ['name', 'email', 'age', 'city'], 'load': load_customers},
+    'product': {'rules': PRODUCT_RULES, 'reject': PRODUCT_REJECT,
+                'columns': ['name', 'category', 'price'], 'load': load_products},
+    'vendor': {'rules': VENDOR_RULES, 'reject': VENDOR_REJECT,
+               'columns': ['name', 'email', 'city'], 'load': load_vendors},
+}
+
+# A running job whose worker has not reported progress for this long is
+# given back to the queue (loads are upserts, so re-running is safe)
+STALE_AFTER = timedelta(minutes=10)
+
+
+# ────────────────────────────────────────────────
+# Queue
+# ────────────────────────────────────────────────
+
+def requeue_stale_jobs(stale_after=STALE_AFTER):
+    return ImportJob.objects.filter(
+        status=ImportJob.RUNNING, updated_at__lt=timezone.now() - stale_after,
+    ).update(status=ImportJob.PENDING, updated_at=timezone.now())
+
+
+def claim_next_job():
+    """
+    Take the oldest pending job, or return None. The status change is a
+    conditional UPDATE, so two workers can never claim the same job.
+    """
+    while True:
+        pk = (ImportJob.objects.filter(status=ImportJob.PENDING)
+              .order_by('created_at', 'id').values_list('pk', flat=True).first())
+        if pk is None:
+            return None
+        now = timezone.now()
+        claimed = ImportJob.objects.filter(pk=pk, status=ImportJob.PENDING).update(
+            status=ImportJob.RUNNING, started_at=now, updated_at=now,
+            processed_rows=0, loaded_rows=0, rejected_rows=0, issue_rows=0, error='',
+        )
+        if claimed:
+            return ImportJob.objects.get(pk=pk)
+
+
+def _count_rows(path):
+    """Data rows in a CSV file (newlines minus the header), for the progress bar."""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while block := f.read(1024 * 1024):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def _as_text(frame):
+    # The loaders parse strings, like the rows csv.DictReader gives them
+    return frame.astype(str).where(frame.notna(), '')
+
+
+def run_job(job, batch_size=DEFAULT_BATCH_SIZE):
+    """Validate and load a claimed job batch by batch, recording progress on it."""
+    spec = IMPORTERS[job.model_name]
+    path = job.file.path
+    ImportJob.objects.filter(pk=job.pk).update(total_rows=_count_rows(path),
+                                               updated_at=timezone.now())
+    issues_path = os.path.join(os.path.dirname(path), f'import_{job.pk}_issues.csv')
+    totals = {'processed_rows': 0, 'loaded_rows': 0, 'rejected_rows': 0, 'issue_rows': 0}
+
+    try:
+        # Read as text, so a batch's column types (and what it rejects) do not
+        # depend on which rows batch_size put in it
+        with pd.read_csv(path, chunksize=batch_size, dtype=RAW_DTYPE) as reader:
+            for chunk in reader:
+                # file line numbers: the header is line 1
+                issues_df = issues_report(chunk, spec['rules'], spec['columns'],
+                                          row_column='row', row_offset=totals['processed_rows'] + 2)
+                if not issues_df.empty:
+                    issues_df.to_csv(issues_path, mode='a' if totals['issue_rows'] else 'w',
+                                     header=not totals['issue_rows'], index=False)
+                    totals['issue_rows'] += len(issues_df)
+
+                bad = rejected(chunk, spec['reject'])
+                valid = _as_text(chunk[~bad])
+                stats = spec['load'](valid.to_dict('records'), batch_size=batch_size)
+
+                totals['processed_rows'] += len(chunk)
+                totals['loaded_rows'] += stats['loaded']
+                totals['rejected_rows'] += int(bad.sum()) + stats['skipped']
+                ImportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now(), **totals)
+    except Exception as e:
+        ImportJob.objects.filter(pk=job.pk).update(status=ImportJob.FAILED, error=str(e),
+                                                   finished_at=timezone.now(), **totals)
+        raise
+
+    job.refresh_from_db()
+    if totals['issue_rows']:
+        job.issues_file.name = os.path.relpath(issues_path, job.file.storage.location)
+    job.status = ImportJob.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['issues_file', 'status', 'finished_at', 'updated_at'])
+    return job
+
+
+# ────────────────────────────────────────────────
+# Admin
+# ────────────────────────────────────────────────
+
+class BackgroundImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV file with a header row, like the FakeData exports.")
+
+
+def job_progress(job, issues_url=None):
+    return {
+        'id': job.pk,
+        'status': job.status,
+        'percent': job.percent,
+        'total_rows': job.total_rows,
+        'processed_rows': job.processed_rows,
+        'loaded_rows': job.loaded_rows,
+        'rejected_rows': job.rejected_rows,
+        'issue_rows': job.issue_rows,
+        'issues_url': issues_url if job.issues_file else None,
+        'error': job.error,
+    }
+
+
+class BackgroundImportMixin:
+    """
+    Adds <changelist>/background-import/ to a ModelAdmin whose model is in
+    IMPORTERS: upload a CSV, then follow the job's progress.
+    """
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        urls = [
+            path('background-import/', self.admin_site.admin_view(self.background_import_view),
+                 name='%s_%s_background_import' % info),
+            path('background-import/<int:job_id>/', self.admin_site.admin_view(self.import_job_view),
+                 name='%s_%s_import_job' % info),
+            path('background-import/<int:job_id>/progress/',
+                 self.admin_site.admin_view(self.import_job_progress_view),
+                 name='%s_%s_import_job_progress' % info),
+            path('background-import/<int:job_id>/issues/',
+                 self.admin_site.admin_view(self.import_job_issues_view),
+                 name='%s_%s_import_job_issues' % info),
+        ]
+        return urls + super().get_urls()
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {**(extra_context or {}), 'background_import': True}
+        return super().changelist_view(request, extra_context)
+
+    def _import_job(self, request, job_id):
+        if not self.has_import_permission(request):
+            raise PermissionDenied
+        return get_object_or_404(ImportJob, pk=job_id, model_name=self.model._meta.model_name)
+
+    def background_import_view(self, request):
+        if not self.has_import_permission(request):
+            raise PermissionDenied
+        model_name = self.model._meta.model_name
+        if model_name not in IMPORTERS:
+            raise Http404(f"No background import for {model_name}")
+
+        form = BackgroundImportForm(request.POST or None, request.FILES or None)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            job = ImportJob(model_name=model_name, created_by=request.user)
+            job.file.save(upload.name, upload, save=False)  # copied in chunks
+            job.save()
+            messages.info(request, f"Import #{job.pk} queued.")
+            return redirect(reverse(f'admin:{self.model._meta.app_label}_{model_name}_import_job',
+                                    args=[job.pk]))
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f"Background import: {self.model._meta.verbose_name_plural}",
+            'form': form,
+            'jobs': ImportJob.objects.filter(model_name=model_name).order_by('-created_at')[:10],
+        }
+        return TemplateResponse(request, 'admin/AnJuShop/background_import.html', context)
+
+    def import_job_view(self, request, job_id):
+        job = self._import_job(request, job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f"Import #{job.pk}",
+            'job': job,
+        }
+        return TemplateResponse(request, 'admin/AnJuShop/import_job.html', context)
+
+    def import_job_progress_view(self, request, job_id):
+        job = self._import_job(request, job_id)
+        info = self.model._meta.app_label, self.model._meta.model_name
+        issues_url = reverse('admin:%s_%s_import_job_issues' % info, args=[job.pk])
+        return JsonResponse(job_progress(job, issues_url))
+
+    def import_job_issues_view(self, request, job_id):
+        job = self._import_job(request, job_id)
+        if not job.issues_file:
+            raise Http404(f"Import #{job.pk} has no issues report")
+        return FileResponse(job.issues_file.open('rb'), as_attachment=True,
+                            filename=f'import_{job.pk}_issues.csv')
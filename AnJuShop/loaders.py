@@ -0,0 +1,378 @@
+"""
+Batched loading of the cleaned CSV files (FakeDataProcessed/*_cleaned.csv and
+FakeData/Orders*.csv) into the AnJuShop models.
+
+Rows are streamed from disk and written with bulk_create, one transaction
+per batch, so memory stays flat and each batch is a handful of queries.
+"""
+import csv
+import io
+import os
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Customer, Product, Order, Vendor, product_prices
+
+
+DEFAULT_BATCH_SIZE = 5000
+COPY_BATCH_SIZE = 100_000
+
+
+def read_csv_rows(path):
+    """Yield each CSV row as a dict, without loading the file in memory."""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# ────────────────────────────────────────────────
+# Field parsing (cleaned CSVs write age as "35.0" and blanks as "")
+# ────────────────────────────────────────────────
+
+def _text(value):
+    return (value or '').strip()
+
+
+def _age(value):
+    value = _text(value)
+    if not value:
+        return None
+    try:
+        age = float(value)
+    except ValueError:
+        return None
+    return int(age) if age >= 0 and age == int(age) else None
+
+
+def _price(value):
+    try:
+        return Decimal(_text(value)).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+
+
+def _date(value):
+    try:
+        return datetime.strptime(_text(value), settings.DATE_STRING_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def customer_from_row(row):
+    if not _text(row.get('name')) or not _text(row.get('email')):
+        return None
+    return Customer(name=_text(row['name'])[:100], email=_text(row['email']),
+                    age=_age(row.get('age')), city=_text(row.get('city'))[:100])
+
+
+def vendor_from_row(row):
+    if not _text(row.get('name')) or not _text(row.get('email')):
+        return None
+    return Vendor(name=_text(row['name'])[:100], email=_text(row['email']),
+                  city=_text(row.get('city'))[:100])
+
+
+def product_from_row(row):
+    price = _price(row.get('price'))
+    if not _text(row.get('name')) or not _text(row.get('category')) or price is None or price < 0:
+        return None
+    return Product(name=_text(row['name'])[:100], category=_text(row['category'])[:100],
+                   price=price)
+
+
+# ────────────────────────────────────────────────
+# Loaders. Each returns {'loaded': n, 'skipped': n}
+# ────────────────────────────────────────────────
+
+def _upsert_by_email(model, objects, update_fields):
+    # ON CONFLICT cannot touch the same row twice in one statement: last row wins
+    unique = list({obj.email: obj for obj in objects}.values())
+    model.objects.bulk_create(unique, update_conflicts=True,
+                              unique_fields=['email'], update_fields=update_fields)
+
+
+def _load_by_email(model, build, update_fields, rows, batch_size):
+    stats = {'loaded': 0, 'skipped': 0}
+    for batch in batched(rows, batch_size):
+        objects = [obj for obj in map(build, batch) if obj is not None]
+        stats['skipped'] += len(batch) - len(objects)
+        with transaction.atomic():
+            _upsert_by_email(model, objects, update_fields)
+        stats['loaded'] += len(objects)
+    return stats
+
+
+def load_customers(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert or update customers, matched on the unique email."""
+    return _load_by_email(Customer, customer_from_row, ['name', 'age', 'city'], rows, batch_size)
+
+
+def load_vendors(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """Insert or update vendors, matched on the unique email."""
+    return _load_by_email(Vendor, vendor_from_row, ['name', 'city'], rows, batch_size)
+
+
+def load_products(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert or update products. Product has no unique column, so rows are
+    matched on name: existing products get the new category/price. As with
+    the email loaders, the last of repeated rows wins and each counts as loaded.
+    """
+    stats = {'loaded': 0, 'skipped': 0}
+    for batch in batched(rows, batch_size):
+        valid = [obj for obj in map(product_from_row, batch) if obj is not None]
+        stats['skipped'] += len(batch) - len(valid)
+        objects = {obj.name: obj for obj in valid}
+
+        with transaction.atomic():
+            existing = dict(Product.objects.filter(name__in=objects)
+                            .order_by('-id').values_list('name', 'id'))
+            updates = []
+            for name, pk in existing.items():
+                obj = objects.pop(name)
+                obj.pk = pk
+                updates.append(obj)
+            Product.objects.bulk_update(updates, ['category', 'price'], batch_size=batch_size)
+            Product.objects.bulk_create(list(objects.values()), batch_size=batch_size)
+        stats['loaded'] += len(valid)
+    return stats
+
+
+# entity -> (model, column the loader matches rows on, loader)
+DELTA_LOADERS = {
+    'customers': (Customer, 'email', load_customers),
+    'products': (Product, 'name', load_products),
+    'vendors': (Vendor, 'email', load_vendors),
+}
+
+
+def apply_delta(entity, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Apply a delta written by FakeDataProcessed/incremental.py: 'insert' and
+    'update' rows go through the entity's loader, 'delete' rows are removed
+    by key. Customers and products that orders still reference are kept
+    (deleting them would cascade to the orders). Returns the loader's stats
+    plus 'deleted' and 'kept'.
+    """
+    model, key, load = DELTA_LOADERS[entity]
+    deletes = []
+
+    def upserts():
+        for row in rows:
+            if _text(row.get('op')) == 'delete':
+                deletes.append(_text(row.get(key)))
+            else:
+                yield row
+
+    stats = load(upserts(), batch_size=batch_size)
+    stats.update(deleted=0, kept=0)
+    for batch in batched(deletes, batch_size):
+        with transaction.atomic():
+            matched = model.objects.filter(**{f'{key}__in': batch})
+            if model is not Vendor:
+                stats['kept'] += matched.filter(order__isnull=False).distinct().count()
+                matched = matched.filter(order__isnull=True)
+            stats['deleted'] += matched.delete()[1].get(model._meta.label, 0)
+    return stats
+
+
+def _is_id(key):
+    # str.isdigit() also accepts '²' and other digits int() rejects
+    return key.isascii() and key.isdigit()
+
+
+def _resolve(model, keys):
+    """
+    Map each key to a primary key: numeric keys are taken as ids, anything
+    else as a name (the lowest id wins when names repeat).
+    """
+    ids = {int(key) for key in keys if _is_id(key)}
+    names = {key for key in keys if not _is_id(key)}
+    found = {str(pk): pk for pk in model.objects.filter(pk__in=ids).values_list('pk', flat=True)}
+    for name, pk in model.objects.filter(name__in=names).order_by('-id').values_list('name', 'id'):
+        found[name] = pk
+    return found
+
+
+def resolve_order(row, customers, products):
+    """
+    Return ((customer_id, product_id, quantity, order_date), None) for a valid
+    order row, or (None, reason) when it cannot be loaded.
+    """
+    customer_id = customers.get(_text(row.get('customer_name')))
+    if customer_id is None:
+        return None, 'unknown customer'
+    product_id = products.get(_text(row.get('product_name')))
+    if product_id is None:
+        return None, 'unknown product'
+    try:
+        quantity = int(_text(row.get('quantity')))
+    except ValueError:
+        quantity = -1
+    if quantity < 0:
+        return None, 'invalid quantity'
+    order_date = _date(row.get('order_date'))
+    if order_date is None:
+        return None, 'invalid order_date'
+    return (customer_id, product_id, quantity, order_date), None
+
+
+def order_from_row(row, customers, products):
+    values, _ = resolve_order(row, customers, products)
+    if values is None:
+        return None
+    customer_id, product_id, quantity, order_date = values
+    return Order(customer_id=customer_id, product_id=product_id,
+                 quantity=quantity, order_date=order_date)
+
+
+def load_orders(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert orders. customer_name / product_name may hold names or numeric ids;
+    both are resolved with one query per batch. Unresolved rows are skipped.
+    """
+    stats = {'loaded': 0, 'skipped': 0}
+    for batch in batched(rows, batch_size):
+        customers = _resolve(Customer, {_text(row.get('customer_name')) for row in batch})
+        products = _resolve(Product, {_text(row.get('product_name')) for row in batch})
+        objects = [obj for obj in (order_from_row(row, customers, products) for row in batch)
+                   if obj is not None]
+        stats['skipped'] += len(batch) - len(objects)
+        with transaction.atomic():
+            Order.objects.bulk_create(objects, batch_size=batch_size)
+        stats['loaded'] += len(objects)
+    return stats
+
+
+# ────────────────────────────────────────────────
+# Fast path for orders: preloaded lookups + COPY FROM STDIN on PostgreSQL
+# ────────────────────────────────────────────────
+
+class Lookup:
+    """
+    Order references resolved against a whole table, the way _resolve
+    does it: numeric keys are ids, anything else a name. Ids and names are
+    kept apart, so a numeric name never shadows another row's id.
+    """
+
+    def __init__(self, ids, names):
+        self.ids = ids
+        self.names = names
+
+    def get(self, key):
+        if _is_id(key):
+            return int(key) if int(key) in self.ids else None
+        return self.names.get(key)
+
+
+def lookup_map(model):
+    """A Lookup of every row of model, built with one query. The lowest id wins when names repeat."""
+    ids, names = set(), {}
+    for pk, name in model.objects.order_by('-id').values_list('id', 'name').iterator(chunk_size=50_000):
+        ids.add(pk)
+        names[name] = pk
+    return Lookup(ids, names)
+
+
+def _copy_rows(cursor, table, columns, rows):
+    """Send rows to PostgreSQL with COPY ... FROM STDIN (psycopg 2 or 3)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerows(rows)
+    sql = "COPY {} ({}) FROM STDIN WITH (FORMAT csv)".format(
+        connection.ops.quote_name(table),
+        ', '.join(connection.ops.quote_name(column) for column in columns),
+    )
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):  # psycopg2
+        buffer.seek(0)
+        raw.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with raw.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def _write_orders(values):
+    """
+    Insert resolved order values and return the ones left out because their
+    product was deleted since the lookup.
+    """
+    prices = product_prices({product_id for _, product_id, _, _ in values})
+    missing = [value for value in values if value[1] not in prices]
+    values = [value for value in values if value[1] in prices]
+    if connection.vendor == 'postgresql':
+        # COPY bypasses Order.objects.bulk_create: add the price snapshot here
+        rows = [(customer_id, product_id, quantity, order_date, prices[product_id],
+                 prices[product_id] * quantity)
+                for customer_id, product_id, quantity, order_date in values]
+        table = Order._meta.db_table
+        columns = [Order._meta.get_field(name).column
+                   for name in ('customer', 'product', 'quantity', 'order_date',
+                                'unit_price', 'line_total')]
+        with connection.cursor() as cursor:
+            _copy_rows(cursor, table, columns, rows)
+    else:
+        Order.objects.bulk_create(
+            [Order(customer_id=customer_id, product_id=product_id, quantity=quantity,
+                   order_date=order_date, unit_price=prices[product_id])
+             for customer_id, product_id, quantity, order_date in values],
+            batch_size=DEFAULT_BATCH_SIZE,
+        )
+    return missing
+
+
+def load_orders_fast(rows, batch_size=COPY_BATCH_SIZE, rejects_path=None):
+    """
+    Insert orders using one lookup query per model for the whole load, then
+    COPY FROM STDIN on PostgreSQL (batched bulk_create on other databases).
+    Rows that cannot be resolved, or whose product is deleted before they
+    are written, go to rejects_path with a reason (a rejects file left by an
+    earlier load is removed first).
+    """
+    if rejects_path and os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    customers = lookup_map(Customer)
+    products = lookup_map(Product)
+    stats = {'loaded': 0, 'skipped': 0}
+
+    rejects_file = rejects = None
+
+    def reject(row, reason):
+        nonlocal rejects_file, rejects
+        stats['skipped'] += 1
+        if rejects_path:
+            if rejects is None:
+                rejects_file = open(rejects_path, 'w', newline='', encoding='utf-8')
+                rejects = csv.DictWriter(rejects_file, fieldnames=[*row.keys(), 'reason'])
+                rejects.writeheader()
+            rejects.writerow({**row, 'reason': reason})
+
+    try:
+        for batch in batched(rows, batch_size):
+            values, sources = [], {}
+            for row in batch:
+                resolved, reason = resolve_order(row, customers, products)
+                if resolved is None:
+                    reject(row, reason)
+                    continue
+                values.append(resolved)
+                sources.setdefault(resolved[1], []).append(row)
+            with transaction.atomic():
+                missing = _write_orders(values)
+            for product_id in {product_id for _, product_id, _, _ in missing}:
+                for row in sources[product_id]:
+                    reject(row, 'unknown product')
+            stats['loaded'] += len(values) - len(missing)
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+    return stats
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Min, OuterRef, Subquery
+
+from AnJuShop.models import Order, Product
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill Order.unit_price (the product's current price) and Order.line_total for "
+        "orders placed before those columns existed, one id range per transaction. "
+        "Orders that already have a unit price are left alone, so it can be re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10_000,
+                            help="order ids per transaction")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        missing = Order.objects.filter(unit_price__isnull=True)
+        bounds = missing.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write("every order already has its totals")
+            return
+
+        price = Subquery(Product.objects.filter(pk=OuterRef('product_id')).values('price')[:1])
+        line_total = ExpressionWrapper(F('quantity') * F('unit_price'),
+                                       output_field=DecimalField(max_digits=16, decimal_places=2))
+        started = time.perf_counter()
+        updated = 0
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            ids = {'id__gte': start, 'id__lt': start + batch_size}
+            with transaction.atomic():
+                count = Order.objects.filter(unit_price__isnull=True, **ids).update(unit_price=price)
+                Order.objects.filter(line_total__isnull=True, unit_price__isnull=False,
+                                     **ids).update(line_total=line_total)
+            updated += count
+            if count and options['verbosity'] > 1:
+                self.stdout.write(f"  ids {start:,}-{start + batch_size - 1:,}: {count:,} orders")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated:,} orders backfilled in {time.perf_counter() - started:.2f}s"))
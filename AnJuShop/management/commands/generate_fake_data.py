@@ -0,0 +1,80 @@
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from AnJuShop import data, rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Add synthetic customers, vendors, products and orders for load testing, "
+        "generated with NumPy from --seed (same seed and sizes, same rows) and written "
+        "with batched inserts (COPY on PostgreSQL). Product popularity is Zipf-skewed. "
+        "The DailySales rollup is rebuilt for the generated dates afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10_000)
+        parser.add_argument('--products', type=int, default=1_000)
+        parser.add_argument('--vendors', type=int, default=100)
+        parser.add_argument('--orders', type=int, default=100_000,
+                            help="orders placed by existing and new customers")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--start', type=date.fromisoformat, default=None,
+                            help="first order date, YYYY-MM-DD (default: two years before --end)")
+        parser.add_argument('--end', type=date.fromisoformat, default=None,
+                            help="last order date, YYYY-MM-DD (default: today)")
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help="Zipf exponent of product popularity (0 = uniform)")
+        parser.add_argument('--batch-size', type=int, default=data.BATCH_SIZE,
+                            help="rows per insert batch / transaction")
+        parser.add_argument('--skip-rollup', action='store_true',
+                            help="leave DailySales alone (run backfill_daily_sales later)")
+
+    def handle(self, *args, **options):
+        sizes = {name: options[name] for name in ('customers', 'products', 'vendors', 'orders')}
+        if any(count < 0 for count in sizes.values()):
+            raise CommandError("row counts cannot be negative")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if options['zipf'] < 0:
+            raise CommandError("--zipf cannot be negative")
+        end = options['end'] or date.today()
+        start = options['start'] or end - timedelta(days=730)
+        if start > end:
+            raise CommandError("--start is after --end")
+
+        timings = {}
+        started = time.perf_counter()
+
+        def progress(model, done):
+            timings[model] = time.perf_counter()
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {model}: {done:,}")
+
+        try:
+            written = data.generate(**sizes, seed=options['seed'], start=start, end=end,
+                                    zipf=options['zipf'], batch_size=options['batch_size'],
+                                    progress=progress)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        previous = started
+        for model, count in written.items():
+            if not count:
+                continue
+            elapsed = timings[model] - previous
+            previous = timings[model]
+            self.stdout.write(self.style.SUCCESS(
+                f"{model:<10} {count:>12,} rows  {elapsed:8.2f}s  ({count / elapsed:,.0f} rows/s)"))
+
+        if written.get('Order') and not options['skip_rollup']:
+            rollup_started = time.perf_counter()
+            rows = rollups.rebuild_daily_sales(start, end)
+            self.stdout.write(f"{rows:,} daily sales rows rebuilt in "
+                              f"{time.perf_counter() - rollup_started:.2f}s")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(written.values()):,} rows generated in {time.perf_counter() - started:.2f}s "
+            f"(seed {options['seed']})"))
@@ -0,0 +1,110 @@
+import functools
+import glob
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from AnJuShop import loaders
+
+
+ENTITIES = ('customers', 'products', 'vendors', 'orders')
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the cleaned CSVs (customers, products, vendors) and the Orders CSVs "
+        "into the AnJuShop models with batched bulk_create. With --delta, apply the "
+        "<entity>_delta.csv files written by FakeDataProcessed/incremental.py instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', help="default: FakeDataProcessed/customers_cleaned.csv "
+                                                "(customers_delta.csv with --delta)")
+        parser.add_argument('--products', help="default: FakeDataProcessed/products_cleaned.csv "
+                                               "(products_delta.csv with --delta)")
+        parser.add_argument('--vendors', help="default: FakeDataProcessed/vendors_cleaned.csv "
+                                              "(vendors_delta.csv with --delta)")
+        parser.add_argument('--delta', action='store_true',
+                            help="customers, products and vendors files are deltas: insert and "
+                                 "update their rows, delete the rows marked 'delete' (keeping "
+                                 "customers and products that orders reference)")
+        parser.add_argument(
+            '--orders', nargs='+',
+            default=sorted(glob.glob(os.path.join(settings.BASE_DIR, 'FakeData', 'Orders*.csv'))),
+            help="one or more Orders CSVs (default: FakeData/Orders*.csv)",
+        )
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help=f"rows per bulk_create / transaction (default: "
+                                 f"{loaders.DEFAULT_BATCH_SIZE:,}; {loaders.COPY_BATCH_SIZE:,} "
+                                 f"for --fast-orders)")
+        parser.add_argument('--only', nargs='+', choices=ENTITIES, default=ENTITIES,
+                            help="load only these entities")
+        parser.add_argument('--fast-orders', action='store_true',
+                            help="preload customer/product ids once and load orders with "
+                                 "PostgreSQL COPY (batched inserts on other databases)")
+        parser.add_argument('--rejects-dir', default=None,
+                            help="with --fast-orders: folder for <orders file>_rejects.csv, "
+                                 "listing orders whose customer or product could not be "
+                                 "resolved (default: next to each orders file)")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        batch_size = options['batch_size'] or loaders.DEFAULT_BATCH_SIZE
+
+        def from_csv(load):
+            return lambda path: load(loaders.read_csv_rows(path), batch_size=batch_size)
+
+        data_dir = os.path.join(settings.BASE_DIR, 'FakeDataProcessed')
+        suffix = 'delta' if options['delta'] else 'cleaned'
+        for entity in ('customers', 'products', 'vendors'):
+            options[entity] = options[entity] or os.path.join(data_dir, f'{entity}_{suffix}.csv')
+
+        def delta(entity):
+            return lambda path: loaders.apply_delta(entity, loaders.read_csv_rows(path),
+                                                    batch_size=batch_size)
+
+        def load_entity(entity, load):
+            return delta(entity) if options['delta'] else from_csv(load)
+
+        load_orders = from_csv(loaders.load_orders)
+        if options['fast_orders']:
+            load_orders = functools.partial(self.load_orders_fast,
+                                            batch_size=options['batch_size'] or loaders.COPY_BATCH_SIZE,
+                                            rejects_dir=options['rejects_dir'])
+
+        # Orders go last: they reference customers and products
+        jobs = [
+            ('customers', [options['customers']], load_entity('customers', loaders.load_customers)),
+            ('products', [options['products']], load_entity('products', loaders.load_products)),
+            ('vendors', [options['vendors']], load_entity('vendors', loaders.load_vendors)),
+            ('orders', options['orders'], load_orders),
+        ]
+        for entity, paths, load in jobs:
+            if entity not in options['only']:
+                continue
+            for path in paths:
+                if not os.path.exists(path):
+                    raise CommandError(f"File not found: {path}")
+                started = time.perf_counter()
+                stats = load(path)
+                elapsed = time.perf_counter() - started
+                rate = stats['loaded'] / elapsed if elapsed else 0
+                self.stdout.write(self.style.SUCCESS(
+                    f"{entity:<10} {stats['loaded']:>10,} loaded  {stats['skipped']:>8,} skipped  "
+                    f"{elapsed:6.2f}s  ({rate:,.0f} rows/s)  ← {os.path.basename(path)}"
+                ))
+                if 'deleted' in stats:
+                    self.stdout.write(f"{'':<10} {stats['deleted']:>10,} deleted  "
+                                      f"{stats['kept']:>8,} kept (referenced by orders)")
+
+    def load_orders_fast(self, path, batch_size, rejects_dir=None):
+        root, ext = os.path.splitext(os.path.basename(path))
+        rejects = os.path.join(rejects_dir or os.path.dirname(path), f"{root}_rejects{ext}")
+        stats = loaders.load_orders_fast(loaders.read_csv_rows(path), batch_size, rejects)
+        if stats['skipped']:
+            self.stdout.write(self.style.WARNING(
+                f"{stats['skipped']:,} unresolved orders written to {rejects}"))
+        return stats
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from AnJuShop import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or repair the Product/Customer full-text search index and reindex every "
+        "row, e.g. after a SQLite migration rebuilt one of the tables (and dropped its triggers)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        started = time.perf_counter()
+        if not search.install(connection):
+            raise CommandError(f"full-text search is not supported on {connection.vendor} "
+                               "(PostgreSQL, or SQLite with FTS5)")
+        self.stdout.write(self.style.SUCCESS(
+            f"search index rebuilt in {time.perf_counter() - started:.2f}s"))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from AnJuShop import imports, loaders
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker for the admin background imports: claims pending ImportJobs and "
+        "loads them in batches. Start several to get a pool of workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=loaders.DEFAULT_BATCH_SIZE,
+                            help="rows validated and saved per batch")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="seconds to wait when the queue is empty")
+        parser.add_argument('--once', action='store_true',
+                            help="run the pending jobs, then exit instead of polling")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        while True:
+            close_old_connections()
+            requeued = imports.requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"{requeued} stale job(s) put back in the queue"))
+
+            job = imports.claim_next_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+
+            started = time.perf_counter()
+            try:
+                job = imports.run_job(job, batch_size=options['batch_size'])
+            except Exception as e:
+                self.stderr.write(self.style.ERROR(f"{job} failed: {e}"))
+                continue
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"{job}: {job.loaded_rows:,} loaded  {job.rejected_rows:,} rejected  "
+                f"{job.issue_rows:,} issues  {elapsed:.2f}s"
+            ))
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+
+# The schema as AnJuShop.search built it when this migration was written,
+# frozen here so that later changes to that module do not change history.
+# `manage.py rebuild_search_index` installs the current one.
+POSTGRESQL = [
+    """ALTER TABLE "AnJuShop_product" ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (to_tsvector('simple', coalesce("name", '') || ' ' || coalesce("category", ''))) STORED""",
+    """CREATE INDEX IF NOT EXISTS "anjushop_product_search_idx" ON "AnJuShop_product" USING gin (search_vector)""",
+    """ALTER TABLE "AnJuShop_customer" ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (to_tsvector('simple', coalesce("name", '') || ' ' || translate(coalesce("email", ''), '@.-_+', '     ') || ' ' || coalesce("city", ''))) STORED""",
+    """CREATE INDEX IF NOT EXISTS "anjushop_customer_search_idx" ON "AnJuShop_customer" USING gin (search_vector)""",
+]
+
+POSTGRESQL_REVERSE = [
+    """ALTER TABLE "AnJuShop_product" DROP COLUMN IF EXISTS search_vector""",
+    """ALTER TABLE "AnJuShop_customer" DROP COLUMN IF EXISTS search_vector""",
+]
+
+SQLITE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS "anjushop_product_fts" USING fts5(name, category, content="AnJuShop_product", content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS anjushop_product_fts_ai AFTER INSERT ON "AnJuShop_product" BEGIN INSERT INTO "anjushop_product_fts"(rowid, name, category) VALUES (new.id, new.name, new.category); END""",
+    """CREATE TRIGGER IF NOT EXISTS anjushop_product_fts_ad AFTER DELETE ON "AnJuShop_product" BEGIN INSERT INTO "anjushop_product_fts"("anjushop_product_fts", rowid, name, category) VALUES ('delete', old.id, old.name, old.category); END""",
+    """CREATE TRIGGER IF NOT EXISTS anjushop_product_fts_au AFTER UPDATE ON "AnJuShop_product" BEGIN INSERT INTO "anjushop_product_fts"("anjushop_product_fts", rowid, name, category) VALUES ('delete', old.id, old.name, old.category); INSERT INTO "anjushop_product_fts"(rowid, name, category) VALUES (new.id, new.name, new.category); END""",
+    """INSERT INTO "anjushop_product_fts"("anjushop_product_fts") VALUES ('rebuild')""",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS "anjushop_customer_fts" USING fts5(name, email, city, content="AnJuShop_customer", content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER IF NOT EXISTS anjushop_customer_fts_ai AFTER INSERT ON "AnJuShop_customer" BEGIN INSERT INTO "anjushop_customer_fts"(rowid, name, email, city) VALUES (new.id, new.name, new.email, new.city); END""",
+    """CREATE TRIGGER IF NOT EXISTS anjushop_customer_fts_ad AFTER DELETE ON "AnJuShop_customer" BEGIN INSERT INTO "anjushop_customer_fts"("anjushop_customer_fts", rowid, name, email, city) VALUES ('delete', old.id, old.name, old.email, old.city); END""",
+    """CREATE TRIGGER IF NOT EXISTS anjushop_customer_fts_au AFTER UPDATE ON "AnJuShop_customer" BEGIN INSERT INTO "anjushop_customer_fts"("anjushop_customer_fts", rowid, name, email, city) VALUES ('delete', old.id, old.name, old.email, old.city); INSERT INTO "anjushop_customer_fts"(rowid, name, email, city) VALUES (new.id, new.name, new.email, new.city); END""",
+    """INSERT INTO "anjushop_customer_fts"("anjushop_customer_fts") VALUES ('rebuild')""",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS anjushop_product_fts_ai",
+    "DROP TRIGGER IF EXISTS anjushop_product_fts_ad",
+    "DROP TRIGGER IF EXISTS anjushop_product_fts_au",
+    'DROP TABLE IF EXISTS "anjushop_product_fts"',
+    "DROP TRIGGER IF EXISTS anjushop_customer_fts_ai",
+    "DROP TRIGGER IF EXISTS anjushop_customer_fts_ad",
+    "DROP TRIGGER IF EXISTS anjushop_customer_fts_au",
+    'DROP TABLE IF EXISTS "anjushop_customer_fts"',
+]
+
+
+def _statements(connection, forward):
+    if connection.vendor == 'postgresql':
+        return POSTGRESQL if forward else POSTGRESQL_REVERSE
+    if connection.vendor == 'sqlite':
+        if forward:
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA compile_options")
+                if not any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall()):
+                    return []  # no FTS5: search falls back to icontains
+        return SQLITE if forward else SQLITE_REVERSE
+    return []
+
+
+def install_search(apps, schema_editor):
+    for statement in _statements(schema_editor.connection, forward=True):
+        schema_editor.execute(statement)
+
+
+def uninstall_search(apps, schema_editor):
+    for statement in _statements(schema_editor.connection, forward=False):
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search for Product and Customer (see AnJuShop.search): a
+    generated tsvector column with a GIN index on PostgreSQL, FTS5 tables
+    with triggers on SQLite. The columns are not model fields.
+    """
+
+    dependencies = [
+        ('AnJuShop', '0004_daily_sales'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
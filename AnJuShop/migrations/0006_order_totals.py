@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AnJuShop', '0005_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=8, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['order_date', 'line_total'], name='order_date_line_total_idx'),
+        ),
+    ]
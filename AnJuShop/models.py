@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 
@@ -9,6 +10,12 @@ class Customer(models.Model):
     age = models.IntegerField(null=True, blank=True)
     city = models.CharField(max_length=100, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['city'], name='customer_city_idx'),
+            models.Index(fields=['name'], name='customer_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -18,10 +25,42 @@ class Product(models.Model):
     category = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=8, decimal_places=2)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['category'], name='product_category_idx'),
+            models.Index(fields=['name'], name='product_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
 
+PRICE_LOOKUP_CHUNK = 900  # product ids per query, below SQLite's old 999 parameter limit
+
+
+def product_prices(product_ids):
+    """{product id: current price}, one query per PRICE_LOOKUP_CHUNK ids."""
+    product_ids = list(product_ids)
+    prices = {}
+    for start in range(0, len(product_ids), PRICE_LOOKUP_CHUNK):
+        chunk = product_ids[start:start + PRICE_LOOKUP_CHUNK]
+        prices.update(Product.objects.filter(pk__in=chunk).values_list('pk', 'price'))
+    return prices
+
+
+class OrderQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips save(): snapshot the prices here too
+        objs = list(objs)
+        prices = product_prices({obj.product_id for obj in objs if obj.unit_price is None})
+        for obj in objs:
+            if obj.unit_price is None:
+                obj.unit_price = prices.get(obj.product_id)
+            obj.update_line_total()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -32,9 +71,48 @@ class Order(models.Model):
     quantity = models.PositiveIntegerField()
     order_date = models.DateField()
 
+    # Product price when the order was placed, and quantity * unit_price.
+    # Empty only for orders older than these columns: see backfill_order_totals
+    unit_price = models.DecimalField(max_digits=8, decimal_places=2, null=True, editable=False)
+    line_total = models.DecimalField(max_digits=16, decimal_places=2, null=True, editable=False)
+
+    objects = OrderQuerySet.as_manager()
+
+    _loaded_product_id = None
+
+    class Meta:
+        indexes = [
+            # Admin date filter, alone or together with the product/category filter
+            models.Index(fields=['order_date', 'product'], name='order_date_product_idx'),
+            # Revenue per date range straight from the index
+            models.Index(fields=['order_date', 'line_total'], name='order_date_line_total_idx'),
+        ]
+
     def __str__(self):
         return f"{self.customer} - {self.product} ({self.quantity})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_product_id = instance.__dict__.get('product_id')
+        return instance
+
+    def update_line_total(self):
+        if self.unit_price is not None and self.quantity is not None:
+            self.line_total = self.unit_price * self.quantity
+
+    def save(self, *args, **kwargs):
+        # The price is taken when the order is placed (or moved to another
+        # product); later product price changes leave it alone
+        moved = self._loaded_product_id is not None and self._loaded_product_id != self.product_id
+        if self.unit_price is None or moved:
+            self.unit_price = self.product.price
+        self.update_line_total()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'unit_price', 'line_total'}
+        super().save(*args, **kwargs)
+        self._loaded_product_id = self.product_id
+
 
 
 class Vendor(models.Model):
@@ -42,5 +120,72 @@ class Vendor(models.Model):
     email = models.EmailField(unique=True)
     city = models.CharField(max_length=100, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'city'], name='vendor_name_city_idx'),
+            models.Index(fields=['city'], name='vendor_city_idx'),
+        ]
+
     def __str__(self):
         return self.name
+
+
+class DailySales(models.Model):
+    """
+    Orders rolled up per day, product category and customer city.
+    Kept up to date by AnJuShop.rollups (order signals + backfill_daily_sales).
+    """
+    date = models.DateField()
+    category = models.CharField(max_length=100)
+    city = models.CharField(max_length=100, blank=True)
+    order_count = models.IntegerField(default=0)
+    quantity = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "daily sales"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category', 'city'], name='dailysales_unique_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.category} / {self.city or '-'}"
+
+
+class ImportJob(models.Model):
+    """A CSV import queued from the admin and run by the run_import_jobs worker."""
+    PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    model_name = models.CharField(max_length=20)
+    file = models.FileField(upload_to='imports/')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    loaded_rows = models.PositiveIntegerField(default=0)
+    rejected_rows = models.PositiveIntegerField(default=0)
+    issue_rows = models.PositiveIntegerField(default=0)
+    issues_file = models.FileField(upload_to='imports/', blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True,
+                                   on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='importjob_status_idx'),
+        ]
+
+    @property
+    def percent(self):
+        if self.status == self.DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, int(100 * self.processed_rows / self.total_rows))
+
+    def __str__(self):
+        return f"{self.model_name} import #{self.pk} ({self.status})"
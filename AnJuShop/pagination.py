@@ -0,0 +1,172 @@
+"""
+Opt-in pagination for AnJuShop admin changelists over very large tables.
+
+EstimatedCountPaginator
+    Uses PostgreSQL's planner estimate instead of SELECT COUNT(*) once a table
+    is big, and caches exact counts of big tables on other databases.
+KeysetChangeList / LargeTableAdminMixin
+    "Next" pages continue after the last row shown (WHERE key < last key)
+    instead of OFFSET, so deep pages cost the same as the first one.
+"""
+import hashlib
+import json
+
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+CURSOR_VAR = 'after'
+
+
+def planner_estimate(queryset):
+    """PostgreSQL's row estimate for queryset, or None if there is none."""
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                           [connection.ops.quote_name(queryset.model._meta.db_table)])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    # Exact counts below this are cheap enough to run on every request
+    estimate_above = 100_000
+    count_cache_seconds = 60
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query'):
+            return super().count
+
+        if connections[queryset.db].vendor == 'postgresql':
+            estimate = planner_estimate(queryset)
+            if estimate is not None and estimate >= self.estimate_above:
+                self.estimated = True
+                return estimate
+            return super().count
+
+        sql, params = queryset.query.sql_with_params()
+        key = 'anjushop:count:' + hashlib.md5(repr((queryset.db, sql, params)).encode()).hexdigest()
+        count = cache.get(key)
+        if count is not None:
+            self.estimated = True
+            return count
+        count = super().count
+        if count >= self.estimate_above:
+            cache.set(key, count, self.count_cache_seconds)
+        return count
+
+
+def _keyset_filter(ordering, values):
+    """
+    Rows that come after `values` in `ordering`, e.g. for ('-order_date', '-id'):
+    order_date < d OR (order_date = d AND id < i)
+    """
+    condition = Q()
+    for i, (field, value) in enumerate(zip(ordering, values)):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': value})
+        for previous, previous_value in zip(ordering[:i], values):
+            step &= Q(**{previous.lstrip('-'): previous_value})
+        condition |= step
+    return condition
+
+
+class KeysetChangeList(ChangeList):
+    """ChangeList that pages with ?after=<key of the last row> when the default ordering is used."""
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR) or None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    @property
+    def keyset(self):
+        # Clicking a column header sorts by something else: fall back to OFFSET
+        return ORDER_VAR not in self.params and not self.show_all
+
+    def _decode_cursor(self, ordering):
+        parts = self.cursor.split(',')
+        if len(parts) != len(ordering):
+            return None
+        try:
+            return [self.opts.get_field(field.lstrip('-')).to_python(part)
+                    for field, part in zip(ordering, parts)]
+        except ValidationError:
+            return None
+
+    def _encode_cursor(self, obj, ordering):
+        fields = [self.opts.get_field(field.lstrip('-')) for field in ordering]
+        return ','.join(str(field.value_from_object(obj)) for field in fields)
+
+    def get_results(self, request):
+        if not self.keyset:
+            self.cursor = None
+            return super().get_results(request)
+
+        ordering = list(self.model_admin.keyset_ordering)
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        result_count = paginator.count
+
+        queryset = self.queryset
+        values = self._decode_cursor(ordering) if self.cursor else None
+        if values is not None:
+            queryset = queryset.filter(_keyset_filter(ordering, values))
+        else:
+            self.cursor = None
+        result_list = queryset[:self.list_per_page]
+        rows = list(result_list)  # evaluated once, the template reuses the cache
+
+        next_cursor = None
+        if len(rows) == self.list_per_page:
+            next_cursor = self._encode_cursor(rows[-1], ordering)
+
+        self.result_count = result_count
+        self.result_count_estimated = paginator.estimated
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or next_cursor)
+        self.paginator = paginator
+        self.next_page_url = next_cursor and self.get_query_string({CURSOR_VAR: next_cursor})
+        self.first_page_url = self.get_query_string(remove=[CURSOR_VAR])
+
+
+class LargeTableAdminMixin:
+    """
+    Opt in on a ModelAdmin (before ImportExportModelAdmin in the bases):
+    estimated counts and keyset pagination along keyset_ordering, which
+    must end with a unique field.
+    """
+    keyset_ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/AnJuShop/keyset_change_list.html'
+
+    def get_ordering(self, request):
+        return self.keyset_ordering
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
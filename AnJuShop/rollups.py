@@ -0,0 +1,288 @@
+"""
+Daily sales rollup: Order revenue (Order.line_total, the price at order
+time) per day, product category and customer city, stored in DailySales.
+
+- Order saves and deletes adjust the matching rollup rows (signals below),
+  and so do orders inserted by AnJuShop.bulk (orders_bulk_created).
+- Deleting a customer or product subtracts its orders' totals with one
+  grouped query, instead of one signal per cascaded order; a customer city
+  or product category change moves its orders' totals the same way.
+- rebuild_daily_sales() recomputes a date range from the orders; run it
+  (`manage.py backfill_daily_sales`) after bulk loads and queryset
+  .update()s, which skip signals.
+- sales_by() answers dashboard queries from the rollup only.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, QuerySet, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Customer, DailySales, Order, Product
+from .signals import orders_bulk_created
+
+
+# Orders older than Order.line_total that backfill_order_totals has not
+# reached yet count at the current product price
+REVENUE = Coalesce(F('line_total'),
+                   ExpressionWrapper(F('quantity') * F('product__price'),
+                                     output_field=DecimalField(max_digits=16, decimal_places=2)))
+
+DIMENSIONS = {'day': 'date', 'category': 'category', 'city': 'city'}
+
+BULK_ROLLUP_CHUNK = 900  # ids per query, below SQLite's old 999 parameter limit
+
+ROLLUP_COLUMNS = ('date', 'category', 'city', 'order_count', 'quantity', 'revenue')
+
+# Rollup dimensions that live on the models orders point to: model -> (order
+# lookup, field, position in the rollup key)
+REFERENCED = {
+    Customer: ('customer', 'city', 2),
+    Product: ('product', 'category', 1),
+}
+
+
+# ────────────────────────────────────────────────
+# Incremental updates
+# ────────────────────────────────────────────────
+
+def _order_key(order_date, category, city, quantity, line_total, price):
+    if line_total is None:
+        line_total = Decimal(quantity) * Decimal(str(price))
+    revenue = Decimal(str(line_total)).quantize(Decimal('0.01'))
+    return (order_date, category, city or ''), quantity, revenue
+
+
+def add_to_rollup(key, orders, quantity, revenue):
+    """Add (or with negative numbers remove) orders to one DailySales row."""
+    day, category, city = key
+    rollup = DailySales.objects.filter(date=day, category=category, city=city)
+    changes = dict(order_count=F('order_count') + orders, quantity=F('quantity') + quantity,
+                   revenue=F('revenue') + revenue)
+    with transaction.atomic():
+        if not rollup.update(**changes):
+            try:
+                with transaction.atomic():
+                    DailySales.objects.create(date=day, category=category, city=city,
+                                              order_count=orders, quantity=quantity, revenue=revenue)
+            except IntegrityError:  # created concurrently
+                rollup.update(**changes)
+        if orders < 0:
+            rollup.filter(order_count__lte=0).delete()
+
+
+def add_totals_to_rollup(totals):
+    """
+    Add {(date, category, city): (orders, quantity, revenue)} to DailySales
+    with one INSERT ... ON CONFLICT DO UPDATE per chunk of rows. The
+    database adds to the stored totals, so concurrent writers lose nothing.
+    """
+    qn = connection.ops.quote_name
+    table = qn(DailySales._meta.db_table)
+    columns = [qn(DailySales._meta.get_field(name).column) for name in ROLLUP_COLUMNS]
+    increments = ', '.join(f'{column} = {table}.{column} + EXCLUDED.{column}' for column in columns[3:])
+    rows = [(connection.ops.adapt_datefield_value(day), category, city, orders, quantity,
+             connection.ops.adapt_decimalfield_value(revenue, 16, 2))
+            for (day, category, city), (orders, quantity, revenue) in totals.items()]
+    per_statement = BULK_ROLLUP_CHUNK // len(columns)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), per_statement):
+            chunk = rows[start:start + per_statement]
+            values = ', '.join([f"({', '.join(['%s'] * len(columns))})"] * len(chunk))
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values} "
+                f"ON CONFLICT ({', '.join(columns[:3])}) DO UPDATE SET {increments}",
+                [value for row in chunk for value in row],
+            )
+
+
+def order_totals(orders):
+    """{(date, category, city): (orders, quantity, revenue)} of an Order queryset, in one query."""
+    totals = {}
+    rows = (orders.values('order_date', 'product__category', 'customer__city')
+            .annotate(orders=Count('id'), units=Sum('quantity'), total=Sum(REVENUE))
+            .order_by())
+    for row in rows:
+        key = (row['order_date'], row['product__category'], row['customer__city'] or '')
+        previous = totals.get(key, (0, 0, Decimal('0')))
+        totals[key] = (previous[0] + row['orders'], previous[1] + row['units'],
+                       previous[2] + row['total'])
+    return totals
+
+
+def _negated(totals):
+    return {key: (-count, -quantity, -revenue) for key, (count, quantity, revenue) in totals.items()}
+
+
+def _drop_empty_rows(totals):
+    DailySales.objects.filter(date__in={day for day, _, _ in totals}, order_count__lte=0).delete()
+
+
+def _rollup_values(order):
+    return _order_key(order.order_date, order.product.category, order.customer.city,
+                      order.quantity, order.line_total, order.product.price)
+
+
+@receiver(pre_save, sender=Order)
+def remember_rolled_up_order(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    previous = (Order.objects.filter(pk=instance.pk)
+                .values_list('order_date', 'product__category', 'customer__city',
+                             'quantity', 'line_total', 'product__price').first())
+    if previous is not None:
+        instance._rollup_previous = _order_key(*previous)
+
+
+@receiver(post_save, sender=Order)
+def rollup_saved_order(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    current = _rollup_values(instance)
+    if previous == current:
+        return
+    if previous is not None:
+        key, quantity, revenue = previous
+        add_to_rollup(key, -1, -quantity, -revenue)
+    key, quantity, revenue = current
+    add_to_rollup(key, 1, quantity, revenue)
+
+
+def _deleted_with_reference(origin):
+    """Whether a delete() started on customers or products (their orders cascade)."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in REFERENCED
+
+
+@receiver(post_delete, sender=Order)
+def rollup_deleted_order(sender, instance, origin=None, **kwargs):
+    if _deleted_with_reference(origin):
+        return  # already subtracted by rollup_cascaded_orders
+    key, quantity, revenue = _rollup_values(instance)
+    add_to_rollup(key, -1, -quantity, -revenue)
+
+
+@receiver(pre_delete, sender=Customer)
+@receiver(pre_delete, sender=Product)
+def rollup_cascaded_orders(sender, instance, origin=None, **kwargs):
+    # The orders are still there: subtract them all with one grouped query
+    if not _deleted_with_reference(origin):
+        return
+    lookup, _, _ = REFERENCED[sender]
+    totals = order_totals(Order.objects.filter(**{lookup: instance}))
+    if totals:
+        add_totals_to_rollup(_negated(totals))
+        _drop_empty_rows(totals)
+
+
+@receiver(pre_save, sender=Customer)
+@receiver(pre_save, sender=Product)
+def remember_rolled_up_dimension(sender, instance, raw=False, update_fields=None, **kwargs):
+    _, field, _ = REFERENCED[sender]
+    instance._rollup_previous = None
+    if raw or instance.pk is None or (update_fields is not None and field not in update_fields):
+        return
+    instance._rollup_previous = (sender.objects.filter(pk=instance.pk)
+                                 .values_list(field, flat=True).first())
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Product)
+def rollup_moved_orders(sender, instance, raw=False, **kwargs):
+    # A new city or category moves the totals of the instance's orders
+    lookup, field, position = REFERENCED[sender]
+    previous = getattr(instance, '_rollup_previous', None)
+    if raw or previous is None or previous == getattr(instance, field):
+        return
+    totals = order_totals(Order.objects.filter(**{lookup: instance}))
+    if not totals:
+        return
+    moved = {key[:position] + (previous,) + key[position + 1:]: values
+             for key, values in _negated(totals).items()}
+    add_totals_to_rollup({**moved, **totals})
+    _drop_empty_rows(moved)
+
+
+@receiver(orders_bulk_created, sender=Order)
+def rollup_bulk_created_orders(sender, orders, **kwargs):
+    # One grouped query per chunk of ids, then one upsert per chunk of rollup rows
+    totals = {}
+    pks = [order.pk for order in orders]
+    for start in range(0, len(pks), BULK_ROLLUP_CHUNK):
+        chunk = order_totals(Order.objects.filter(pk__in=pks[start:start + BULK_ROLLUP_CHUNK]))
+        for key, (count, quantity, revenue) in chunk.items():
+            previous = totals.get(key, (0, 0, Decimal('0')))
+            totals[key] = (previous[0] + count, previous[1] + quantity, previous[2] + revenue)
+    add_totals_to_rollup(totals)
+
+
+# ────────────────────────────────────────────────
+# Backfill
+# ────────────────────────────────────────────────
+
+def order_date_range():
+    bounds = Order.objects.aggregate(first=Min('order_date'), last=Max('order_date'))
+    return bounds['first'], bounds['last']
+
+
+def rebuild_daily_sales(start=None, end=None, days_per_batch=31):
+    """
+    Recompute DailySales for start..end (default: every order) from the
+    orders, one transaction per batch of days. Returns the rows written.
+    """
+    first, last = order_date_range()
+    start = start or first
+    end = end or last
+    if start is None or end is None:
+        return 0
+
+    written = 0
+    batch_start = start
+    while batch_start <= end:
+        batch_end = min(batch_start + timedelta(days=days_per_batch - 1), end)
+        rows = (Order.objects.filter(order_date__range=(batch_start, batch_end))
+                .values('order_date', 'product__category', 'customer__city')
+                .annotate(orders=Count('id'), units=Sum('quantity'), total=Sum(REVENUE))
+                .order_by())
+        with transaction.atomic():
+            DailySales.objects.filter(date__range=(batch_start, batch_end)).delete()
+            objects = [DailySales(date=row['order_date'], category=row['product__category'],
+                                  city=row['customer__city'] or '', order_count=row['orders'],
+                                  quantity=row['units'], revenue=row['total'])
+                       for row in rows]
+            DailySales.objects.bulk_create(objects, batch_size=5000)
+        written += len(objects)
+        batch_start = batch_end + timedelta(days=1)
+    return written
+
+
+# ────────────────────────────────────────────────
+# Queries
+# ────────────────────────────────────────────────
+
+def summarize(rows, dimension):
+    """Group DailySales rows by 'day' (field 'date'), 'category' or 'city'."""
+    field = DIMENSIONS[dimension]
+    return (rows.values(field)
+            .annotate(total_orders=Sum('order_count'), total_quantity=Sum('quantity'),
+                      total_revenue=Sum('revenue'))
+            .order_by(field))
+
+
+def sales_by(dimension, start=None, end=None, **filters):
+    """
+    [{<field>, total_orders, total_quantity, total_revenue}, ...] per day,
+    category or city, read from the rollup. filters narrow the other
+    dimensions, e.g. sales_by('day', start, end, category='Food').
+    """
+    rows = DailySales.objects.filter(**filters)
+    if start:
+        rows = rows.filter(date__gte=start)
+    if end:
+        rows = rows.filter(date__lte=end)
+    return list(summarize(rows, dimension))
@@ -0,0 +1,248 @@
+"""
+Full-text search for Product and Customer.
+
+PostgreSQL
+    A generated `search_vector` tsvector column (kept up to date by the
+    database itself) with a GIN index, queried with to_tsquery and ranked
+    with ts_rank.
+SQLite
+    An FTS5 shadow table per model (external content: it stores only the
+    index), kept in sync by INSERT/UPDATE/DELETE triggers, ranked with bm25.
+    A Django migration that rebuilds the table (SQLite's ALTER TABLE
+    emulation) drops the triggers: search then falls back to icontains
+    (a stale index would miss rows) until `manage.py rebuild_search_index`
+    puts them back.
+
+Every word of the search text is matched as a prefix ("yog ma" finds "Yoga
+Mat") and all words must match. Emails are indexed as their parts
+("alice@example.com" -> alice, example, com). Other databases, and
+databases where install() has not run, fall back to the admin's
+icontains search.
+
+    filter_search(queryset, text)   queryset narrowed to the matches
+    ranked_ids(model, text, limit)  best matches first
+    ranked(model, text, limit)      the same as instances, with the fallback
+    FullTextSearchMixin             the admin search box
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Customer, Product
+
+
+# model -> indexed columns
+INDEXED = {
+    Product: ('name', 'category'),
+    Customer: ('name', 'email', 'city'),
+}
+
+# Columns whose punctuation separates words (PostgreSQL's parser would keep
+# an email as one token; SQLite's unicode61 tokenizer splits it anyway)
+SPLIT_PUNCTUATION = {'email'}
+
+WORD = re.compile(r'[^\W_]+')  # what both tokenizers call a word
+
+SQLITE_TRIGGERS = ('ai', 'ad', 'au')  # <fts table>_<suffix>: after insert, delete, update
+
+_installed = {}
+
+
+def _table(model):
+    return model._meta.db_table
+
+
+def _fts_table(model):
+    return f'{_table(model).lower()}_fts'
+
+
+def _quote(connection, name):
+    return connection.ops.quote_name(name)
+
+
+# ────────────────────────────────────────────────
+# Schema
+# ────────────────────────────────────────────────
+
+def _postgresql_schema(connection, model):
+    table = _quote(connection, _table(model))
+    parts = []
+    for column in INDEXED[model]:
+        part = f'coalesce({_quote(connection, column)}, \'\')'
+        if column in SPLIT_PUNCTUATION:
+            part = f"translate({part}, '@.-_+', '     ')"
+        parts.append(part)
+    document = " || ' ' || ".join(parts)
+    index = _quote(connection, f'{_table(model).lower()}_search_idx')
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('simple', {document})) STORED",
+        f"CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin (search_vector)",
+    ]
+
+
+def _sqlite_schema(connection, model):
+    table = _quote(connection, _table(model))
+    fts = _quote(connection, _fts_table(model))
+    columns = ', '.join(INDEXED[model])
+    new = ', '.join(f'new.{column}' for column in INDEXED[model])
+    old = ', '.join(f'old.{column}' for column in INDEXED[model])
+    trigger = _fts_table(model)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content={table}, "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {trigger}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {trigger}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {trigger}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new}); END",
+        # index the rows that are already there
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def install(connection):
+    """Create (or repair) the search columns/tables; returns False when unsupported."""
+    if connection.vendor == 'postgresql':
+        schema = _postgresql_schema
+    elif connection.vendor == 'sqlite' and _sqlite_has_fts5(connection):
+        schema = _sqlite_schema
+    else:
+        return False
+    with connection.cursor() as cursor:
+        for model in INDEXED:
+            for statement in schema(connection, model):
+                cursor.execute(statement)
+    _installed.clear()
+    return True
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        for model in INDEXED:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"ALTER TABLE {_quote(connection, _table(model))} "
+                               f"DROP COLUMN IF EXISTS search_vector")
+            elif connection.vendor == 'sqlite':
+                for suffix in SQLITE_TRIGGERS:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {_fts_table(model)}_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {_quote(connection, _fts_table(model))}")
+    _installed.clear()
+
+
+def _sqlite_is_installed(connection, model):
+    # the FTS table and the three triggers that keep it in sync
+    expected = {('table', _fts_table(model))} | {
+        ('trigger', f'{_fts_table(model)}_{suffix}') for suffix in SQLITE_TRIGGERS}
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        return expected <= set(cursor.fetchall())
+
+
+def is_installed(connection, model):
+    key = (connection.alias, connection.settings_dict['NAME'], model)
+    if key not in _installed:
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                columns = connection.introspection.get_table_description(cursor, _table(model))
+            _installed[key] = any(column.name == 'search_vector' for column in columns)
+        elif connection.vendor == 'sqlite':
+            _installed[key] = _sqlite_is_installed(connection, model)
+        else:
+            _installed[key] = False
+    return _installed[key]
+
+
+# ────────────────────────────────────────────────
+# Queries
+# ────────────────────────────────────────────────
+
+def words(text):
+    return WORD.findall(text or '')
+
+
+def _match(connection, model, terms, ranked=False):
+    """(SQL selecting the ids of the matching rows, best first if ranked, params)"""
+    if connection.vendor == 'postgresql':
+        table = _quote(connection, _table(model))
+        query = ' & '.join(f'{term}:*' for term in terms)
+        sql = f"SELECT id FROM {table} WHERE search_vector @@ to_tsquery('simple', %s)"
+        if not ranked:
+            return sql, [query]
+        return (f"{sql} ORDER BY ts_rank(search_vector, to_tsquery('simple', %s)) DESC, id",
+                [query, query])
+    fts = _quote(connection, _fts_table(model))
+    sql = f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s"
+    params = [' '.join(f'"{term}"*' for term in terms)]
+    return (f"{sql} ORDER BY rank, rowid" if ranked else sql), params
+
+
+def filter_search(queryset, text):
+    """
+    Rows of queryset matching every word of text (as prefixes), or None when
+    full-text search is not available for this model and database.
+    """
+    connection = connections[queryset.db]
+    terms = words(text)
+    if queryset.model not in INDEXED or not is_installed(connection, queryset.model):
+        return None
+    if not terms:
+        return queryset.none()
+    sql, params = _match(connection, queryset.model, terms)
+    return queryset.filter(pk__in=RawSQL(sql, params))
+
+
+def ranked_ids(model, text, limit=20, using='default'):
+    """Ids of the best `limit` matches (see filter_search), or None when unavailable."""
+    connection = connections[using]
+    terms = words(text)
+    if model not in INDEXED or not is_installed(connection, model):
+        return None
+    if not terms:
+        return []
+    sql, params = _match(connection, model, terms, ranked=True)
+    with connection.cursor() as cursor:
+        cursor.execute(f"{sql} LIMIT %s", [*params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ranked(model, text, limit=20):
+    """Best `limit` matches as instances; icontains on the indexed columns when unavailable."""
+    ids = ranked_ids(model, text, limit)
+    if ids is None:
+        condition = Q()
+        for column in INDEXED[model]:
+            condition |= Q(**{f'{column}__icontains': text})
+        return list(model.objects.filter(condition).order_by('id')[:limit])
+    found = model.objects.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+# ────────────────────────────────────────────────
+# Admin
+# ────────────────────────────────────────────────
+
+class FullTextSearchMixin:
+    """
+    Opt in on the ModelAdmin of an INDEXED model (before ImportExportModelAdmin
+    in the bases): the search box uses the full-text index; search_fields'
+    icontains search remains the fallback.
+    """
+    search_help_text = "Finds rows containing words that start with every word typed."
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term:
+            matches = filter_search(queryset, search_term)
+            if matches is not None:
+                return matches, False
+        return super().get_search_results(request, queryset, search_term)
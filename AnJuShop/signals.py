@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+
+# bulk_create sends no post_save: sent (sender=Order, orders=[created orders with
+# pks]) inside the inserting transaction by AnJuShop.bulk.create_orders
+orders_bulk_created = Signal()
@@ -1,4 +1,947 @@
-from django.test import TestCase
+import base64
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, F, Sum
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from FakeDataProcessed import columnar
+from FakeDataProcessed.validation import (CUSTOMER_REJECT, CUSTOMER_RULES, CUSTOMER_SUMMARY_RULES,
+                                          PRODUCT_REJECT, PRODUCT_RULES, integers_or_none,
+                                          issues_report, rejected)
+
+from . import api, data, loaders, rollups, search
+from .models import Customer, Product, Order, Vendor, DailySales, ImportJob
+from .pagination import CURSOR_VAR, EstimatedCountPaginator
 
 # Create your tests here.
-#
+
+
+# Most queries one AnJuShop changelist page may run (session, user, counts,
+# results and filter sidebar). The count must not grow with the rows shown.
+CHANGELIST_QUERY_BUDGET = 8
+
+# Changelists that run extra queries by design: DailySales' two totals tables
+CHANGELIST_EXTRA_QUERIES = {DailySales: 2}
+
+
+class ChangelistQueryBudgetTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+
+    def add_rows(self, start, count):
+        for i in range(start, start + count):
+            customer = Customer.objects.create(name=f"Customer {i}", email=f"c{i}@example.com",
+                                               age=30, city=f"City {i % 3}")
+            product = Product.objects.create(name=f"Product {i}", category=f"Cat {i % 3}",
+                                             price=10)
+            Order.objects.create(customer=customer, product=product, quantity=1,
+                                 order_date=date(2025, 1, 1 + i % 28))
+            Vendor.objects.create(name=f"Vendor {i}", email=f"v{i}@example.com",
+                                  city=f"City {i % 3}")
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_every_changelist_stays_within_budget(self):
+        self.client.force_login(self.admin_user)
+        models = [model for model in admin.site._registry
+                  if model._meta.app_label == 'AnJuShop']
+        self.assertTrue(models)
+
+        self.add_rows(0, 3)
+        few = {model: self.changelist_queries(model) for model in models}
+        self.add_rows(3, 30)
+        many = {model: self.changelist_queries(model) for model in models}
+
+        for model in models:
+            with self.subTest(model=model.__name__):
+                self.assertEqual(few[model], many[model],
+                                 f"{model.__name__} changelist queries grow with rows (N+1)")
+                self.assertLessEqual(many[model],
+                                     CHANGELIST_QUERY_BUDGET + CHANGELIST_EXTRA_QUERIES.get(model, 0))
+
+
+class StreamingExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        for i in range(5):
+            Customer.objects.create(name=f"Customer {i}", email=f"c{i}@example.com",
+                                    age=20 + i, city="Paris" if i % 2 else "Lyon")
+
+    def export(self, export_format, query=''):
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:AnJuShop_customer_stream_export', args=[export_format])
+        response = self.client.get(url + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_keeps_changelist_filters(self):
+        lines = self.export('csv', '?city=Paris').splitlines()
+        self.assertEqual(lines[0], 'id,name,email,age,city')
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all(line.endswith(',Paris') for line in lines[1:]))
+
+    def test_jsonl(self):
+        rows = [json.loads(line) for line in self.export('jsonl').splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(set(rows[0]), {'id', 'name', 'email', 'age', 'city'})
+
+    def test_unknown_format(self):
+        self.client.force_login(self.admin_user)
+        url = reverse('admin:AnJuShop_customer_stream_export', args=['xml'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class BackgroundImportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.client.force_login(self.admin_user)
+
+    def test_queued_import_is_validated_and_reports_progress(self):
+        csv_file = SimpleUploadedFile('customers.csv', (
+            "name,email,age,city\n"
+            "Alice,alice@example.com,30,Paris\n"
+            "Bob,not-an-email,40,Lyon\n"
+            "Carol,carol@example.com,,\n"
+        ).encode())
+        response = self.client.post(reverse('admin:AnJuShop_customer_background_import'),
+                                    {'file': csv_file})
+        job = ImportJob.objects.get()
+        self.assertRedirects(response, reverse('admin:AnJuShop_customer_import_job', args=[job.pk]))
+        self.assertEqual(job.status, ImportJob.PENDING)
+        self.assertFalse(Customer.objects.exists())
+
+        call_command('run_import_jobs', '--once', '--batch-size', '2', stdout=io.StringIO())
+
+        progress = self.client.get(
+            reverse('admin:AnJuShop_customer_import_job_progress', args=[job.pk])).json()
+        self.assertEqual(progress['status'], ImportJob.DONE)
+        self.assertEqual((progress['total_rows'], progress['processed_rows']), (3, 3))
+        self.assertEqual((progress['loaded_rows'], progress['rejected_rows']), (2, 1))
+        self.assertEqual(progress['issue_rows'], 2)  # bad email + empty city
+        self.assertEqual(sorted(Customer.objects.values_list('email', flat=True)),
+                         ['alice@example.com', 'carol@example.com'])
+
+        # issues are numbered by file line and only served through the admin
+        self.assertEqual(progress['issues_url'],
+                         reverse('admin:AnJuShop_customer_import_job_issues', args=[job.pk]))
+        report = b''.join(self.client.get(progress['issues_url']).streaming_content).decode()
+        self.assertEqual([line.split(',')[0] for line in report.splitlines()], ['row', '3', '4'])
+        self.client.force_login(User.objects.create_user('clerk', password='x', is_staff=True))
+        with override_settings(IMPORT_EXPORT_IMPORT_PERMISSION_CODE='add'):
+            self.assertEqual(self.client.get(progress['issues_url']).status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get(progress['issues_url']).status_code, 302)  # to the login
+
+    def test_batch_size_does_not_change_what_is_rejected(self):
+        # "1e3" and "inf" parse as numbers only in a batch pandas reads as floats
+        text = "name,category,price\nTea,Food,1e3\nMug,Home,inf\nPen,Office,2\nCup,Home,abc\n"
+        results = []
+        for batch_size in ('1', '2', '1000'):
+            self.client.post(reverse('admin:AnJuShop_product_background_import'),
+                             {'file': SimpleUploadedFile('products.csv', text.encode())})
+            call_command('run_import_jobs', '--once', '--batch-size', batch_size, stdout=io.StringIO())
+            job = ImportJob.objects.latest('id')
+            with job.issues_file.open('r') as f:
+                results.append((job.loaded_rows, job.rejected_rows, f.read()))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+
+class DailySalesRollupTest(TestCase):
+
+    def rollup(self):
+        return sorted(DailySales.objects.values_list('date', 'category', 'city', 'order_count',
+                                                     'quantity', 'revenue'))
+
+    def test_signals_match_backfill(self):
+        alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        bob = Customer.objects.create(name="Bob", email="bob@example.com", city="")
+        tea = Product.objects.create(name="Tea", category="Food", price=Decimal('2.50'))
+        phone = Product.objects.create(name="Phone", category="Electronics", price=Decimal('199.99'))
+
+        first = Order.objects.create(customer=alice, product=tea, quantity=4, order_date=date(2025, 1, 1))
+        Order.objects.create(customer=alice, product=tea, quantity=2, order_date=date(2025, 1, 1))
+        moved = Order.objects.create(customer=bob, product=phone, quantity=1, order_date=date(2025, 1, 2))
+        gone = Order.objects.create(customer=bob, product=tea, quantity=3, order_date=date(2025, 1, 3))
+
+        first.quantity = 5
+        first.save()
+        moved.order_date = date(2025, 1, 5)
+        moved.product = tea
+        moved.save()
+        gone.delete()
+
+        self.assertEqual(self.rollup(), [
+            (date(2025, 1, 1), 'Food', 'Paris', 2, 7, Decimal('17.50')),
+            (date(2025, 1, 5), 'Food', '', 1, 1, Decimal('2.50')),
+        ])
+        incremental = self.rollup()
+        rollups.rebuild_daily_sales()
+        self.assertEqual(self.rollup(), incremental)
+
+        by_category = rollups.sales_by('category', date(2025, 1, 1), date(2025, 1, 31))
+        self.assertEqual([(row['category'], row['total_revenue']) for row in by_category],
+                         [('Food', Decimal('20.00'))])
+
+    def test_deleting_a_customer_or_product_subtracts_its_orders_at_once(self):
+        alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        tea = Product.objects.create(name="Tea", category="Food", price=Decimal('2.50'))
+        phone = Product.objects.create(name="Phone", category="Electronics", price=Decimal('199.99'))
+
+        queries = []
+        for count in (2, 12):
+            bob = Customer.objects.create(name="Bob", email=f"bob{count}@example.com", city="Lyon")
+            for n in range(count):
+                Order.objects.create(customer=bob, product=tea, quantity=n + 1,
+                                     order_date=date(2025, 1, 1 + n % 3))
+            Order.objects.create(customer=alice, product=tea, quantity=1, order_date=date(2025, 1, 1))
+            with CaptureQueriesContext(connection) as captured:
+                bob.delete()
+            queries.append(len(captured))
+        self.assertEqual(queries[0], queries[1])
+        self.assertEqual(self.rollup(), [(date(2025, 1, 1), 'Food', 'Paris', 2, 2, Decimal('5.00'))])
+
+        Order.objects.create(customer=alice, product=phone, quantity=1, order_date=date(2025, 1, 2))
+        Product.objects.filter(pk=tea.pk).delete()
+        incremental = self.rollup()
+        self.assertEqual(incremental, [(date(2025, 1, 2), 'Electronics', 'Paris', 1, 1, Decimal('199.99'))])
+        rollups.rebuild_daily_sales()
+        self.assertEqual(self.rollup(), incremental)
+
+    def test_city_and_category_changes_move_the_totals(self):
+        alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        bob = Customer.objects.create(name="Bob", email="bob@example.com", city="Paris")
+        tea = Product.objects.create(name="Tea", category="Food", price=Decimal('2.50'))
+        Order.objects.create(customer=alice, product=tea, quantity=2, order_date=date(2025, 1, 1))
+        Order.objects.create(customer=bob, product=tea, quantity=1, order_date=date(2025, 1, 1))
+
+        alice.city = ""
+        alice.save()
+        tea.category = "Drinks"
+        tea.save(update_fields=['category'])
+
+        incremental = self.rollup()
+        self.assertEqual(incremental, [
+            (date(2025, 1, 1), 'Drinks', '', 1, 2, Decimal('5.00')),
+            (date(2025, 1, 1), 'Drinks', 'Paris', 1, 1, Decimal('2.50')),
+        ])
+        rollups.rebuild_daily_sales()
+        self.assertEqual(self.rollup(), incremental)
+
+
+class JsonApiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        cls.products = [Product.objects.create(name=f"Tea {n}", category="Food", price=Decimal('2.50'))
+                        for n in range(3)]
+        cls.order = Order.objects.create(customer=alice, product=cls.products[0], quantity=2,
+                                         order_date=date(2025, 1, 1))
+        cls.reader = User.objects.create_user('reader', password='secret')
+        cls.reader.user_permissions.add(Permission.objects.get(codename='view_customer'))
+
+    async def test_product_pages_follow_the_cursor(self):
+        first = (await self.async_client.get(reverse('api:product_list'), {'limit': 2, 'count': 1})).json()
+        self.assertEqual(first['count'], 3)
+        self.assertEqual([row['name'] for row in first['results']], ["Tea 0", "Tea 1"])
+
+        second = (await self.async_client.get(first['next'])).json()
+        self.assertEqual([row['name'] for row in second['results']], ["Tea 2"])
+        self.assertIsNone(second['next'])
+
+    async def test_order_detail_and_filters(self):
+        response = await self.async_client.get(reverse('api:order_detail', args=[self.order.pk]))
+        self.assertEqual(response.json()['quantity'], 2)
+
+        missing = await self.async_client.get(reverse('api:order_detail', args=[self.order.pk + 1]))
+        self.assertEqual(missing.status_code, 404)
+
+        listed = await self.async_client.get(reverse('api:order_list'), {'since': '2025-01-02'})
+        self.assertEqual(listed.json()['results'], [])
+        bad = await self.async_client.get(reverse('api:order_list'), {'since': 'yesterday'})
+        self.assertEqual(bad.status_code, 400)
+
+        for params in ({'after': '99999999999999999999'}, {'customer': str(api.MAX_ID + 1)},
+                       {'limit': str(api.MAX_LIMIT + 1)}, {'limit': '0'}):
+            with self.subTest(params=params):
+                response = await self.async_client.get(reverse('api:order_list'), params)
+                self.assertEqual(response.status_code, 400)
+        huge = await self.async_client.get(reverse('api:order_detail', args=[api.MAX_ID + 1]))
+        self.assertEqual(huge.status_code, 404)
+
+    async def test_field_selection(self):
+        response = await self.async_client.get(reverse('api:order_list'),
+                                                {'fields': 'product__name,quantity'})
+        self.assertEqual(response.json()['results'],
+                         [{'id': self.order.pk, 'product__name': "Tea 0", 'quantity': 2}])
+        self.assertNotIn('count', response.json())
+
+        await self.async_client.aforce_login(self.reader)
+        unknown = await self.async_client.get(reverse('api:customer_list'), {'fields': 'password'})
+        self.assertEqual(unknown.status_code, 400)
+
+    def test_customers_and_vendors_need_a_view_permission(self):
+        urls = [reverse('api:customer_list'), reverse('api:customer_detail', args=[1]),
+                reverse('api:vendor_list') + '?email=x@example.com']
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response['WWW-Authenticate'], 'Basic realm="api"')
+
+        basic = base64.b64encode(b'reader:secret').decode()
+        response = self.client.get(reverse('api:customer_list'), HTTP_AUTHORIZATION=f'Basic {basic}')
+        self.assertEqual(response.json()['results'][0]['email'], 'alice@example.com')
+        wrong = base64.b64encode(b'reader:wrong').decode()
+        self.assertEqual(self.client.get(reverse('api:customer_list'),
+                                         HTTP_AUTHORIZATION=f'Basic {wrong}').status_code, 401)
+
+        self.client.force_login(self.reader)
+        self.assertEqual(self.client.get(reverse('api:customer_list')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('api:vendor_list')).status_code, 403)
+        self.assertEqual(self.client.get(reverse('api:product_list')).status_code, 200)
+
+    def test_large_pages_are_streamed(self):
+        Customer.objects.bulk_create(Customer(name=f"C{n}", email=f"c{n}@example.com")
+                                     for n in range(api.PAGE_LIMIT + 10))
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('api:customer_list'), {'limit': api.PAGE_LIMIT + 1})
+        self.assertTrue(response.streaming)
+        page = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(page['results']), api.PAGE_LIMIT + 1)
+        self.assertEqual(page['results'][0]['name'], "Alice")
+
+        rest = json.loads(b''.join(self.client.get(page['next']).streaming_content))
+        self.assertEqual(len(rest['results']), 10)
+        self.assertIsNone(rest['next'])
+
+
+class BulkOrderApiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        cls.tea = Product.objects.create(name="Tea", category="Food", price=Decimal('2.50'))
+        cls.clerk = User.objects.create_user('pos', password='secret')
+        cls.clerk.user_permissions.add(Permission.objects.get(codename='add_order'))
+
+    def post(self, body, content_type='application/json', path=None, password='secret'):
+        credentials = base64.b64encode(f'pos:{password}'.encode()).decode()
+        return self.client.post(path or reverse('api:order_bulk_create'), body,
+                                content_type=content_type, HTTP_AUTHORIZATION=f'Basic {credentials}')
+
+    def test_creates_valid_orders_and_reports_the_rest(self):
+        orders = [
+            {'customer_email': 'alice@example.com', 'product_name': 'Tea', 'quantity': 2,
+             'order_date': '2025-01-01'},
+            {'customer_id': self.alice.pk, 'product_id': self.tea.pk, 'quantity': 1,
+             'order_date': '2025-01-01'},
+            {'customer_email': 'nobody@example.com', 'product_id': self.tea.pk, 'quantity': 1},
+            {'customer_id': self.alice.pk, 'product_name': 'Tea', 'quantity': -3},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(json.dumps(orders))
+        statements = [q['sql'] for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]
+        # user + permissions (3), references (4), prices, one INSERT,
+        # rollup (select + upsert)
+        self.assertEqual(len(statements), 11)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['created'], body['failed']), (2, 2))
+        self.assertIn('customer', body['results'][2]['errors'])
+        self.assertIn('quantity', body['results'][3]['errors'])
+
+        created = Order.objects.get(pk=body['results'][0]['id'])
+        self.assertEqual((created.customer, created.product, created.quantity), (self.alice, self.tea, 2))
+        self.assertEqual(list(DailySales.objects.values_list('order_count', 'quantity', 'revenue')),
+                         [(2, 3, Decimal('7.50'))])
+
+    def test_ndjson_and_atomic(self):
+        lines = (f'{{"customer_id": {self.alice.pk}, "product_id": {self.tea.pk}, "quantity": 1}}\n'
+                 'not json\n')
+        response = self.post(lines, 'application/x-ndjson', reverse('api:order_bulk_create') + '?atomic=1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['created'], 0)
+        self.assertFalse(Order.objects.exists())
+
+        for flag in ('0', 'false', 'no', ''):
+            with self.subTest(atomic=flag):
+                path = reverse('api:order_bulk_create') + f'?atomic={flag}'
+                self.assertEqual(self.post(lines, 'application/x-ndjson', path).json()['created'], 1)
+        self.assertEqual(Order.objects.count(), 4)
+
+    def test_bulk_rollup_adds_to_existing_rows(self):
+        bob = Customer.objects.create(name="Bob", email="bob@example.com", city="")
+        Order.objects.create(customer=self.alice, product=self.tea, quantity=1, order_date=date(2025, 1, 1))
+        orders = [{'customer_id': customer.pk, 'product_id': self.tea.pk, 'quantity': quantity,
+                   'order_date': day}
+                  for customer in (self.alice, bob) for quantity, day in
+                  ((2, '2025-01-01'), (3, '2025-01-01'), (4, '2025-01-02'))]
+        self.assertEqual(self.post(json.dumps(orders)).status_code, 201)
+        rollup = sorted(DailySales.objects.values_list('date', 'city', 'order_count', 'quantity', 'revenue'))
+        self.assertEqual(rollup, [
+            (date(2025, 1, 1), '', 2, 5, Decimal('12.50')),
+            (date(2025, 1, 1), 'Paris', 3, 6, Decimal('15.00')),
+            (date(2025, 1, 2), '', 1, 4, Decimal('10.00')),
+            (date(2025, 1, 2), 'Paris', 1, 4, Decimal('10.00')),
+        ])
+        rollups.rebuild_daily_sales()
+        self.assertEqual(sorted(DailySales.objects.values_list('date', 'city', 'order_count', 'quantity',
+                                                               'revenue')), rollup)
+
+    def test_oversized_ids_are_invalid_items(self):
+        orders = [
+            {'customer_id': 99999999999999999999, 'product_id': self.tea.pk, 'quantity': 1},
+            {'customer_id': self.alice.pk, 'product_id': -1, 'quantity': 1},
+            {'customer_id': self.alice.pk, 'product_id': self.tea.pk, 'quantity': 1},
+        ]
+        response = self.post(json.dumps(orders))
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['created'], body['failed']), (1, 2))
+        self.assertIn('customer_id', body['results'][0]['errors'])
+        self.assertIn('product_id', body['results'][1]['errors'])
+
+    def test_requires_credentials(self):
+        self.assertEqual(self.post('[]', password='wrong').status_code, 401)
+
+
+class FullTextSearchTest(TestCase):
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        mat = Product.objects.create(name="Yoga Mat", category="Sports", price=Decimal('20.00'))
+        Product.objects.create(name="Yoga Block", category="Sports", price=Decimal('9.00'))
+        Product.objects.create(name="Doormat", category="Home", price=Decimal('15.00'))
+
+        self.assertEqual(search.ranked(Product, "yog ma"), [mat])
+        self.assertEqual(search.filter_search(Product.objects.all(), "sport").count(), 2)
+
+        mat.name = "Exercise Mat"
+        mat.save()
+        self.assertEqual(search.ranked(Product, "yoga mat"), [])
+        self.assertEqual(search.ranked(Product, "exer"), [mat])
+        mat.delete()
+        self.assertEqual(search.ranked(Product, "exer"), [])
+
+    def test_admin_search_matches_email_parts(self):
+        alice = Customer.objects.create(name="Alice", email="alice.wong@example.com", city="Paris")
+        Customer.objects.create(name="Bob", email="bob@example.org", city="Paris")
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+
+        response = self.client.get(reverse('admin:AnJuShop_customer_changelist'), {'q': 'wong exam'})
+        self.assertEqual(list(response.context['cl'].result_list), [alice])
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "SQLite triggers")
+    def test_missing_triggers_fall_back_to_icontains(self):
+        self.assertTrue(search.is_installed(connection, Product))
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER anjushop_product_fts_ai")  # as a table rebuild would
+        self.addCleanup(search.install, connection)
+        search._installed.clear()
+
+        self.assertFalse(search.is_installed(connection, Product))
+        tea = Product.objects.create(name="Green Tea", category="Food", price=Decimal('2.50'))
+        self.assertIsNone(search.ranked_ids(Product, "tea"))
+        self.assertEqual(search.ranked(Product, "tea"), [tea])
+
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertTrue(search.is_installed(connection, Product))
+        self.assertEqual(search.ranked_ids(Product, "tea"), [tea.pk])
+
+
+class OrderTotalsTest(TestCase):
+
+    def test_price_is_kept_from_order_time(self):
+        alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        tea = Product.objects.create(name="Tea", category="Food", price=Decimal('2.50'))
+        order = Order.objects.create(customer=alice, product=tea, quantity=4, order_date=date(2025, 1, 1))
+        [bulk] = Order.objects.bulk_create([Order(customer=alice, product=tea, quantity=2,
+                                                  order_date=date(2025, 1, 1))])
+        self.assertEqual((order.unit_price, order.line_total), (Decimal('2.50'), Decimal('10.00')))
+        self.assertEqual(bulk.line_total, Decimal('5.00'))
+
+        tea.price = Decimal('3.00')
+        tea.save()
+        order = Order.objects.get(pk=order.pk)
+        order.quantity = 5
+        order.save(update_fields=['quantity'])
+        order.refresh_from_db()
+        self.assertEqual((order.unit_price, order.line_total), (Decimal('2.50'), Decimal('12.50')))
+
+        rollups.rebuild_daily_sales()
+        self.assertEqual(DailySales.objects.get().revenue, Decimal('17.50'))
+
+    def test_backfill_fills_old_orders_in_batches(self):
+        alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        tea = Product.objects.create(name="Tea", category="Food", price=Decimal('2.50'))
+        for quantity in (1, 2, 3):
+            Order.objects.create(customer=alice, product=tea, quantity=quantity, order_date=date(2025, 1, 1))
+        Order.objects.update(unit_price=None, line_total=None)  # as before the migration
+
+        call_command('backfill_order_totals', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(sorted(Order.objects.values_list('quantity', 'unit_price', 'line_total')),
+                         [(1, Decimal('2.50'), Decimal('2.50')), (2, Decimal('2.50'), Decimal('5.00')),
+                          (3, Decimal('2.50'), Decimal('7.50'))])
+
+
+class GenerateFakeDataTest(TestCase):
+
+    def generate(self, **options):
+        call_command('generate_fake_data', customers=40, products=30, vendors=5, orders=2000, seed=7,
+                     start=date(2025, 1, 1), end=date(2025, 3, 31), batch_size=300,
+                     stdout=io.StringIO(), **options)
+        return list(Order.objects.order_by('id').values_list(
+            'id', 'customer__email', 'product__name', 'quantity', 'order_date', 'line_total'))
+
+    def test_same_seed_same_rows(self):
+        first = self.generate()
+        self.assertEqual((Customer.objects.count(), Product.objects.count(), Vendor.objects.count()),
+                         (40, 30, 5))
+        self.assertEqual(len(first), 2000)
+        self.assertEqual(first, sorted(first, key=lambda row: row[4]))  # ids ascend with dates
+        self.assertTrue(all(date(2025, 1, 1) <= row[4] <= date(2025, 3, 31) for row in first))
+        self.assertFalse(Order.objects.exclude(unit_price=F('product__price')).exists())
+        self.assertEqual(DailySales.objects.aggregate(n=Sum('order_count'))['n'], 2000)
+
+        for model in (Order, DailySales, Product, Customer, Vendor):
+            model.objects.all().delete()
+        self.assertEqual(self.generate(skip_rollup=True), first)
+        self.assertFalse(DailySales.objects.exists())
+
+    def test_ages_are_integers(self):
+        ages = data.customer_columns(np.random.default_rng(0), np.arange(1, 201))['age'].tolist()
+        self.assertIn(None, ages)
+        self.assertEqual({type(age) for age in ages if age is not None}, {int})
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([age] for age in ages)  # as _copy_rows sends them
+        self.assertNotIn('.', buffer.getvalue())
+
+    def test_product_popularity_is_skewed(self):
+        self.generate()
+        counts = sorted(Order.objects.values('product').annotate(n=Count('id'))
+                        .values_list('n', flat=True), reverse=True)
+        self.assertGreater(sum(counts[:3]), 2000 * 0.3)  # uniform would be 10%
+
+
+class ApplyDeltaTest(TestCase):
+
+    def test_inserts_updates_and_deletes_unless_ordered(self):
+        kept = Customer.objects.create(name='Kept', email='kept@example.com', age=30, city='Tokyo')
+        Customer.objects.create(name='Gone', email='gone@example.com', age=41, city='Osaka')
+        Customer.objects.create(name='Old', email='old@example.com', age=25, city='Kyoto')
+        product = Product.objects.create(name='Tea', category='Drinks', price=Decimal('3.50'))
+        Order.objects.create(customer=kept, product=product, quantity=1, order_date=date(2025, 1, 2))
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        path = f'{folder}/customers_delta.csv'
+        with open(path, 'w') as f:
+            f.write('op,name,email,age,city\n'
+                    'insert,New,new@example.com,22.0,Nara\n'
+                    'update,Older,old@example.com,26.0,Kyoto\n'
+                    'delete,Gone,gone@example.com,41.0,Osaka\n'
+                    'delete,Kept,kept@example.com,30.0,Tokyo\n')
+        out = io.StringIO()
+        call_command('load_anjushop', delta=True, only=['customers'], customers=path, stdout=out)
+
+        self.assertEqual(dict(Customer.objects.values_list('email', 'name')),
+                         {'kept@example.com': 'Kept', 'old@example.com': 'Older',
+                          'new@example.com': 'New'})
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertIn('1 deleted', out.getvalue())
+        self.assertIn('1 kept', out.getvalue())
+
+
+class KeysetPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        alice = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        tea = Product.objects.create(name="Tea", category="Food", price=Decimal('2.50'))
+        # five orders share a date: the pages must break the tie on id
+        Order.objects.bulk_create(Order(customer=alice, product=tea, quantity=1, order_date=day)
+                                  for day in [date(2025, 1, 2)] * 5 + [date(2025, 1, 1)] * 3)
+        cls.expected = list(Order.objects.order_by('-order_date', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.admin_user)
+        self.enterContext(mock.patch.object(admin.site._registry[Order], 'list_per_page', 3))
+        self.url = reverse('admin:AnJuShop_order_changelist')
+
+    def changelist(self, query=''):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl']
+
+    def test_cursor_continues_across_equal_dates(self):
+        seen, query = [], ''
+        while True:
+            cl = self.changelist(query)
+            seen += [order.pk for order in cl.result_list]
+            if not cl.next_page_url:
+                break
+            query = cl.next_page_url
+        self.assertEqual(seen, self.expected)
+        self.assertTrue(self.changelist(f'?{CURSOR_VAR}=2025-01-02,{self.expected[2]}').cursor)
+
+    def test_sorting_by_a_column_falls_back_to_offset_pages(self):
+        cl = self.changelist(f'?{ORDER_VAR}=3&{CURSOR_VAR}=2025-01-02,{self.expected[2]}')
+        self.assertFalse(cl.keyset)
+        self.assertIsNone(cl.cursor)
+        self.assertEqual(cl.paginator.num_pages, 3)
+        self.assertEqual(len(cl.result_list), 3)
+
+    def test_bad_cursor_shows_the_first_page(self):
+        first = [order.pk for order in self.changelist().result_list]
+        for cursor in ('garbage', '2025-01-02', '2025-13-01,5', 'x,y', ',', '2025-01-02,5,6'):
+            with self.subTest(cursor=cursor):
+                cl = self.changelist(f'?{CURSOR_VAR}={cursor}')
+                self.assertIsNone(cl.cursor)
+                self.assertEqual([order.pk for order in cl.result_list], first)
+
+    @unittest.skipIf(connection.vendor == 'postgresql', "PostgreSQL uses the planner estimate")
+    def test_big_counts_are_cached(self):
+        self.enterContext(mock.patch.object(EstimatedCountPaginator, 'estimate_above', 5))
+        cl = self.changelist()
+        self.assertEqual((cl.result_count, cl.result_count_estimated), (8, False))
+
+        Order.objects.filter(pk=self.expected[0]).delete()
+        with CaptureQueriesContext(connection) as queries:
+            cl = self.changelist()
+        self.assertEqual((cl.result_count, cl.result_count_estimated), (8, True))
+        self.assertFalse([q for q in queries.captured_queries if 'COUNT(' in q['sql']])
+
+        cache.clear()
+        self.assertEqual(self.changelist().result_count, 7)
+
+
+class ColumnarSchemaTest(TestCase):
+
+    def test_cleaned_types_follow_the_models(self):
+        for entity, model in (('customers', Customer), ('products', Product), ('vendors', Vendor)):
+            types = columnar.CLEANED_TYPES[entity]
+            for field in model._meta.concrete_fields:
+                if field.name == 'id':  # the raw files' ids, not the database's
+                    continue
+                kind = field.get_internal_type()
+                expected = {'AutoField': 'int64', 'BigAutoField': 'int64', 'IntegerField': 'int32',
+                            'CharField': 'string'}.get(kind, kind)
+                if kind == 'DecimalField':
+                    expected = f'decimal({field.max_digits}, {field.decimal_places})'
+                self.assertEqual(types.get(field.name), expected, f'{entity}.{field.name}')
+
+    @unittest.skipIf(columnar.pa is None, "needs pyarrow")
+    def test_parquet_keeps_integers_and_decimals(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        frame = pd.DataFrame({'name': ['Tea', 'Cup'], 'category': ['Drinks', 'Home'],
+                              'price': [24.99, 0.1 + 0.2]})
+        for fmt in ('parquet', 'arrow'):
+            path = f'{folder}/products.{fmt}'
+            columnar.write_frame(frame, path, columnar.CLEANED_TYPES['products'])
+            self.assertEqual(columnar.read_frame(path)['price'].tolist(),
+                             [Decimal('24.99'), Decimal('0.30')])
+        ages = pd.DataFrame({'age': pd.array([35, None], dtype='Int64')})
+        columnar.write_frame(ages, f'{folder}/ages.arrow', columnar.CLEANED_TYPES['customers'])
+        self.assertEqual(str(columnar.read_frame(f'{folder}/ages.arrow')['age'].dtype), 'Int32')
+
+        # ids are not validated: an odd one is written as it came, like the CSV does
+        customers = pd.DataFrame({'id': ['1', '4988x'], 'name': ['Ann', 'Bob'],
+                                  'email': ['ann@example.com', 'bob@example.com'],
+                                  'age': pd.array([30, None], dtype='Int64'), 'city': ['Paris', '']})
+        columnar.write_frame(customers, f'{folder}/customers.parquet', columnar.CLEANED_TYPES['customers'])
+        self.assertEqual(columnar.read_frame(f'{folder}/customers.parquet')['id'].tolist(), ['1', '4988x'])
+
+
+class ValidationRulesTest(SimpleTestCase):
+    """Edge values the per-row cleaners handled, as the files are read (text, blanks NaN)."""
+
+    def test_products(self):
+        df = pd.DataFrame({'name': ['Tea', '  ', 'x' * 101, 'Cup', 'Pen', 'Mug'],
+                           'category': ['Drinks', 'Drinks', np.nan, 'y' * 101, 'Office', 'Home'],
+                           'price': ['12.50', 'inf', np.nan, 'abc', '-5', '-0']})
+        report = issues_report(df, PRODUCT_RULES, ['price'], row_column='row_number', row_offset=2)
+        self.assertEqual(report['row_number'].tolist(), [3, 4, 5, 6])
+        self.assertEqual(report['issues'].tolist(), [
+            'empty/missing name',
+            'name too long (>100 chars); missing price',
+            'category too long (>100 chars); invalid price format',
+            'negative price',
+        ])
+        self.assertEqual(report['price'].tolist()[:1], ['inf'])  # raw value, not float('inf')
+        # "inf" and "-0" are numbers, but not plain decimals a Product can hold
+        self.assertEqual(rejected(df, PRODUCT_REJECT).tolist(), [False, True, True, True, True, True])
+
+    def test_customers(self):
+        df = pd.DataFrame({'name': ['Ann Lee', np.nan, "Zoë O'Brien-Smith", 'R2D2'],
+                           'email': ['ann@example.com', ' bob@example.com ', 'bad', np.nan],
+                           'age': ['35', 'inf', '-2.5', np.nan],
+                           'city': ['Paris', np.nan, 'c' * 101, '  ']})
+        report = issues_report(df, CUSTOMER_RULES, ['age'], row_column='row')
+        self.assertEqual(report['row'].tolist(), [2, 3, 4])
+        self.assertEqual(report['issues'].tolist(), [
+            'empty name; empty city (allowed); invalid age format',
+            'invalid or missing email; city too long (>100 chars); negative age; non-integer age',
+            'name contains unusual symbols; invalid or missing email; empty city (allowed)',
+        ])
+        self.assertEqual(rejected(df, CUSTOMER_REJECT).tolist(), [False, True, True, True])
+
+        summary = issues_report(df, CUSTOMER_SUMMARY_RULES, ['age'])
+        self.assertEqual(summary['issues'].tolist(), [
+            'Empty name; Empty city; Non-integer age',  # inf % 1 is NaN, as before
+            'Invalid or empty email; Negative age; Non-integer age',
+            'Invalid or empty email; Empty city',
+        ])
+
+    def test_no_issues_and_ages(self):
+        df = pd.DataFrame({'name': ['Tea'], 'category': ['Drinks'], 'price': ['1']})
+        self.assertTrue(issues_report(df, PRODUCT_RULES, ['price']).empty)
+        ages = integers_or_none(pd.Series(['35', 'inf', '-2', '2.5', np.nan, '7']))
+        self.assertEqual(ages.fillna(-1).tolist(), [35, -1, -1, -1, -1, 7])
+        self.assertEqual(integers_or_none(pd.Series(['1', '2'])).dtype, 'int64')
+
+
+def write_csv(folder, name, text):
+    path = f'{folder}/{name}'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+
+class LoadersTest(TestCase):
+
+    def test_customers_and_vendors_upsert_on_email(self):
+        Customer.objects.create(name='Ann', email='ann@example.com', age=30, city='Paris')
+        stats = loaders.load_customers([
+            {'name': ' Ann Lee ', 'email': 'ann@example.com', 'age': '31.0', 'city': 'Lyon'},
+            {'name': 'Bob', 'email': 'bob@example.com', 'age': '', 'city': ''},
+            {'name': 'Bob Smith', 'email': 'bob@example.com', 'age': '-4', 'city': 'Rome'},
+            {'name': '', 'email': 'nameless@example.com', 'age': '20', 'city': ''},
+            {'name': 'No Email', 'email': ' ', 'age': '20', 'city': ''},
+        ], batch_size=2)
+        self.assertEqual(stats, {'loaded': 3, 'skipped': 2})
+        self.assertEqual(sorted(Customer.objects.values_list('email', 'name', 'age', 'city')), [
+            ('ann@example.com', 'Ann Lee', 31, 'Lyon'),
+            ('bob@example.com', 'Bob Smith', None, 'Rome'),  # later rows win; bad age is blank
+        ])
+
+        Vendor.objects.create(name='Blue Sky', email='sales@bluesky.com', city='Beijing')
+        stats = loaders.load_vendors([
+            {'name': 'Blue Sky Trading', 'email': 'sales@bluesky.com', 'city': 'Shanghai'},
+            {'name': 'West', 'email': 'info@west.com', 'city': ''},
+            {'name': ' ', 'email': 'blank@west.com', 'city': ''},
+        ])
+        self.assertEqual(stats, {'loaded': 2, 'skipped': 1})
+        self.assertEqual(sorted(Vendor.objects.values_list('email', 'name', 'city')), [
+            ('info@west.com', 'West', ''), ('sales@bluesky.com', 'Blue Sky Trading', 'Shanghai')])
+
+    def test_products_upsert_on_name(self):
+        tea = Product.objects.create(name='Tea', category='Drinks', price=Decimal('3.50'))
+        stats = loaders.load_products([
+            {'name': 'Tea', 'category': 'Groceries', 'price': '4.255'},
+            {'name': 'Mug', 'category': 'Home', 'price': '8'},
+            {'name': 'Pen', 'category': 'Office', 'price': '-1'},
+            {'name': 'Cup', 'category': '', 'price': '2'},
+            {'name': 'Box', 'category': 'Home', 'price': 'abc'},
+            {'name': 'Tea', 'category': 'Groceries', 'price': '4.5'},
+        ])
+        self.assertEqual(stats, {'loaded': 3, 'skipped': 3})
+        tea.refresh_from_db()
+        self.assertEqual((tea.category, tea.price), ('Groceries', Decimal('4.50')))
+        self.assertEqual(sorted(Product.objects.values_list('name', flat=True)), ['Mug', 'Tea'])
+
+    def test_command_loads_every_file(self):
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        files = {
+            'customers': write_csv(folder, 'customers.csv', 'id,name,email,age,city\n'
+                                   '1,Ann Lee,ann@example.com,31.0,Lyon\n2,,bad@example.com,,\n'),
+            'products': write_csv(folder, 'products.csv', 'name,category,price\nTea,Drinks,3.5\n'),
+            'vendors': write_csv(folder, 'vendors.csv', 'id,name,email,city\n1,West,info@west.com,\n'),
+            'orders': [write_csv(folder, 'orders.csv', 'customer_name,product_name,quantity,order_date\n'
+                                 'Ann Lee,Tea,2,2025-08-12\nNobody,Tea,1,2025-08-12\n')],
+        }
+        out = io.StringIO()
+        call_command('load_anjushop', stdout=out, **files)
+        self.assertEqual((Customer.objects.count(), Product.objects.count(), Vendor.objects.count()),
+                         (1, 1, 1))
+        order = Order.objects.get()
+        self.assertEqual((order.customer.email, order.product.name, order.quantity),
+                         ('ann@example.com', 'Tea', 2))
+        self.assertRegex(out.getvalue(), r'customers\s+1 loaded\s+1 skipped')
+        self.assertRegex(out.getvalue(), r'orders\s+1 loaded\s+1 skipped')
+
+        with self.assertRaisesMessage(CommandError, 'File not found'):
+            call_command('load_anjushop', only=['products'], products=f'{folder}/missing.csv',
+                         stdout=io.StringIO())
+
+    def test_load_orders_fast_keeps_ids_and_names_apart(self):
+        ann = Customer.objects.create(name='Ann', email='ann@example.com')
+        bob = Customer.objects.create(name='Bob', email='bob@example.com')
+        # a customer named after another customer's id
+        Customer.objects.filter(pk=ann.pk).update(name=str(bob.pk))
+        tea = Product.objects.create(name='Tea', category='Drinks', price=Decimal('3.50'))
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        rejects = os.path.join(folder, 'orders_rejects.csv')
+
+        stats = loaders.load_orders_fast([
+            {'customer_name': str(bob.pk), 'product_name': 'Tea', 'quantity': '2', 'order_date': '2025-08-12'},
+            {'customer_name': 'Bob', 'product_name': str(tea.pk), 'quantity': '1', 'order_date': '2025-08-12'},
+            {'customer_name': 'Nobody', 'product_name': 'Tea', 'quantity': '1', 'order_date': '2025-08-12'},
+            {'customer_name': 'Bob', 'product_name': 'Tea', 'quantity': '-1', 'order_date': '2025-08-12'},
+            {'customer_name': 'Bob', 'product_name': 'Tea', 'quantity': '1', 'order_date': '12/08/2025'},
+        ], batch_size=2, rejects_path=rejects)
+        self.assertEqual(stats, {'loaded': 2, 'skipped': 3})
+        self.assertEqual(list(Order.objects.values_list('customer_id', 'product_id', 'quantity')),
+                         [(bob.pk, tea.pk, 2), (bob.pk, tea.pk, 1)])
+        with open(rejects, newline='') as f:
+            self.assertEqual([row['reason'] for row in csv.DictReader(f)],
+                             ['unknown customer', 'invalid quantity', 'invalid order_date'])
+
+        # a clean run leaves no rejects file from the one before
+        stats = loaders.load_orders_fast([{'customer_name': 'Bob', 'product_name': 'Tea',
+                                           'quantity': '1', 'order_date': '2025-08-13'}],
+                                         rejects_path=rejects)
+        self.assertEqual(stats, {'loaded': 1, 'skipped': 0})
+        self.assertFalse(os.path.exists(rejects))
+
+    def test_orders_of_products_deleted_after_the_lookup_are_rejected(self):
+        Customer.objects.create(name='Ann', email='ann@example.com')
+        tea = Product.objects.create(name='Tea', category='Drinks', price=Decimal('3.50'))
+        gone = Product.objects.create(name='Gone', category='Drinks', price=Decimal('1.00'))
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        rejects = os.path.join(folder, 'orders_rejects.csv')
+        stale = loaders.Lookup({tea.pk, gone.pk}, {'Tea': tea.pk, 'Gone': gone.pk})
+        gone.delete()
+
+        with mock.patch.object(loaders, 'lookup_map', side_effect=[loaders.lookup_map(Customer), stale]):
+            stats = loaders.load_orders_fast([
+                {'customer_name': 'Ann', 'product_name': 'Gone', 'quantity': '1', 'order_date': '2025-08-12'},
+                {'customer_name': 'Ann', 'product_name': 'Tea', 'quantity': '2', 'order_date': '2025-08-12'},
+            ], rejects_path=rejects)
+        self.assertEqual(stats, {'loaded': 1, 'skipped': 1})
+        self.assertEqual(list(Order.objects.values_list('product_id', 'quantity')), [(tea.pk, 2)])
+        with open(rejects, newline='') as f:
+            self.assertEqual([(row['product_name'], row['reason']) for row in csv.DictReader(f)],
+                             [('Gone', 'unknown product')])
+
+    def test_non_ascii_digits_are_names(self):
+        tea = Product.objects.create(name='²', category='Drinks', price=Decimal('3.50'))
+        self.assertEqual(loaders._resolve(Product, {'²', str(tea.pk)}), {'²': tea.pk, str(tea.pk): tea.pk})
+        lookup = loaders.lookup_map(Product)
+        self.assertEqual((lookup.get('²'), lookup.get('٣')), (tea.pk, None))
+
+    def test_command_honors_batch_size_for_fast_orders(self):
+        Customer.objects.create(name='Ann', email='ann@example.com')
+        Product.objects.create(name='Tea', category='Drinks', price=Decimal('3.50'))
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        orders = write_csv(folder, 'orders.csv', 'customer_name,product_name,quantity,order_date\n'
+                           'Ann,Tea,2,2025-08-12\nNobody,Tea,1,2025-08-12\n')
+        with mock.patch.object(loaders, 'load_orders_fast', wraps=loaders.load_orders_fast) as load:
+            call_command('load_anjushop', only=['orders'], orders=[orders], fast_orders=True,
+                         batch_size=1, stdout=io.StringIO())
+            call_command('load_anjushop', only=['orders'], orders=[orders], fast_orders=True,
+                         stdout=io.StringIO())
+        self.assertEqual([call.args[1] for call in load.call_args_list], [1, loaders.COPY_BATCH_SIZE])
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertTrue(os.path.exists(os.path.join(folder, 'orders_rejects.csv')))
+
+
+# The cleaner scripts import each other by bare module name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'FakeDataProcessed'))
+import Product_Data_Clean  # noqa: E402
+import pipeline  # noqa: E402
+import streaming  # noqa: E402
+
+# Prices that change type when a chunk holds only them: "1e3", "inf", "-0", "3."
+PRODUCTS_CSV = 'name,category,price\n' + ''.join(
+    f'Item {n},{category},{price}\n' for n, (category, price) in enumerate(
+        [('Books', '12.50'), ('Books', '1e3'), ('Toys', 'inf'), ('Toys', '-0'), ('Home', '3.'),
+         ('Home', ''), ('', '4'), ('Books', 'abc'), ('Toys', '-2'), ('Home', '7')] * 3))
+
+
+class ChunkedCleaningTest(SimpleTestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder)
+        self.raw = f'{self.folder}/products_raw.csv'
+        with open(self.raw, 'w') as f:
+            f.write(PRODUCTS_CSV)
+
+    def outputs(self, prefix):
+        return tuple(open(f'{self.folder}/{prefix}_{kind}.csv').read() for kind in ('clean', 'issues'))
+
+    def whole_file_outputs(self):
+        df = columnar.read_frame(self.raw, dtype=columnar.RAW_DTYPE)
+        Product_Data_Clean.clean_products(df).to_csv(f'{self.folder}/whole_clean.csv', index=False)
+        Product_Data_Clean.product_issues(df).to_csv(f'{self.folder}/whole_issues.csv', index=False)
+        return self.outputs('whole')
+
+    def test_chunk_size_does_not_change_the_outputs(self):
+        for chunksize in (1, 2, 3, 7, 1000):
+            streaming.stream_clean(
+                self.raw, f'{self.folder}/{chunksize}_clean.csv', f'{self.folder}/{chunksize}_issues.csv',
+                lambda chunk, rows_before: Product_Data_Clean.product_issues(chunk, 2 + rows_before),
+                Product_Data_Clean.clean_products, chunksize, verbose=False)
+
+        whole = self.whole_file_outputs()
+        for chunksize in (1, 2, 3, 7, 1000):
+            self.assertEqual(self.outputs(chunksize), whole, f'chunksize={chunksize}')
+        self.assertIn('Item 8,Toys,-2,negative price', whole[1])  # raw value, not -2.0
+
+    def test_partition_size_does_not_change_the_outputs(self):
+        whole = self.whole_file_outputs()
+        for partition_bytes in (20, 64, 200, 10_000):
+            paths = {'input': self.raw, 'clean': f'{self.folder}/{partition_bytes}_clean.csv',
+                     'issues': f'{self.folder}/{partition_bytes}_issues.csv'}
+            with mock.patch.dict(pipeline.ENTITIES['products'], paths):
+                summary = pipeline.run_pipeline(['products'], workers=2, partition_bytes=partition_bytes)
+            self.assertEqual(self.outputs(partition_bytes), whole, f'partition_bytes={partition_bytes}')
+        self.assertGreater(summary['products']['partitions'], 1)
@@ -0,0 +1,18 @@
+from django.urls import path
+
+from . import views
+from .api import RESOURCES
+
+
+app_name = 'api'
+
+# /api/products/ -> 'api:product_list', /api/products/<pk>/ -> 'api:product_detail', ...
+urlpatterns = [
+    path('orders/bulk/', views.order_bulk_create, name='order_bulk_create'),
+]
+for name, resource in RESOURCES.items():
+    model_name = resource['model']._meta.model_name
+    urlpatterns += [
+        path(f'{name}/', views.resource_list, {'resource': name}, name=f'{model_name}_list'),
+        path(f'{name}/<int:pk>/', views.resource_detail, {'resource': name}, name=f'{model_name}_detail'),
+    ]
@@ -1,3 +1,161 @@
-from django.shortcuts import render
+"""
+Read-only JSON API: /api/<products|customers|vendors|orders>/[<id>/].
 
-# Create your views here.
+    ?fields=name,price   columns to return (see AnJuShop.api.RESOURCES)
+    ?<filter>=value      e.g. ?category= for products, ?since=/?until= for orders
+    ?limit=, ?after=     page size and cursor; follow "next" for the next page
+    ?count=1             also return the number of matching rows
+
+The views are async and query through the async ORM (aget, acount,
+aiterator): under an ASGI server (uvicorn config.asgi:application) a
+request waiting on the database or on a slow client holds no worker thread.
+
+Customers and vendors are personal data: reading them takes a logged-in
+user (session) or HTTP Basic credentials, with the view_customer /
+view_vendor permission. Products and orders are public.
+
+POST /api/orders/bulk/ creates orders in bulk (see AnJuShop.bulk). It takes
+HTTP Basic credentials of a user with the AnJuShop.add_order permission.
+"""
+import base64
+import binascii
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import authenticate
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .api import (
+    MAX_ID, PAGE_LIMIT, RESOURCES, BadRequest, PageWriter, filtered, json_response, loads, page_params,
+    page_response, selected_fields, stream_response,
+)
+from .bulk import BULK_LIMIT, BulkError, create_orders
+
+NDJSON_TYPES = ('application/x-ndjson', 'application/jsonl')
+
+
+async def _access_denied(request, resource):
+    """None when the request may read resource, else the 401 or 403 response."""
+    permission = resource.get('permission')
+    if permission is None:
+        return None
+    user = await request.auser()
+    if not user.is_authenticated:
+        user = await sync_to_async(_basic_auth_user)(request)
+    if user is None:
+        return _authentication_required()
+    if not await user.ahas_perm(permission):
+        return json_response({'error': "permission denied"}, status=403)
+    return None
+
+
+@require_GET
+async def resource_list(request, resource):
+    resource = RESOURCES[resource]
+    if denied := await _access_denied(request, resource):
+        return denied
+    try:
+        fields = selected_fields(request, resource)
+        queryset = filtered(request, resource)
+        limit, after = page_params(request)
+    except BadRequest as error:
+        return json_response({'error': str(error)}, status=400)
+
+    count = await queryset.acount() if request.GET.get('count') else None
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    queryset = queryset.order_by('id').values(*fields)[:limit]
+
+    writer = PageWriter(request, limit, count)
+    if limit > PAGE_LIMIT:
+        return stream_response(request, writer, queryset)
+    return page_response(writer, [row async for row in queryset.aiterator()])
+
+
+@require_GET
+async def resource_detail(request, resource, pk):
+    resource = RESOURCES[resource]
+    if denied := await _access_denied(request, resource):
+        return denied
+    try:
+        fields = selected_fields(request, resource)
+    except BadRequest as error:
+        return json_response({'error': str(error)}, status=400)
+
+    model = resource['model']
+    try:
+        if pk > MAX_ID:
+            raise model.DoesNotExist
+        return json_response(await model.objects.values(*fields).aget(pk=pk))
+    except model.DoesNotExist:
+        return json_response({'error': f"{model.__name__} {pk} not found"}, status=404)
+
+
+# ────────────────────────────────────────────────
+# Authentication
+# ────────────────────────────────────────────────
+
+def _basic_auth_user(request):
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'basic':
+        return None
+    try:
+        username, _, password = base64.b64decode(credentials).decode().partition(':')
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return authenticate(request, username=username, password=password)
+
+
+def _authentication_required():
+    response = json_response({'error': "authentication required"}, status=401)
+    response['WWW-Authenticate'] = 'Basic realm="api"'
+    return response
+
+
+# ────────────────────────────────────────────────
+# Bulk order creation
+# ────────────────────────────────────────────────
+
+def _read_orders(request):
+    """The posted orders: a JSON array, or one JSON object per line (NDJSON)."""
+    if request.content_type in NDJSON_TYPES:
+        items = []
+        for line in request:
+            if len(items) > BULK_LIMIT:
+                break  # enough for create_orders to reject the request
+            if line.strip():
+                try:
+                    items.append(loads(line))
+                except ValueError:
+                    items.append(None)  # reported as "must be a JSON object"
+        return items
+    try:
+        return loads(request.body)
+    except ValueError:
+        raise BulkError("the body is not valid JSON")
+
+
+# Sync: the inserts need a transaction, which the async ORM does not offer
+@csrf_exempt  # Basic auth only, no cookies
+@require_POST
+def order_bulk_create(request):
+    """
+    201 when every order was created, 200 when some were, 400 when none were
+    (or, with ?atomic=1, when any order is invalid: then none are created).
+    """
+    user = _basic_auth_user(request)
+    if user is None:
+        return _authentication_required()
+    if not user.has_perm('AnJuShop.add_order'):
+        return json_response({'error': "permission denied"}, status=403)
+
+    try:
+        atomic = request.GET.get('atomic', '').lower() in ('1', 'true', 'yes')
+        results = create_orders(_read_orders(request), atomic=atomic)
+    except BulkError as error:
+        return json_response({'error': str(error)}, status=400)
+
+    created = sum('id' in result for result in results)
+    failed = len(results) - created
+    status = 201 if not failed else 200 if created else 400
+    return json_response({'created': created, 'failed': failed, 'results': results}, status=status)
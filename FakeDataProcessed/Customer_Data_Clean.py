@@ -1,115 +1,87 @@
 import pandas as pd
-import re
 from pathlib import Path
 
+from columnar import CLEANED_TYPES, ISSUES_TYPES, RAW_DTYPE, read_frame, write_frame
+from streaming import run_streaming
+from validation import (CUSTOMER_SUMMARY_REJECT, CUSTOMER_SUMMARY_RULES,
+                        integers_or_none, issues_report, rejected)
+
 # Configuration - change these paths as needed
 INPUT_CSV = "/home/andrewlo/Documents/MyProject/MyHomeWork/FakeDataProcessed/customers_raw.csv"
 OUTPUT_CLEAN_CSV = "/home/andrewlo/Documents/MyProject/MyHomeWork/FakeDataProcessed/customers_cleaned.csv"
 OUTPUT_ISSUES_CSV = "/home/andrewlo/Documents/MyProject/MyHomeWork/FakeDataProcessed/customers_issues_report.csv"
 
-def is_normal_name(name_str):
-    """
-    Very strict name validation:
-      Allowed: unicode letters, space, hyphen (-), apostrophe (')
-      Forbidden: ~ ! @ # $ % ^ & * ( ) = + { } [ ] \ | : ; " < > ? / * and most other symbols
-    """
-    if not isinstance(name_str, str) or not name_str.strip():
-        return False
+# Rows per chunk for huge files (None = load the whole file at once)
+CHUNK_SIZE = None
+
+def customer_summary_issues(df):
+    """Issues report: name, email, age, city and the '; '-joined problems"""
+    return issues_report(df, CUSTOMER_SUMMARY_RULES, ['name', 'email', 'age', 'city'])
 
-    # Only letters + space + - + '
-    pattern = r'^[\p{L}\s\'-]+$'
-    return bool(re.match(pattern, name_str.strip()))
 
+def clean_customer_data(df):
+    """Drop rows with critical issues (name or email invalid) and normalise the rest"""
+    df_clean = df[~rejected(df, CUSTOMER_SUMMARY_REJECT)].copy()
+
+    # Optional: fill empty cities with something (or leave blank)
+    df_clean['city'] = df_clean['city'].fillna('').astype(str).str.strip()
+
+    # Age: keep only valid non-negative integers or NaN
+    df_clean['age'] = integers_or_none(df_clean['age'])
 
-def is_valid_email(email_str):
-    """Very practical email format check (not 100% RFC5322 compliant, but good enough for most cases)"""
-    if pd.isna(email_str) or not isinstance(email_str, str):
-        return False
-    email_str = email_str.strip()
-    # Basic regex - allows most common valid patterns
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email_str))
+    # Strip whitespace from name & city
+    df_clean['name'] = df_clean['name'].astype(str).str.strip()
+    return df_clean
 
 
-def check_and_clean_customer_data(input_file, output_clean_file, output_issues_file):
+def check_and_clean_customer_data(input_file, output_clean_file, output_issues_file,
+                                  chunksize=CHUNK_SIZE):
     """
     Reads CSV, validates data according to Django Customer model rules,
-    reports issues, and saves cleaned version
+    reports issues, and saves cleaned version.
+    With chunksize set the file is streamed chunk by chunk instead.
     """
+    if chunksize:
+        return run_streaming(
+            input_file, output_clean_file, output_issues_file,
+            lambda chunk, rows_before: customer_summary_issues(chunk),
+            clean_customer_data, chunksize, integer_columns=['age'],
+            types=CLEANED_TYPES['customers'], issues_types=ISSUES_TYPES['customers'],
+        )
+
     print(f"Reading file: {input_file}\n")
 
     try:
-        df = pd.read_csv(input_file)
+        df = read_frame(input_file, dtype=RAW_DTYPE)
     except FileNotFoundError:
         print(f"Error: File '{input_file}' not found.")
         return
     except Exception as e:
-        print(f"Error reading CSV: {e}")
+        print(f"Error reading {input_file}: {e}")
         return
 
-    # Make a copy for cleaning
-    df_clean = df.copy()
-
     # ────────────────────────────────────────────────
-    # Initialize issue tracking columns
+    # Validate every column in one pass
     # ────────────────────────────────────────────────
-    df['issues'] = ''
-
-    # 1. Empty / missing name
-    mask_empty_name = df['name'].isna() | (df['name'].astype(str).str.strip() == '')
-    df.loc[mask_empty_name, 'issues'] += 'Empty name; '
-
-    # 2. Invalid email format or empty (since model requires email)
-    mask_bad_email = ~df['email'].apply(is_valid_email)
-    df.loc[mask_bad_email, 'issues'] += 'Invalid or empty email; '
-
-    # 3. Empty city (allowed, but we'll flag it for review)
-    mask_empty_city = df['city'].isna() | (df['city'].astype(str).str.strip() == '')
-    df.loc[mask_empty_city, 'issues'] += 'Empty city; '
-
-    # 4. Negative or non-integer age
-    # Convert to numeric first, errors become NaN
-    df_clean['age'] = pd.to_numeric(df['age'], errors='coerce')
-    mask_negative_age = df_clean['age'] < 0
-    mask_non_integer = df_clean['age'].notna() & (df_clean['age'] % 1 != 0)
-    df.loc[mask_negative_age, 'issues'] += 'Negative age; '
-    df.loc[mask_non_integer, 'issues'] += 'Non-integer age; '
+    issues_df = customer_summary_issues(df)
 
     # ────────────────────────────────────────────────
     # Clean the data for export
     # ────────────────────────────────────────────────
-
-    # Remove rows with critical issues (name or email invalid)
-    critical_mask = mask_empty_name | mask_bad_email
-    df_clean = df_clean[~critical_mask].copy()
-
-    # Optional: fill empty cities with something (or leave blank)
-    df_clean['city'] = df_clean['city'].fillna('').astype(str).str.strip()
-
-    # Age: keep only valid non-negative integers or NaN
-    df_clean['age'] = df_clean['age'].apply(
-        lambda x: int(x) if pd.notna(x) and x >= 0 and x == int(x) else None
-    )
-
-    # Strip whitespace from name & city
-    df_clean['name'] = df_clean['name'].astype(str).str.strip()
-    df_clean['city'] = df_clean['city'].str.strip()
+    df_clean = clean_customer_data(df)
 
     # ────────────────────────────────────────────────
     # Save results
     # ────────────────────────────────────────────────
-    issues_df = df[df['issues'] != ''][['name', 'email', 'age', 'city', 'issues']]
-    issues_df['issues'] = issues_df['issues'].str.rstrip('; ')
-
     if not issues_df.empty:
-        issues_df.to_csv(output_issues_file, index=False)
+        write_frame(issues_df, output_issues_file, ISSUES_TYPES['customers'])
         print(f"Issues report saved → {output_issues_file}")
         print(f"Found {len(issues_df)} rows with problems\n")
     else:
         print("No data quality issues found!\n")
 
     # Save cleaned data
-    df_clean.to_csv(output_clean_file, index=False)
+    write_frame(df_clean, output_clean_file, CLEANED_TYPES['customers'])
     print(f"Cleaned data saved → {output_clean_file}")
     print(f"Rows before: {len(df):,}")
     print(f"Rows after : {len(df_clean):,}")
@@ -127,5 +99,6 @@ if __name__ == "__main__":
     check_and_clean_customer_data(
         INPUT_CSV,
         OUTPUT_CLEAN_CSV,
-        OUTPUT_ISSUES_CSV
+        OUTPUT_ISSUES_CSV,
+        CHUNK_SIZE
     )
\ No newline at end of file
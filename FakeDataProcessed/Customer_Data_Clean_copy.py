@@ -1,7 +1,11 @@
 import pandas as pd
-import re
 from pathlib import Path
 
+from columnar import CLEANED_TYPES, ISSUES_TYPES, RAW_DTYPE, read_frame, write_frame
+from streaming import run_streaming
+from validation import (CUSTOMER_REJECT, CUSTOMER_RULES, integers_or_none,
+                        issues_report, rejected)
+
 # ────────────────────────────────────────────────
 # CONFIGURATION
 # ────────────────────────────────────────────────
@@ -9,32 +13,38 @@ INPUT_FILE       = "customers_input.csv"
 ISSUES_REPORT    = "customers_validation_issues.csv"
 CLEANED_OUTPUT   = "customers_cleaned.csv"
 
+# Rows per chunk for huge files (None = load the whole file at once)
+CHUNK_SIZE       = None
+
+# Column types for Parquet / Arrow outputs (this report numbers its rows)
+ISSUES_TYPES_ROW = {'row': 'int64', **ISSUES_TYPES['customers']}
 
-def is_normal_name(name):
-    """
-    Returns True if name contains only letters, spaces, hyphens and apostrophes.
-    Rejects digits and most symbols.
-    """
-    if not isinstance(name, str) or not name.strip():
-        return False
-    # Allow: letters (any language), space, hyphen, apostrophe
-    pattern = r'^[\p{L}\s\'-]+$'
-    return bool(re.match(pattern, name.strip()))
 
+def customer_issues(df, row_offset=1):
+    """Issues report for a customers DataFrame (1-based row number after header)"""
+    return issues_report(df, CUSTOMER_RULES, ['name', 'email', 'age', 'city'],
+                         row_column='row', row_offset=row_offset)
 
-def is_valid_email(email):
-    """Simple but practical email format check"""
-    if pd.isna(email) or not isinstance(email, str):
-        return False
-    email = email.strip()
-    if not email:
-        return False
-    # Basic realistic pattern
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
 
+def clean_customers(df):
+    """Drop rows with critical errors and normalise the rest for the Customer model"""
+    # Remove rows with critical validation failures
+    clean_df = df[~rejected(df, CUSTOMER_REJECT)].copy()
+
+    # Final normalization
+    clean_df['name'] = clean_df['name'].astype(str).str.strip()
+    clean_df['city'] = clean_df['city'].fillna('').astype(str).str.strip()
 
-def validate_and_clean_customers():
+    # Age: only keep valid non-negative integers or None
+    clean_df['age'] = integers_or_none(clean_df['age'])
+
+    # Enforce field length limits
+    clean_df['name'] = clean_df['name'].str[:100]
+    clean_df['city'] = clean_df['city'].str[:100]
+    return clean_df
+
+
+def validate_and_clean_customers(chunksize=CHUNK_SIZE):
     print("Customer CSV Data Validation")
     print("Checking for:")
     print("• Empty / missing name")
@@ -43,9 +53,17 @@ def validate_and_clean_customers():
     print("• Empty city name (reported only)")
     print("• Negative age\n")
 
+    if chunksize:
+        return run_streaming(
+            INPUT_FILE, CLEANED_OUTPUT, ISSUES_REPORT,
+            lambda chunk, rows_before: customer_issues(chunk, row_offset=1 + rows_before),
+            clean_customers, chunksize, integer_columns=['age'],
+            types=CLEANED_TYPES['customers'], issues_types=ISSUES_TYPES_ROW,
+        )
+
     # ───── Load data ─────
     try:
-        df = pd.read_csv(INPUT_FILE)
+        df = read_frame(INPUT_FILE, dtype=RAW_DTYPE)
         print(f"Loaded {len(df):,} rows")
     except FileNotFoundError:
         print(f"Error: File '{INPUT_FILE}' not found.")
@@ -54,64 +72,12 @@ def validate_and_clean_customers():
         print(f"Error reading file: {e}")
         return
 
-    df = df.copy()
-
     # ───── Collect issues ─────
-    issues = []
-
-    for idx, row in df.iterrows():
-        problems = []
-
-        # 1. Name validation
-        name_raw = row.get('name')
-        name = str(name_raw).strip() if pd.notna(name_raw) else ""
-        if not name:
-            problems.append("empty name")
-        elif len(name) > 100:
-            problems.append("name too long (>100 chars)")
-        elif not is_normal_name(name):
-            problems.append("name contains unusual symbols")
-
-        # 2. Email validation
-        email = row.get('email')
-        if not is_valid_email(email):
-            problems.append("invalid or missing email")
-
-        # 3. City (report emptiness & length)
-        city_raw = row.get('city')
-        city = str(city_raw).strip() if pd.notna(city_raw) else ""
-        if not city:
-            problems.append("empty city (allowed)")
-        elif len(city) > 100:
-            problems.append("city too long (>100 chars)")
-
-        # 4. Age validation
-        age_raw = row.get('age')
-        if pd.notna(age_raw):
-            try:
-                age_num = float(age_raw)
-                if age_num < 0:
-                    problems.append("negative age")
-                if age_num != int(age_num):
-                    problems.append("non-integer age")
-            except (ValueError, TypeError):
-                problems.append("invalid age format")
-
-        if problems:
-            issues.append({
-                'row': idx + 1,
-                'name': row.get('name'),
-                'email': row.get('email'),
-                'age': row.get('age'),
-                'city': row.get('city'),
-                'issues': '; '.join(problems)
-            })
+    issues_df = customer_issues(df)
 
     # ───── Issues report ─────
-    issues_df = pd.DataFrame(issues)
-
     if not issues_df.empty:
-        issues_df.to_csv(ISSUES_REPORT, index=False)
+        write_frame(issues_df, ISSUES_REPORT, ISSUES_TYPES_ROW)
         print(f"\nFound {len(issues_df):,} rows with issues")
         print(f"Issues saved → {ISSUES_REPORT}")
         print("\nSample issues:")
@@ -121,33 +87,9 @@ def validate_and_clean_customers():
         print("No issues detected!\n")
 
     # ───── Cleaned dataset ─────
-    clean_df = df.copy()
-
-    # Remove rows with critical validation failures
-    remove_mask = (
-        clean_df['name'].isna() |
-        clean_df['name'].astype(str).str.strip().eq('') |
-        ~clean_df['name'].astype(str).apply(is_normal_name) |
-        ~clean_df['email'].apply(is_valid_email)
-    )
-
-    clean_df = clean_df[~remove_mask].copy()
-
-    # Final normalization
-    clean_df['name'] = clean_df['name'].astype(str).str.strip()
-    clean_df['city'] = clean_df['city'].fillna('').astype(str).str.strip()
-
-    # Age: only keep valid non-negative integers or None
-    clean_df['age'] = pd.to_numeric(clean_df['age'], errors='coerce')
-    clean_df['age'] = clean_df['age'].apply(
-        lambda x: int(x) if pd.notna(x) and x >= 0 and x == int(x) else None
-    )
-
-    # Enforce field length limits
-    clean_df['name'] = clean_df['name'].str[:100]
-    clean_df['city'] = clean_df['city'].str[:100]
+    clean_df = clean_customers(df)
 
-    clean_df.to_csv(CLEANED_OUTPUT, index=False)
+    write_frame(clean_df, CLEANED_OUTPUT, CLEANED_TYPES['customers'])
     print(f"Cleaned data saved → {CLEANED_OUTPUT}")
     print(f"Original : {len(df):,} rows")
     print(f"Cleaned  : {len(clean_df):,} rows")
@@ -1,85 +1,72 @@
 import pandas as pd
 from pathlib import Path
 
+from columnar import CLEANED_TYPES, ISSUES_TYPES, RAW_DTYPE, read_frame, write_frame
+from streaming import run_streaming
+from validation import PRODUCT_REJECT, PRODUCT_RULES, issues_report, rejected
+
 # Configuration - change filenames as needed
 INPUT_CSV         = "/home/andrewlo/Documents/MyProject/MyHomeWork/FakeDataProcessed/products_raw.csv"
 REPORT_ISSUES_CSV = "/home/andrewlo/Documents/MyProject/MyHomeWork/FakeDataProcessed/products_validation_issues.csv"
 CLEANED_CSV       = "/home/andrewlo/Documents/MyProject/MyHomeWork/FakeDataProcessed/products_cleaned.csv"
 
+# Rows per chunk for huge files (None = load the whole file at once)
+CHUNK_SIZE        = None
+
+
+def product_issues(df, row_offset=2):
+    """Issues report for a products DataFrame (+2: header + 1-based index)"""
+    return issues_report(df, PRODUCT_RULES, ['name', 'category', 'price'],
+                         row_column='row_number', row_offset=row_offset)
+
+
+def clean_products(df):
+    """Drop rows with critical errors and normalise the rest for the Product model"""
+    clean_df = df[~rejected(df, PRODUCT_REJECT)].copy()
+
+    # Final cleaning steps
+    clean_df['name']     = clean_df['name'].astype(str).str.strip()
+    clean_df['category'] = clean_df['category'].astype(str).str.strip()
+
+    # Convert price to proper float (ready for DecimalField)
+    clean_df['price'] = pd.to_numeric(clean_df['price'], errors='coerce').astype(float)
+
+    # Optional: round to 2 decimal places
+    clean_df['price'] = clean_df['price'].round(2)
+    return clean_df
+
 
-def validate_and_clean_products():
+def validate_and_clean_products(chunksize=CHUNK_SIZE):
     print("Product data validation & cleaning")
     print("Rules based on Django Product model:")
     print("• name     : required, non-empty, max 100 chars")
     print("• category : required, non-empty, max 100 chars")
     print("• price    : required, decimal ≥ 0\n")
 
+    if chunksize:
+        return run_streaming(
+            INPUT_CSV, CLEANED_CSV, REPORT_ISSUES_CSV,
+            lambda chunk, rows_before: product_issues(chunk, row_offset=2 + rows_before),
+            clean_products, chunksize,
+            types=CLEANED_TYPES['products'], issues_types=ISSUES_TYPES['products'],
+        )
+
     # ──────────────── Load data ────────────────
     try:
-        df = pd.read_csv(INPUT_CSV)
+        df = read_frame(INPUT_CSV, dtype=RAW_DTYPE)
         print(f"Loaded {len(df):,} rows from {INPUT_CSV}\n")
     except FileNotFoundError:
         print(f"Error: Cannot find file '{INPUT_CSV}'")
         return
     except Exception as e:
-        print(f"Error reading CSV: {e}")
+        print(f"Error reading {INPUT_CSV}: {e}")
         return
 
-    # Work on a copy
-    df = df.copy()
-
-    # ──────────────── Validation flags ────────────────
-    issues = []
-
-    for idx, row in df.iterrows():
-        problems = []
-
-        # 1. Name checks
-        name = str(row.get('name', '')).strip()
-        if not name:
-            problems.append("empty/missing name")
-        elif len(name) > 100:
-            problems.append("name too long (>100 chars)")
-
-        # 2. Category checks
-        category = str(row.get('category', '')).strip()
-        if not category:
-            problems.append("empty/missing category")
-        elif len(category) > 100:
-            problems.append("category too long (>100 chars)")
-
-        # 3. Price checks
-        price_raw = row.get('price')
-        price_valid = False
-        price_value = None
-
-        if pd.isna(price_raw):
-            problems.append("missing price")
-        else:
-            try:
-                price_value = float(price_raw)
-                if price_value < 0:
-                    problems.append("negative price")
-                else:
-                    price_valid = True
-            except (ValueError, TypeError):
-                problems.append("invalid price format")
-
-        # Record issue if any
-        if problems:
-            issues.append({
-                'row_number': idx + 2,   # +2 because header + 1-based index
-                'name': row.get('name'),
-                'category': row.get('category'),
-                'price': row.get('price'),
-                'issues': '; '.join(problems)
-            })
-
     # ──────────────── Issues report ────────────────
-    issues_df = pd.DataFrame(issues)
+    issues_df = product_issues(df)
 
     if not issues_df.empty:
-        issues_df.to_csv(REPORT_ISSUES_CSV, index=False)
+        write_frame(issues_df, REPORT_ISSUES_CSV, ISSUES_TYPES['products'])
         print(f"Found {len(issues_df):,} rows with problems")
         print(f"→ Issues report saved: {REPORT_ISSUES_CSV}")
         print("\nFirst few problematic rows:")
@@ -89,32 +76,9 @@ def validate_and_clean_products():
         print("No validation issues found!\n")
 
     # ──────────────── Cleaned dataset ────────────────
-    clean_df = df.copy()
-
-    # Remove rows with critical errors
-    invalid_mask = (
-        clean_df['name'].isna() |
-        clean_df['name'].astype(str).str.strip().eq('') |
-        clean_df['category'].isna() |
-        clean_df['category'].astype(str).str.strip().eq('') |
-        # price not valid number or negative
-        (~clean_df['price'].apply(lambda x: pd.notna(x) and str(x).replace('.', '', 1).isdigit())) |
-        (pd.to_numeric(clean_df['price'], errors='coerce') < 0)
-    )
-
-    clean_df = clean_df[~invalid_mask].copy()
-
-    # Final cleaning steps
-    clean_df['name']     = clean_df['name'].astype(str).str.strip()
-    clean_df['category'] = clean_df['category'].astype(str).str.strip()
-
-    # Convert price to proper float (ready for DecimalField)
-    clean_df['price'] = pd.to_numeric(clean_df['price'], errors='coerce')
-
-    # Optional: round to 2 decimal places
-    clean_df['price'] = clean_df['price'].round(2)
+    clean_df = clean_products(df)
 
-    clean_df.to_csv(CLEANED_CSV, index=False)
+    write_frame(clean_df, CLEANED_CSV, CLEANED_TYPES['products'])
     print(f"Cleaned data saved → {CLEANED_CSV}")
     print(f"Original rows : {len(df):,}")
     print(f"Valid rows    : {len(clean_df):,}")
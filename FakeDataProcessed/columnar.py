@@ -0,0 +1,232 @@
+import os
+import re
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # optional: CSV only
+    pa = None
+
+# ────────────────────────────────────────────────
+# File formats for the FakeDataProcessed cleaners.
+#
+# The format of a file comes from its extension:
+#   .csv                 CSV, as before;
+#   .parquet             Parquet (compressed, column-typed);
+#   .arrow / .feather    Arrow IPC file (= Feather v2), written uncompressed
+#                        so read_table() memory-maps it without copying.
+# Parquet and Arrow need pyarrow.
+#
+# Columnar outputs are written with the explicit column types below, taken
+# from the AnJuShop model fields: age stays an integer (int32, null for
+# blanks) and price a decimal(8, 2) instead of CSV's float text. Read back,
+# age is a nullable Int32 column and price holds Decimal values. Issues
+# reports keep the raw values as text, as their CSV does. The raw files' id
+# column is not validated (the loaders do not use it): it stays text, so an
+# id like "4988x" is passed through as the CSV output does.
+# ────────────────────────────────────────────────
+
+FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+# Raw CSV inputs are read as text (blank cells are still NaN). Left to
+# itself pandas picks each chunk's column types from that chunk's rows, so
+# whether a value like "1e3" passes would depend on where the file was cut.
+RAW_DTYPE = str
+
+# Types of the cleaned outputs (AnJuShop/models.py)
+CLEANED_TYPES = {
+    'customers': {'id': 'string', 'name': 'string', 'email': 'string', 'age': 'int32',
+                  'city': 'string'},
+    'products': {'name': 'string', 'category': 'string', 'price': 'decimal(8, 2)'},
+    'vendors': {'id': 'string', 'name': 'string', 'email': 'string', 'city': 'string'},
+}
+
+# Types of the issues reports: row number, raw values as text, messages
+ISSUES_TYPES = {
+    'customers': {'name': 'string', 'email': 'string', 'age': 'string', 'city': 'string',
+                  'issues': 'string'},
+    'products': {'row_number': 'int64', 'name': 'string', 'category': 'string',
+                 'price': 'string', 'issues': 'string'},
+    'vendors': {'row': 'int64', 'name': 'string', 'email': 'string', 'city': 'string',
+                'issues': 'string'},
+}
+
+
+def file_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"{path}: unknown file format (use {', '.join(FORMATS)})")
+    if FORMATS[ext] != 'csv' and pa is None:
+        raise ImportError(f"{path}: Parquet and Arrow files need pyarrow (pip install pyarrow)")
+    return FORMATS[ext]
+
+
+def with_format(path, fmt):
+    """path with the extension of fmt ('csv', 'parquet' or 'arrow')."""
+    return f"{os.path.splitext(path)[0]}.{fmt}"
+
+
+def _arrow_type(name):
+    decimal = re.fullmatch(r'decimal\((\d+), *(\d+)\)', name)
+    if decimal:
+        return pa.decimal128(int(decimal[1]), int(decimal[2]))
+    return {'string': pa.string(), 'int32': pa.int32(), 'int64': pa.int64()}[name]
+
+
+def _column(values, arrow_type):
+    if pa.types.is_string(arrow_type):
+        if values.dtype != object or not values.dropna().map(type).eq(str).all():
+            values = values.astype(str).where(values.notna())
+        return pa.array(values, type=arrow_type, from_pandas=True)
+    if pa.types.is_decimal(arrow_type):
+        # rounds to the scale; raises if a value needs more digits
+        return pc.cast(pa.array(pd.to_numeric(values), from_pandas=True), arrow_type)
+    return pa.array(values, type=arrow_type, from_pandas=True)
+
+
+def to_table(frame, types=None):
+    """frame as an Arrow table: the columns in types get that type, the rest are inferred."""
+    types = types or {}
+    columns = {}
+    for name in frame.columns:
+        if name in types:
+            columns[name] = _column(frame[name], _arrow_type(types[name]))
+        else:
+            columns[name] = pa.array(frame[name], from_pandas=True)
+    return pa.table(columns)
+
+
+def to_frame(table):
+    # nullable integers stay integers (pandas would turn them into floats)
+    return table.to_pandas(types_mapper={pa.int32(): pd.Int32Dtype(),
+                                         pa.int64(): pd.Int64Dtype()}.get)
+
+
+# ────────────────────────────────────────────────
+# Reading
+# ────────────────────────────────────────────────
+
+def read_table(path):
+    """
+    Arrow table of a Parquet or Arrow file. Arrow files are memory-mapped:
+    the table's buffers are the file's pages, nothing is copied or parsed.
+    """
+    if file_format(path) == 'parquet':
+        return pq.read_table(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def read_frame(path, dtype=None):
+    """The whole file as a DataFrame. dtype is for CSV; Parquet and Arrow files carry their types."""
+    if file_format(path) == 'csv':
+        return pd.read_csv(path, dtype=dtype)
+    return to_frame(read_table(path))
+
+
+def row_count(path):
+    if file_format(path) == 'parquet':
+        return pq.ParquetFile(path).metadata.num_rows
+    return read_table(path).num_rows
+
+
+def read_rows(path, start, stop):
+    """Rows start..stop-1 of a Parquet or Arrow file, numbered from start."""
+    if file_format(path) == 'parquet':
+        parquet = pq.ParquetFile(path)
+        groups, first, offset = [], None, 0
+        for group in range(parquet.num_row_groups):
+            rows = parquet.metadata.row_group(group).num_rows
+            if offset < stop and offset + rows > start:
+                groups.append(group)
+                first = offset if first is None else first
+            offset += rows
+        table = parquet.read_row_groups(groups) if groups else parquet.schema_arrow.empty_table()
+        table = table.slice(start - (first or 0), stop - start)
+    else:
+        table = read_table(path).slice(start, stop - start)
+    frame = to_frame(table)
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    return frame
+
+
+@contextmanager
+def read_chunks(path, chunksize, dtype=None):
+    """Frames of chunksize rows, numbered on from one chunk to the next (like read_csv's)."""
+    if file_format(path) == 'csv':
+        with pd.read_csv(path, chunksize=chunksize, dtype=dtype) as reader:
+            yield reader
+        return
+
+    def chunks():
+        total = row_count(path)
+        for start in range(0, total, chunksize):
+            yield read_rows(path, start, min(start + chunksize, total))
+    yield chunks()
+
+
+# ────────────────────────────────────────────────
+# Writing
+# ────────────────────────────────────────────────
+
+def write_frame(frame, path, types=None):
+    with FrameWriter(path, types) as writer:
+        writer.write(frame)
+
+
+def concat_tables(paths, output_file):
+    """Write the Parquet or Arrow files in paths (same columns) one after the other to output_file."""
+    with FrameWriter(output_file) as writer:
+        for path in paths:
+            writer.write_table(read_table(path))
+
+
+class FrameWriter:
+    """
+    Append frames to one output file. The file is created on the first
+    write, with the column types of types (the first frame decides the
+    others'); later frames are converted to the same schema.
+    """
+
+    def __init__(self, path, types=None):
+        self.path = path
+        self.types = types
+        self.format = file_format(path)
+        self.started = False
+        self.schema = None
+        self._writer = None
+
+    def write(self, frame):
+        if self.format == 'csv':
+            frame.to_csv(self.path, mode='a' if self.started else 'w',
+                         header=not self.started, index=False)
+            self.started = True
+            return
+        self.write_table(to_table(frame, self.types))
+
+    def write_table(self, table):
+        if self._writer is None:
+            self.schema = table.schema
+            if self.format == 'parquet':
+                self._writer = pq.ParquetWriter(self.path, self.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, self.schema)
+        elif table.schema != self.schema:
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+        self.started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,239 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+from columnar import CLEANED_TYPES, ISSUES_TYPES, RAW_DTYPE, read_frame, write_frame
+from validation import (CUSTOMER_SUMMARY_RULES, PRODUCT_RULES, VENDOR_RULES, Columns,
+                        issue_messages)
+
+# ────────────────────────────────────────────────
+# Incremental (delta) cleaning.
+#
+# Each run keeps per input row a 64-bit hash of its content, its issues
+# message and its position in the cleaned output, plus a hash per cleaned
+# row for the delta. State lives in
+# <state dir>/<entity>.index.npz, with the cleaned rows in
+# <entity>.cleaned.pkl.
+#
+# The next run hashes the new file and validates only the rows whose hash
+# it has not seen. Unchanged rows take their previous verdict and cleaned
+# values. The outputs are the same as a full run's:
+# - the cleaned file (CSV, Parquet or Arrow, see columnar.py);
+# - the issues report, with row numbers of the new file;
+# - <entity>_delta.csv: the cleaned rows to 'insert', 'update' or 'delete'
+#   since the previous run, matched on the column the loader matches on
+#   (`manage.py load_anjushop --delta`).
+#
+# Verdicts only depend on the row itself. CSV inputs are read as text;
+# when the column types of a Parquet or Arrow input change, every row is
+# validated again.
+# ────────────────────────────────────────────────
+
+# What the issues reports hold, as each cleaner's find_issues builds them
+REPORTS = {
+    'customers': {'key': 'email', 'rules': CUSTOMER_SUMMARY_RULES,
+                  'columns': ['name', 'email', 'age', 'city'], 'row_offset': None},
+    'products': {'key': 'name', 'rules': PRODUCT_RULES,
+                 'columns': ['name', 'category', 'price'], 'row_offset': 2},
+    'vendors': {'key': 'email', 'rules': VENDOR_RULES,
+                'columns': ['name', 'email', 'city'], 'row_offset': 1},
+}
+
+STATE_DIR = '.clean_state'
+
+
+def row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _schema(df):
+    return np.array([f'{column}:{dtype}' for column, dtype in df.dtypes.items()])
+
+
+def delta_path(entity):
+    spec = pipeline.ENTITIES[entity]
+    return os.path.join(os.path.dirname(spec['clean']), f'{entity}_delta.csv')
+
+
+def _state_paths(state_dir, entity):
+    return (os.path.join(state_dir, f'{entity}.index.npz'),
+            os.path.join(state_dir, f'{entity}.cleaned.pkl'))
+
+
+def load_state(state_dir, entity):
+    index_path, cleaned_path = _state_paths(state_dir, entity)
+    if not (os.path.exists(index_path) and os.path.exists(cleaned_path)):
+        return None
+    with np.load(index_path, allow_pickle=False) as index:
+        state = {name: index[name] for name in index.files}
+    state['cleaned'] = pd.read_pickle(cleaned_path)
+    return state
+
+
+def save_state(state_dir, entity, hashes, schema, messages, clean_positions, cleaned, cleaned_hashes):
+    os.makedirs(state_dir, exist_ok=True)
+    index_path, cleaned_path = _state_paths(state_dir, entity)
+    codes, texts = pd.factorize(messages)  # NaN -> -1
+    np.savez(index_path, row_hash=hashes, schema=schema, message_code=codes.astype(np.int32),
+             messages=np.asarray(texts, dtype=str), clean_position=clean_positions,
+             cleaned_hash=cleaned_hashes)
+    cleaned.to_pickle(cleaned_path)
+
+
+def _match(previous_hashes, hashes):
+    """Index of each row in the previous run (-1 for new or changed rows)."""
+    seen, first = np.unique(previous_hashes, return_index=True)
+    at = np.minimum(np.searchsorted(seen, hashes), max(len(seen) - 1, 0))
+    found = (seen[at] == hashes) if len(seen) else np.zeros(len(hashes), dtype=bool)
+    return np.where(found, first[at] if len(seen) else -1, -1)
+
+
+def _integer_columns(frame, columns):
+    for column in columns:
+        if column in frame.columns:
+            frame[column] = frame[column].astype('Int64')
+    return frame
+
+
+def _report(entity, df, messages):
+    """The issues report for df, given every row's message (NaN = no issues)."""
+    has_issue = pd.notna(messages)
+    if not has_issue.any():
+        return pd.DataFrame()
+    report = REPORTS[entity]
+    rows = df.index[has_issue]
+    frame = pd.DataFrame(index=rows)
+    row_column = pipeline.ENTITIES[entity]['row_column']
+    if row_column:
+        frame[row_column] = np.flatnonzero(has_issue) + report['row_offset']
+    cols = Columns(df)
+    for column in report['columns']:
+        frame[column] = cols.raw(column).loc[rows]
+    frame['issues'] = messages[has_issue]
+    return frame.reset_index(drop=True).infer_objects()
+
+
+def delta(previous, previous_hashes, cleaned, hashes, key):
+    """
+    Cleaned rows to apply since `previous`, with an 'op' column: inserts
+    and updates in file order, then deletes. hashes are the rows' content
+    hashes. Rows sharing a key count once (the last, as the loaders keep it).
+    """
+    before = ~previous[key].duplicated(keep='last').to_numpy()
+    after = ~cleaned[key].duplicated(keep='last').to_numpy()
+    keys = pd.Index(previous[key].to_numpy()[before])
+    at = keys.get_indexer(cleaned[key].to_numpy()[after])
+    new = at < 0
+    changed = new.copy()
+    changed[~new] = previous_hashes[before][at[~new]] != hashes[after][~new]
+    upserts = cleaned.iloc[np.flatnonzero(after)[changed]].assign(
+        op=np.where(new[changed], 'insert', 'update'))
+    gone = ~keys.isin(cleaned[key].to_numpy()[after])
+    deletes = previous.iloc[np.flatnonzero(before)[gone]].assign(op='delete')
+    return pd.concat([upserts, deletes], ignore_index=True)[['op', *cleaned.columns]]
+
+
+def clean_incremental(entity, state_dir, full=False):
+    """
+    Clean one entity, revalidating only the rows that changed since the
+    last run. Returns counts of rows, validated, cleaned, issues, insert,
+    update and delete.
+    """
+    spec = pipeline.ENTITIES[entity]
+    report = REPORTS[entity]
+    df = read_frame(spec['input'], dtype=RAW_DTYPE)
+    hashes = row_hashes(df)
+    schema = _schema(df)
+
+    state = None if full else load_state(state_dir, entity)
+    if state is not None and np.array_equal(state['schema'], schema):
+        previous_rows = _match(state['row_hash'], hashes)
+    else:
+        previous_rows = np.full(len(df), -1)
+    carried = previous_rows >= 0
+    changed = df[~carried]
+
+    # ───── Validate the new and changed rows ─────
+    messages = np.full(len(df), np.nan, dtype=object)
+    new_messages = issue_messages(changed, report['rules'])
+    messages[df.index.get_indexer(new_messages.index)] = new_messages.to_numpy()
+    new_cleaned = _integer_columns(spec['clean_fn'](changed), spec['integer_columns'])
+
+    # ───── Carry the previous verdicts of the others ─────
+    parts = [new_cleaned] if len(new_cleaned) else []
+    part_hashes = [pd.Series(row_hashes(new_cleaned), index=new_cleaned.index)] if parts else []
+    if carried.any():
+        codes = state['message_code'][previous_rows[carried]]
+        texts = state['messages'].astype(object)[np.maximum(codes, 0)]
+        texts[codes < 0] = np.nan
+        messages[carried] = texts
+        positions = state['clean_position'][previous_rows[carried]]
+        kept = positions >= 0
+        previous_cleaned = state['cleaned'].iloc[positions[kept]]
+        previous_cleaned.index = df.index[carried][kept]
+        parts.insert(0, previous_cleaned)
+        part_hashes.insert(0, pd.Series(state['cleaned_hash'][positions[kept]],
+                                        index=previous_cleaned.index))
+    # sorted the same way, so hashes stay aligned with their rows
+    cleaned = pd.concat(parts).sort_index(kind='stable') if parts else new_cleaned
+    cleaned = _integer_columns(cleaned, spec['integer_columns'])
+    cleaned_hashes = (pd.concat(part_hashes).sort_index(kind='stable').to_numpy() if part_hashes
+                      else np.zeros(0, dtype=np.uint64))
+
+    # ───── Outputs ─────
+    write_frame(cleaned, spec['clean'], CLEANED_TYPES[entity])
+    issues = _report(entity, df, messages)
+    if not issues.empty:
+        write_frame(issues, spec['issues'], ISSUES_TYPES[entity])
+    elif os.path.exists(spec['issues']):
+        os.remove(spec['issues'])
+    if state is not None:
+        changes = delta(state['cleaned'], state['cleaned_hash'], cleaned, cleaned_hashes, report['key'])
+    else:
+        changes = delta(cleaned.head(0), cleaned_hashes[:0], cleaned, cleaned_hashes, report['key'])
+    changes.to_csv(delta_path(entity), index=False)
+
+    clean_positions = np.full(len(df), -1, dtype=np.int64)
+    clean_positions[cleaned.index.to_numpy()] = np.arange(len(cleaned))
+    save_state(state_dir, entity, hashes, schema, messages, clean_positions,
+               cleaned.reset_index(drop=True), cleaned_hashes)
+
+    ops = changes['op'].value_counts()
+    return {'rows': len(df), 'validated': len(changed), 'cleaned': len(cleaned),
+            'issues': len(issues), **{op: int(ops.get(op, 0)) for op in ('insert', 'update', 'delete')}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean only what changed since the last run")
+    parser.add_argument('entities', nargs='*', metavar='entity',
+                        help=f"entities to clean: {', '.join(pipeline.ENTITIES)} (default: all)")
+    parser.add_argument('--data-dir', help="read *_raw.csv and write outputs in this folder "
+                                           "instead of the paths configured in each cleaner")
+    parser.add_argument('--state-dir', help=f"where the row index is kept "
+                                            f"(default: {STATE_DIR} next to the outputs)")
+    parser.add_argument('--full', action='store_true',
+                        help="validate every row (and rebuild the index)")
+    pipeline.add_format_arguments(parser)
+    args = parser.parse_args()
+    unknown = set(args.entities) - set(pipeline.ENTITIES)
+    if unknown:
+        parser.error(f"unknown entity: {', '.join(sorted(unknown))}")
+    pipeline.configure_paths(args)
+
+    for entity in args.entities or pipeline.ENTITIES:
+        state_dir = args.state_dir or os.path.join(
+            os.path.dirname(pipeline.ENTITIES[entity]['clean']), STATE_DIR)
+        started = time.perf_counter()
+        totals = clean_incremental(entity, state_dir, full=args.full)
+        print(f"{entity:<10} {totals['rows']:>12,} rows  {totals['validated']:>10,} validated  "
+              f"{totals['issues']:>8,} issues  +{totals['insert']:,} ~{totals['update']:,} "
+              f"-{totals['delete']:,}  ({time.perf_counter() - started:.1f}s)")
+        print(f"           → {delta_path(entity)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import Customer_Data_Clean
+import Product_Data_Clean
+import Vendors
+from columnar import (CLEANED_TYPES, FORMATS, ISSUES_TYPES, RAW_DTYPE, concat_tables,
+                      file_format, read_rows, row_count, with_format, write_frame)
+
+# ────────────────────────────────────────────────
+# Parallel cleaning pipeline for customers, products and vendors.
+#
+# Every input file is cut into byte-range partitions on line boundaries.
+# All partitions of all three files go into one ProcessPoolExecutor, so the
+# entities are cleaned concurrently and large files use every core.
+# Outputs are merged back in partition order, i.e. the original row order.
+#
+# Partitions are cut at newlines, so quoted fields must not contain line
+# breaks (true for all of our supplier exports). Parquet and Arrow inputs
+# are cut into row ranges of about the same size instead, and outputs can
+# be CSV, Parquet or Arrow (see columnar.py).
+# ────────────────────────────────────────────────
+
+PARTITION_BYTES = 64 * 1024 * 1024
+
+ENTITIES = {
+    'customers': {
+        'input': Customer_Data_Clean.INPUT_CSV,
+        'clean': Customer_Data_Clean.OUTPUT_CLEAN_CSV,
+        'issues': Customer_Data_Clean.OUTPUT_ISSUES_CSV,
+        'find_issues': Customer_Data_Clean.customer_summary_issues,
+        'clean_fn': Customer_Data_Clean.clean_customer_data,
+        'row_column': None,
+        'integer_columns': ['age'],
+    },
+    'products': {
+        'input': Product_Data_Clean.INPUT_CSV,
+        'clean': Product_Data_Clean.CLEANED_CSV,
+        'issues': Product_Data_Clean.REPORT_ISSUES_CSV,
+        'find_issues': Product_Data_Clean.product_issues,
+        'clean_fn': Product_Data_Clean.clean_products,
+        'row_column': 'row_number',
+        'integer_columns': [],
+    },
+    'vendors': {
+        'input': Vendors.INPUT_FILE,
+        'clean': Vendors.CLEANED_OUTPUT,
+        'issues': Vendors.ISSUES_REPORT,
+        'find_issues': Vendors.vendor_issues,
+        'clean_fn': Vendors.clean_vendors,
+        'row_column': 'row',
+        'integer_columns': [],
+    },
+}
+
+
+def partition_file(path, partition_bytes=PARTITION_BYTES, min_partitions=1):
+    """
+    Return (header, [(start, end), ...]) byte ranges covering the data rows of
+    path. Every range starts at the beginning of a line and ends after a newline
+    (or at end of file).
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        data_start = f.tell()
+        data_size = size - data_start
+        if data_size <= 0:
+            return header, []
+
+        count = max(min_partitions, -(-data_size // partition_bytes))
+        step = max(1, data_size // count)
+        ranges = []
+        start = data_start
+        while start < size:
+            f.seek(min(start + step, size))
+            if f.tell() < size:
+                f.readline()  # move to the start of the next line
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return header, ranges
+
+
+def partition_rows(path, partition_bytes=PARTITION_BYTES, min_partitions=1):
+    """
+    partition_file() for Parquet and Arrow inputs: (None, [(start, stop), ...])
+    row ranges, as many as the file's size in partitions (at least min_partitions).
+    """
+    rows = row_count(path)
+    if not rows:
+        return None, []
+    count = min(rows, max(min_partitions, -(-os.path.getsize(path) // partition_bytes)))
+    bounds = [rows * n // count for n in range(count + 1)]
+    return None, list(zip(bounds[:-1], bounds[1:]))
+
+
+def clean_partition(entity, path, header, start, end, part_file):
+    """
+    Worker: validate and clean one byte range of one entity file (row range
+    for Parquet and Arrow inputs, where header is None).
+    The cleaned rows are written to part_file; the (usually small) issues
+    report is returned with partition-local row numbers.
+    """
+    spec = ENTITIES[entity]
+    if header is None:
+        df = read_rows(path, start, end).reset_index(drop=True)
+    else:
+        with open(path, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        df = pd.read_csv(io.BytesIO(header + data), dtype=RAW_DTYPE)
+
+    issues_df = spec['find_issues'](df)
+    clean_df = spec['clean_fn'](df)
+    for column in spec['integer_columns']:
+        if column in clean_df.columns:
+            clean_df[column] = clean_df[column].astype('Int64')
+    write_frame(clean_df, part_file, CLEANED_TYPES[entity])
+    return len(df), len(clean_df), issues_df
+
+
+def _concat_parts(part_files, output_file):
+    """Concatenate the part files into output_file, keeping only the first CSV header."""
+    if file_format(output_file) != 'csv':
+        return concat_tables(part_files, output_file)
+    with open(output_file, 'wb') as out:
+        for i, part in enumerate(part_files):
+            with open(part, 'rb') as f:
+                if i:
+                    f.readline()
+                shutil.copyfileobj(f, out, 1024 * 1024)
+
+
+def run_pipeline(entities=None, workers=None, partition_bytes=PARTITION_BYTES):
+    """
+    Clean the given entities (default: all) in parallel.
+    Returns {entity: {'rows', 'cleaned', 'issues', 'partitions'}}.
+    """
+    entities = entities or list(ENTITIES)
+    workers = workers or os.cpu_count() or 1
+    summary = {}
+
+    with tempfile.TemporaryDirectory(prefix='clean_pipeline_') as tmp, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+
+        # ───── Submit every partition of every entity ─────
+        jobs = {}
+        for entity in entities:
+            spec = ENTITIES[entity]
+            partition = partition_file if file_format(spec['input']) == 'csv' else partition_rows
+            header, ranges = partition(spec['input'], partition_bytes, workers)
+            extension = os.path.splitext(spec['clean'])[1]
+            jobs[entity] = []
+            for n, (start, end) in enumerate(ranges):
+                part_file = os.path.join(tmp, f'{entity}_{n:05d}{extension}')
+                future = pool.submit(clean_partition, entity, spec['input'], header,
+                                     start, end, part_file)
+                jobs[entity].append((part_file, future))
+
+        # ───── Merge in partition order (= original row order) ─────
+        for entity in entities:
+            spec = ENTITIES[entity]
+            rows = cleaned = 0
+            reports = []
+            for part_file, future in jobs[entity]:
+                part_rows, part_cleaned, issues_df = future.result()
+                if not issues_df.empty:
+                    if spec['row_column']:
+                        issues_df[spec['row_column']] += rows
+                    reports.append(issues_df)
+                rows += part_rows
+                cleaned += part_cleaned
+
+            _concat_parts([part for part, _ in jobs[entity]], spec['clean'])
+            issues = 0
+            if reports:
+                issues_df = pd.concat(reports, ignore_index=True)
+                write_frame(issues_df, spec['issues'], ISSUES_TYPES[entity])
+                issues = len(issues_df)
+            summary[entity] = {'rows': rows, 'cleaned': cleaned, 'issues': issues,
+                               'partitions': len(jobs[entity])}
+    return summary
+
+
+def add_format_arguments(parser):
+    formats = sorted(set(FORMATS.values()))
+    parser.add_argument('--input-format', choices=formats,
+                        help="read <entity>_raw.<format> instead of the configured input")
+    parser.add_argument('--format', choices=formats,
+                        help="write the cleaned and issues files in this format "
+                             "(parquet and arrow need pyarrow)")
+
+
+def configure_paths(args):
+    """Point ENTITIES at --data-dir and the --input-format / --format files."""
+    for spec in ENTITIES.values():
+        if args.data_dir:
+            for key in ('input', 'clean', 'issues'):
+                spec[key] = os.path.join(args.data_dir, os.path.basename(spec[key]))
+        if args.input_format:
+            spec['input'] = with_format(spec['input'], args.input_format)
+        if args.format:
+            for key in ('clean', 'issues'):
+                spec[key] = with_format(spec[key], args.format)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean customers, products and vendors in parallel")
+    parser.add_argument('entities', nargs='*', metavar='entity',
+                        help=f"entities to clean: {', '.join(ENTITIES)} (default: all)")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--partition-mb', type=int, default=PARTITION_BYTES // (1024 * 1024),
+                        help="target partition size in MB")
+    parser.add_argument('--data-dir', help="read *_raw.csv and write outputs in this folder "
+                                           "instead of the paths configured in each cleaner")
+    add_format_arguments(parser)
+    args = parser.parse_args()
+    unknown = set(args.entities) - set(ENTITIES)
+    if unknown:
+        parser.error(f"unknown entity: {', '.join(sorted(unknown))}")
+    configure_paths(args)
+
+    started = time.perf_counter()
+    summary = run_pipeline(args.entities, args.workers, args.partition_mb * 1024 * 1024)
+    elapsed = time.perf_counter() - started
+
+    for entity, totals in summary.items():
+        print(f"{entity:<10} {totals['rows']:>12,} rows  {totals['cleaned']:>12,} cleaned  "
+              f"{totals['issues']:>10,} issues  ({totals['partitions']} partitions)")
+        print(f"           → {ENTITIES[entity]['clean']}")
+    total_rows = sum(totals['rows'] for totals in summary.values())
+    print(f"\nDone in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
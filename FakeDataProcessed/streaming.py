@@ -0,0 +1,95 @@
+import os
+
+from columnar import RAW_DTYPE, FrameWriter, read_chunks
+
+# ────────────────────────────────────────────────
+# Chunked (streaming) driver for the FakeDataProcessed cleaners.
+#
+# The input is read `chunksize` rows at a time; each chunk is validated,
+# cleaned and appended to the output files before the next one is read,
+# so memory use depends on the chunk size and not on the file size.
+# Inputs and outputs can be CSV, Parquet or Arrow (see columnar.py).
+# ────────────────────────────────────────────────
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def stream_clean(input_file, clean_file, issues_file, find_issues, clean,
+                 chunksize=DEFAULT_CHUNK_SIZE, integer_columns=(), verbose=True,
+                 types=None, issues_types=None):
+    """
+    Validate and clean input_file chunk by chunk.
+
+    find_issues(chunk, rows_before) → issues DataFrame for one chunk, where
+        rows_before is the number of data rows in earlier chunks (use it to
+        keep row numbers in the report relative to the whole file).
+    clean(chunk) → cleaned DataFrame for one chunk.
+    integer_columns are written as nullable integers, so every chunk uses the
+        same format whether or not it happens to contain blanks.
+    types / issues_types are the column types of columnar outputs
+        (columnar.CLEANED_TYPES / ISSUES_TYPES).
+
+    Returns a dict with rows / issues / cleaned counts.
+    """
+    totals = {'rows': 0, 'issues': 0, 'cleaned': 0, 'chunks': 0}
+
+    # Start from an empty cleaned file; the issues file is only created
+    # once there is something to report (same as the non-streaming mode)
+    if os.path.exists(clean_file):
+        os.remove(clean_file)
+
+    with read_chunks(input_file, chunksize, dtype=RAW_DTYPE) as reader, \
+            FrameWriter(clean_file, types) as clean_out, \
+            FrameWriter(issues_file, issues_types) as issues_out:
+        for chunk in reader:
+            issues_df = find_issues(chunk, totals['rows'])
+            if not issues_df.empty:
+                issues_out.write(issues_df)
+                totals['issues'] += len(issues_df)
+
+            clean_df = clean(chunk)
+            for column in integer_columns:
+                if column in clean_df.columns:
+                    clean_df[column] = clean_df[column].astype('Int64')
+            clean_out.write(clean_df)
+            totals['cleaned'] += len(clean_df)
+
+            totals['rows'] += len(chunk)
+            totals['chunks'] += 1
+            if verbose:
+                print(f"  chunk {totals['chunks']:,}: {totals['rows']:,} rows read, "
+                      f"{totals['issues']:,} issues so far")
+
+    return totals
+
+
+def run_streaming(input_file, clean_file, issues_file, find_issues, clean,
+                  chunksize=DEFAULT_CHUNK_SIZE, integer_columns=(), types=None, issues_types=None):
+    """stream_clean() with the progress and summary printing of the CLI scripts."""
+    print(f"Streaming {input_file} in chunks of {chunksize:,} rows")
+    try:
+        totals = stream_clean(input_file, clean_file, issues_file, find_issues, clean,
+                              chunksize=chunksize, integer_columns=integer_columns,
+                              types=types, issues_types=issues_types)
+    except FileNotFoundError:
+        print(f"Error: File '{input_file}' not found.")
+        return None
+    except Exception as e:
+        print(f"Error reading {input_file}: {e}")
+        return None
+    print_totals(totals, clean_file, issues_file)
+    return totals
+
+
+def print_totals(totals, clean_file, issues_file):
+    """Summary in the same shape as the whole-file cleaners print."""
+    print()
+    if totals['issues']:
+        print(f"Found {totals['issues']:,} rows with issues")
+        print(f"Issues report saved → {issues_file}")
+    else:
+        print("No data quality issues found!")
+    print(f"Cleaned data saved → {clean_file}")
+    print(f"Original rows : {totals['rows']:,}")
+    print(f"Cleaned rows  : {totals['cleaned']:,}")
+    print(f"Removed       : {totals['rows'] - totals['cleaned']:,} rows")
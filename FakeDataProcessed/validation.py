@@ -0,0 +1,318 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# ────────────────────────────────────────────────
+# Shared, column-wise validation engine for the FakeDataProcessed cleaners.
+#
+# A rule set is a list whose items are either
+#   • a (message, test) pair, or
+#   • a list of (message, test) pairs that behaves like an if/elif chain:
+#     a row only receives the first message of the chain that it fails.
+# A test takes a Columns object and returns a boolean Series (True = problem).
+# Every test works on whole columns, so a full file is validated in one pass.
+# ────────────────────────────────────────────────
+
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+# Letters (any language), space, hyphen, apostrophe.
+# Python's re has no \p{L}; [^\W\d_] is the same "any unicode letter" class.
+NAME_PATTERN = r"^(?:[^\W\d_]|[\s'-])+$"
+
+MAX_LENGTH = 100
+
+
+class Columns:
+    """
+    Memoised column transforms for one validation pass, so the stripped text
+    or parsed numbers of a column are only computed once for all the rules.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._cache = {}
+
+    def _memo(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def raw(self, column):
+        """Column as read, or all-missing if the file does not have it."""
+        if column in self.df.columns:
+            return self.df[column]
+        return pd.Series(np.nan, index=self.df.index, dtype=object)
+
+    def text(self, column, missing=''):
+        """
+        Stripped text of a column.
+        missing=''    → NaN becomes ''    (like: str(x).strip() if pd.notna(x) else '')
+        missing=None  → NaN becomes 'nan' (like: str(x).strip())
+        """
+        def compute():
+            values = self.raw(column)
+            if missing is None:
+                return values.astype(str).str.strip()
+            return values.where(values.notna(), missing).astype(str).str.strip()
+        return self._memo(('text', column, missing), compute)
+
+    def strings(self, column):
+        """Stripped value where the cell is a real string, NaN everywhere else."""
+        def compute():
+            values = self.raw(column)
+            if values.dtype != object and not pd.api.types.is_string_dtype(values):
+                return pd.Series(np.nan, index=values.index, dtype=object)
+            return values.where(values.map(type) == str).str.strip()
+        return self._memo(('strings', column), compute)
+
+    def number(self, column):
+        """
+        (values, unparsable) for a column parsed the way float() would parse
+        each cell. unparsable is True where a non-missing cell is not a number.
+        """
+        def compute():
+            values = self.raw(column)
+            if pd.api.types.is_numeric_dtype(values) and values.dtype != bool:
+                numbers = values.astype(float)
+                return numbers, pd.Series(False, index=values.index)
+            numbers = pd.to_numeric(values, errors='coerce')
+            # Only the few cells pandas could not coerce go through float()
+            retry = numbers.isna() & values.notna()
+            unparsable = pd.Series(False, index=values.index)
+            for idx, cell in values[retry].items():
+                try:
+                    numbers.at[idx] = float(cell)
+                except (ValueError, TypeError):
+                    unparsable.at[idx] = True
+            return numbers.astype(float), unparsable
+        return self._memo(('number', column), compute)
+
+
+# ────────────────────────────────────────────────
+# Test builders
+# ────────────────────────────────────────────────
+
+def is_missing(column):
+    return lambda cols: cols.raw(column).isna()
+
+
+def is_blank(column, missing=''):
+    return lambda cols: cols.text(column, missing).eq('')
+
+
+def is_too_long(column, limit=MAX_LENGTH, missing=''):
+    return lambda cols: cols.text(column, missing).str.len() > limit
+
+
+def fails_pattern(column, pattern, missing=''):
+    regex = re.compile(pattern)
+    return lambda cols: ~cols.text(column, missing).str.match(regex).astype(bool)
+
+
+def is_bad_email(column):
+    regex = re.compile(EMAIL_PATTERN)
+    return lambda cols: ~cols.strings(column).str.match(regex, na=False).astype(bool)
+
+
+def is_unparsable(column):
+    return lambda cols: cols.number(column)[1]
+
+
+def is_negative(column):
+    return lambda cols: cols.number(column)[0] < 0
+
+
+def is_not_integer(column):
+    def test(cols):
+        numbers = cols.number(column)[0]
+        finite = np.isfinite(numbers)
+        return finite & (numbers % 1 != 0)
+    return test
+
+
+def is_not_finite(column):
+    def test(cols):
+        numbers, unparsable = cols.number(column)
+        return cols.raw(column).notna() & (unparsable | ~np.isfinite(numbers))
+    return test
+
+
+def either(*tests):
+    return lambda cols: np.logical_or.reduce([test(cols) for test in tests])
+
+
+# ────────────────────────────────────────────────
+# Evaluation
+# ────────────────────────────────────────────────
+
+def evaluate(df, rules, cols=None):
+    """Return [(message, mask), ...] in rule order, with if/elif chains resolved."""
+    cols = cols if cols is not None else Columns(df)
+    results = []
+    for item in rules:
+        chain = item if isinstance(item, list) else [item]
+        taken = pd.Series(False, index=df.index)
+        for message, test in chain:
+            mask = pd.Series(test(cols), index=df.index).astype(bool) & ~taken
+            taken |= mask
+            results.append((message, mask))
+    return results
+
+
+def rejected(df, tests, cols=None):
+    """Boolean mask of rows that fail any of the given critical tests."""
+    cols = cols if cols is not None else Columns(df)
+    mask = pd.Series(False, index=df.index)
+    for test in tests:
+        mask |= pd.Series(test(cols), index=df.index).astype(bool)
+    return mask
+
+
+def issue_messages(df, rules, cols=None):
+    """'; '-joined messages for every row failing at least one rule."""
+    results = evaluate(df, rules, cols)
+    if not results:
+        return pd.Series([], index=df.index[:0], dtype=object)
+
+    any_issue = np.logical_or.reduce([mask.to_numpy() for _, mask in results])
+    joined = np.full(int(any_issue.sum()), '', dtype=object)
+    for message, mask in results:
+        hit = mask.to_numpy()[any_issue]
+        joined[hit] = joined[hit] + message + '; '
+    joined = np.array([text[:-2] for text in joined], dtype=object)
+    return pd.Series(joined, index=df.index[any_issue], dtype=object)
+
+
+def issues_report(df, rules, columns, row_column=None, row_offset=1, cols=None):
+    """
+    Build the issues report DataFrame: one row per problem record with the
+    original values of `columns` and an 'issues' column.
+    row_column (optional) is filled with the position in df + row_offset.
+    """
+    messages = issue_messages(df, rules, cols)
+    if messages.empty:
+        return pd.DataFrame()
+
+    positions = df.index.get_indexer(messages.index)
+    report = pd.DataFrame(index=messages.index)
+    if row_column:
+        report[row_column] = positions + row_offset
+    cols = cols if cols is not None else Columns(df)
+    for column in columns:
+        report[column] = cols.raw(column).loc[messages.index]
+    report['issues'] = messages
+    # Same column dtypes as building the frame from a list of row dicts
+    return report.reset_index(drop=True).infer_objects()
+
+
+def integers_or_none(values):
+    """
+    Keep non-negative whole numbers, blank out everything else.
+    Matches Series.apply(lambda x: int(x) if ... else None): whole-number
+    columns stay int64, and any blank turns the column into float64.
+    """
+    numbers = pd.to_numeric(values, errors='coerce').astype(float)
+    valid = np.isfinite(numbers) & (numbers >= 0) & (numbers % 1 == 0)
+    numbers = numbers.where(valid)
+    if len(numbers) and valid.all():
+        return numbers.astype('int64')
+    return numbers
+
+
+# ────────────────────────────────────────────────
+# Rule sets, one per Django model (see AnJuShop/models.py)
+# ────────────────────────────────────────────────
+
+CUSTOMER_RULES = [
+    [
+        ("empty name", is_blank('name')),
+        ("name too long (>100 chars)", is_too_long('name')),
+        ("name contains unusual symbols", fails_pattern('name', NAME_PATTERN)),
+    ],
+    ("invalid or missing email", is_bad_email('email')),
+    [
+        ("empty city (allowed)", is_blank('city')),
+        ("city too long (>100 chars)", is_too_long('city')),
+    ],
+    [
+        ("invalid age format", is_not_finite('age')),
+        ("negative age", is_negative('age')),
+    ],
+    ("non-integer age", is_not_integer('age')),
+]
+
+# Rows failing any of these cannot be saved as a Customer
+CUSTOMER_REJECT = [
+    is_missing('name'),
+    is_blank('name'),
+    fails_pattern('name', NAME_PATTERN, missing=None),
+    is_bad_email('email'),
+]
+
+def _coerced_age(cols):
+    # Customer_Data_Clean.py coerces with pandas only, no float() retry
+    return cols._memo(('coerced', 'age'), lambda: pd.to_numeric(cols.raw('age'), errors='coerce'))
+
+
+# Report wording used by Customer_Data_Clean.py
+CUSTOMER_SUMMARY_RULES = [
+    ("Empty name", either(is_missing('name'), is_blank('name', missing=None))),
+    ("Invalid or empty email", is_bad_email('email')),
+    ("Empty city", either(is_missing('city'), is_blank('city', missing=None))),
+    ("Negative age", lambda cols: _coerced_age(cols) < 0),
+    ("Non-integer age", lambda cols: _coerced_age(cols).notna() & (_coerced_age(cols) % 1 != 0)),
+]
+
+CUSTOMER_SUMMARY_REJECT = [
+    is_missing('name'),
+    is_blank('name', missing=None),
+    is_bad_email('email'),
+]
+
+PRODUCT_RULES = [
+    [
+        ("empty/missing name", is_blank('name', missing=None)),
+        ("name too long (>100 chars)", is_too_long('name', missing=None)),
+    ],
+    [
+        ("empty/missing category", is_blank('category', missing=None)),
+        ("category too long (>100 chars)", is_too_long('category', missing=None)),
+    ],
+    [
+        ("missing price", is_missing('price')),
+        ("invalid price format", is_unparsable('price')),
+        ("negative price", is_negative('price')),
+    ],
+]
+
+
+def _price_not_plain_decimal(cols):
+    # Same test as: not (pd.notna(x) and str(x).replace('.', '', 1).isdigit())
+    digits = cols.raw('price').astype(str).str.replace('.', '', n=1, regex=False)
+    return cols.raw('price').isna() | ~digits.str.isdigit()
+
+
+PRODUCT_REJECT = [
+    is_missing('name'),
+    is_blank('name', missing=None),
+    is_missing('category'),
+    is_blank('category', missing=None),
+    _price_not_plain_decimal,
+    lambda cols: pd.to_numeric(cols.raw('price'), errors='coerce') < 0,
+]
+
+VENDOR_RULES = [
+    [
+        ("empty/missing name", is_blank('name', missing=None)),
+        ("name too long (>100 chars)", is_too_long('name', missing=None)),
+    ],
+    ("invalid or missing email", is_bad_email('email')),
+    ("city too long (>100 chars)", is_too_long('city', missing=None)),
+]
+
+VENDOR_REJECT = [
+    is_missing('name'),
+    is_blank('name', missing=None),
+    is_bad_email('email'),
+]
@@ -0,0 +1,143 @@
+"""
+Admin changelist query times with and without the AnJuShop indexes
+(migration 0002_indexes).
+
+    python benchmarks/bench_admin_indexes.py --seed 200000
+
+Runs against the database configured in config/settings.py (set the PDB_*
+variables in .env). --seed first adds that many synthetic orders, plus
+customers and products for them. The "without" run drops the indexes inside
+a transaction that is rolled back afterwards, so the database is unchanged.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib import admin  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+
+from AnJuShop.models import Customer, Order, Product, Vendor  # noqa: E402
+
+CITIES = ['Hong Kong', 'Kowloon', 'New Territories', 'London', 'New York', 'Tokyo', '']
+CATEGORIES = ['Food', 'Electronics', 'Clothing', 'Books', 'Groceries', 'Sports & Outdoors']
+
+TRIGRAM_INDEXES = ['anjushop_customer_name_trgm', 'anjushop_product_name_trgm',
+                   'anjushop_vendor_name_trgm']
+
+
+# ────────────────────────────────────────────────
+# Synthetic data
+# ────────────────────────────────────────────────
+
+def seed(orders, batch_size=5000):
+    rnd = random.Random(0)
+    start = Customer.objects.count()
+    customers = max(orders // 20, 100)
+    products = max(orders // 200, 50)
+    Customer.objects.bulk_create(
+        [Customer(name=f"Customer {start + i}", email=f"bench{start + i}@example.com",
+                  age=rnd.randint(18, 90), city=rnd.choice(CITIES)) for i in range(customers)],
+        batch_size=batch_size)
+    Product.objects.bulk_create(
+        [Product(name=f"Product {i}", category=rnd.choice(CATEGORIES),
+                 price=rnd.randint(100, 50000) / 100) for i in range(products)],
+        batch_size=batch_size)
+    customer_ids = list(Customer.objects.values_list('id', flat=True))
+    product_ids = list(Product.objects.values_list('id', flat=True))
+    today = date.today()
+    for offset in range(0, orders, batch_size):
+        Order.objects.bulk_create(
+            [Order(customer_id=rnd.choice(customer_ids), product_id=rnd.choice(product_ids),
+                   quantity=rnd.randint(1, 5), order_date=today - timedelta(days=rnd.randint(0, 730)))
+             for _ in range(min(batch_size, orders - offset))])
+
+
+# ────────────────────────────────────────────────
+# Changelist timing
+# ────────────────────────────────────────────────
+
+def cases():
+    recent = (date.today() - timedelta(days=7)).isoformat()
+    return [
+        (Customer, {'city': 'Kowloon'}),
+        (Customer, {'q': 'customer 12'}),
+        (Product, {'category': 'Books'}),
+        (Order, {'order_date__gte': recent}),
+        (Order, {'order_date__gte': recent, 'product__category': 'Books'}),
+        (Order, {'product__category': 'Electronics'}),
+        (Order, {'q': 'product 1'}),
+        (Vendor, {'city': 'London'}),
+    ]
+
+
+def changelist_time(model, params, repeat):
+    """Median seconds to build one changelist page, incl. the filter sidebar."""
+    model_admin = admin.site._registry[model]
+    request = RequestFactory().get('/', params)
+    request.user = User(is_active=True, is_staff=True, is_superuser=True)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        cl = model_admin.get_changelist_instance(request)
+        list(cl.result_list)
+        for spec in cl.filter_specs:
+            list(spec.choices(cl))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def run_all(repeat):
+    return [changelist_time(model, params, repeat) for model, params in cases()]
+
+
+def run_without_indexes(repeat):
+    names = [index.name for model in (Customer, Product, Order, Vendor)
+             for index in model._meta.indexes]
+    if connection.vendor == 'postgresql':
+        names += TRIGRAM_INDEXES
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for name in names:
+                cursor.execute(f'DROP INDEX IF EXISTS {connection.ops.quote_name(name)}')
+        timings = run_all(repeat)
+        transaction.set_rollback(True)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Admin changelist timings with/without indexes")
+    parser.add_argument('--seed', type=int, default=0, help="add this many synthetic orders first")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    print(f"{connection.vendor}: {Customer.objects.count():,} customers, "
+          f"{Product.objects.count():,} products, {Order.objects.count():,} orders\n")
+
+    with_indexes = run_all(args.repeat)
+    without_indexes = run_without_indexes(args.repeat)
+
+    print(f"{'changelist':<55} {'no index (ms)':>14} {'indexed (ms)':>13} {'speedup':>8}")
+    for (model, params), before, after in zip(cases(), without_indexes, with_indexes):
+        query = '&'.join(f"{k}={v}" for k, v in params.items())
+        label = f"{model.__name__}?{query}"
+        print(f"{label:<55} {before * 1000:>14.1f} {after * 1000:>13.1f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Rows/sec of the JSON API: serialization alone, query + serialization, and
+whole requests through Django's WSGI handler.
+
+    python benchmarks/bench_api.py --rows 100000
+
+Runs against the database configured by the PDB_* variables (orders table).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core import serializers  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.core.serializers.json import DjangoJSONEncoder  # noqa: E402
+
+from AnJuShop import api  # noqa: E402
+from AnJuShop.models import Order  # noqa: E402
+
+FIELDS = api.RESOURCES['orders']['fields'][:5]
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+# ────────────────────────────────────────────────
+# In-process WSGI
+# ────────────────────────────────────────────────
+
+def get(handler, url):
+    parts = urlsplit(url)
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query,
+        'SCRIPT_NAME': '', 'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'REMOTE_ADDR': '10.0.0.1',  # no debug toolbar
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr, 'wsgi.multithread': False, 'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    body = handler(environ, lambda status, headers, exc_info=None: None)
+    content = b''.join(body)
+    body.close()
+    return json.loads(content)
+
+
+def walk(handler, url):
+    """Follow "next" from url; returns the number of rows read."""
+    rows = 0
+    while url:
+        page = get(handler, url)
+        rows += len(page['results'])
+        url = page['next']
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON API rows/sec")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--page-size', type=int, default=api.PAGE_LIMIT)
+    args = parser.parse_args()
+
+    rows = list(Order.objects.order_by('id').values(*FIELDS)[:args.rows])
+    count = len(rows)
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    print(f"{count:,} orders, orjson {'installed' if api.orjson else 'missing'}\n")
+
+    results = [
+        ('serialize: json + DjangoJSONEncoder', timed(lambda: encoder.encode(rows))[0]),
+        ('serialize: api.dumps', timed(lambda: api.dumps(rows))[0]),
+        ('query + serialize: model instances, serializers',
+         timed(lambda: serializers.serialize('json', Order.objects.order_by('id')[:count]))[0]),
+        ('query + serialize: .values() + api.dumps',
+         timed(lambda: api.dumps(list(Order.objects.order_by('id').values(*FIELDS)[:count])))[0]),
+    ]
+
+    settings.ALLOWED_HOSTS = ['localhost']
+    handler = WSGIHandler()
+    get(handler, '/api/orders/?limit=1')  # warm up
+    elapsed, streamed = timed(lambda: len(get(handler, f'/api/orders/?limit={count}')['results']))
+    results.append((f'GET one streamed page of {streamed:,}', elapsed))
+    elapsed, walked = timed(lambda: walk(handler, f'/api/orders/?limit={args.page_size}'))
+    # the walk covers the whole table; scale to the same row count
+    results.append((f'GET pages of {args.page_size} (cursor)', elapsed * count / max(walked, 1)))
+
+    for label, seconds in results:
+        print(f"{label:<52} {count / seconds:>12,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+Concurrency under ASGI (uvicorn config.asgi) vs WSGI (gunicorn config.wsgi,
+threaded worker) for the async storefront and API views.
+
+    pip install uvicorn gunicorn
+    python benchmarks/bench_asgi.py --clients 64 --slow-clients 32 --seconds 5
+
+Each server runs as one worker process, the WSGI one with --threads threads.
+--clients keep-alive connections send requests back to back. The
+--slow-clients connections each take --slow-delay seconds to send their
+request headers, like clients on a poor mobile network. Each server is
+measured with and without them; the numbers are for the fast clients.
+Both servers use the DJANGO_PROFILE given (production by default, static
+files collected into a temporary STATIC_ROOT) and the PDB_* database.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HOST = '127.0.0.1'
+PATHS = ['/', '/api/products/?limit=50', '/api/orders/?limit=50&since=2024-01-01']
+
+
+# ────────────────────────────────────────────────
+# Servers
+# ────────────────────────────────────────────────
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def server_command(kind, port, threads):
+    if kind == 'asgi':
+        return [sys.executable, '-m', 'uvicorn', 'config.asgi:application', '--host', HOST,
+                '--port', str(port), '--workers', '1', '--no-access-log', '--log-level', 'warning']
+    return [sys.executable, '-m', 'gunicorn', 'config.wsgi:application', '--bind', f'{HOST}:{port}',
+            '--workers', '1', '--worker-class', 'gthread', '--threads', str(threads),
+            '--log-level', 'warning']
+
+
+def start_server(kind, port, threads, env):
+    process = subprocess.Popen(server_command(kind, port, threads), cwd=ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{kind} server exited with {process.returncode}")
+        try:
+            socket.create_connection((HOST, port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit(f"{kind} server did not start")
+
+
+# ────────────────────────────────────────────────
+# Client
+# ────────────────────────────────────────────────
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split()[1])
+    headers = {name.strip().lower(): value.strip()
+               for name, _, value in (line.partition(':') for line in lines[1:] if line)}
+    if 'content-length' in headers:
+        await reader.readexactly(int(headers['content-length']))
+    elif headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    return status
+
+
+async def client(port, path, deadline, slow_delay, latencies, errors):
+    request_line = f'GET {path} HTTP/1.1\r\n'.encode()
+    headers = f'Host: {HOST}\r\nConnection: keep-alive\r\n\r\n'.encode()
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            writer.write(request_line)
+            if slow_delay:
+                await writer.drain()
+                await asyncio.sleep(slow_delay)
+            writer.write(headers)
+            await writer.drain()
+            status = await read_response(reader)
+            if latencies is not None and time.perf_counter() < deadline:
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    errors.append(status)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        errors.append('connection')
+    finally:
+        writer.close()
+
+
+async def load(port, path, seconds, clients, slow_clients, slow_delay):
+    latencies, errors = [], []
+    # Slow clients run a little longer, so they stay connected for the whole run
+    deadline = time.perf_counter() + seconds
+    tasks = [client(port, path, deadline + slow_delay, slow_delay, None, errors)
+             for _ in range(slow_clients)]
+    tasks += [client(port, path, deadline, 0, latencies, errors) for _ in range(clients)]
+    started = time.perf_counter()
+    await asyncio.wait_for(asyncio.gather(*tasks), seconds + slow_delay + 60)
+    return latencies, errors, min(time.perf_counter(), deadline) - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASGI vs WSGI under concurrent and slow clients")
+    parser.add_argument('--seconds', type=float, default=5.0, help="duration of each run")
+    parser.add_argument('--clients', type=int, default=64, help="concurrent fast connections")
+    parser.add_argument('--slow-clients', type=int, default=32)
+    parser.add_argument('--slow-delay', type=float, default=2.0, help="seconds to send a slow request")
+    parser.add_argument('--threads', type=int, default=8, help="gunicorn threads (WSGI)")
+    parser.add_argument('--profile', default='production', help="DJANGO_PROFILE for the servers")
+    parser.add_argument('--path', action='append', help="path to request (repeatable)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_static_') as static_root:
+        env = dict(os.environ, DJANGO_PROFILE=args.profile, STATIC_ROOT=static_root,
+                   ALLOWED_HOSTS=HOST)
+        subprocess.run([sys.executable, 'manage.py', 'collectstatic', '--noinput', '-v0'],
+                       env=env, cwd=ROOT, check=True, capture_output=True)
+
+        print(f"{args.clients} fast clients, {args.seconds:.0f}s per run, "
+              f"WSGI: 1 worker x {args.threads} threads, ASGI: 1 worker\n")
+        print(f"{'path':<42}{'server':<7}{'slow':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for kind in ('asgi', 'wsgi'):
+            port = free_port()
+            process = start_server(kind, port, args.threads, env)
+            try:
+                for path in args.path or PATHS:
+                    asyncio.run(load(port, path, 1, 4, 0, 0))  # warm up caches and connections
+                    for slow_clients in (0, args.slow_clients):
+                        latencies, errors, elapsed = asyncio.run(load(
+                            port, path, args.seconds, args.clients, slow_clients, args.slow_delay))
+                        latencies.sort()
+                        p50 = statistics.median(latencies) * 1000 if latencies else float('nan')
+                        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float('nan')
+                        print(f"{path:<42}{kind:<7}{slow_clients:>6}{len(latencies) / elapsed:>10,.0f}"
+                              f"{p50:>10.1f}{p99:>10.1f}{len(errors):>8}")
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Reading the cleaned outputs back: CSV vs Parquet vs Arrow (Feather).
+
+    python benchmarks/bench_columnar.py --rows 5000000
+
+The cleaned customers and products (as the FakeDataProcessed cleaners
+write them, synthetic input from bench_validation.py) are written once in
+each format, then read back with columnar.read_frame() into pandas, and
+with columnar.read_table() as an Arrow table. Arrow files are memory-mapped,
+so read_table() there only maps the file. Best of --repeat; needs pyarrow.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'FakeDataProcessed'))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import columnar  # noqa: E402
+import pipeline  # noqa: E402
+from bench_validation import make_frames  # noqa: E402
+
+FORMATS = ('csv', 'parquet', 'arrow')
+
+
+def best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+        del result
+    return min(times)
+
+
+def cleaned(entity, rows, seed):
+    customers, products, _ = make_frames(rows, seed)
+    spec = pipeline.ENTITIES[entity]
+    frame = spec['clean_fn'](customers if entity == 'customers' else products)
+    for column in spec['integer_columns']:
+        frame[column] = frame[column].astype('Int64')
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parse time of the cleaned outputs per file format")
+    parser.add_argument('--rows', type=int, default=5_000_000, help="raw rows per entity")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if columnar.pa is None:
+        sys.exit("needs pyarrow (pip install pyarrow)")
+
+    print(f"{'file':<30}{'MB':>8}{'write (s)':>11}{'read_frame (s)':>16}{'read_table (s)':>16}"
+          f"{'vs CSV':>8}  types read back")
+    with tempfile.TemporaryDirectory(prefix='bench_columnar_') as tmp:
+        for entity in ('customers', 'products'):
+            frame = cleaned(entity, args.rows, args.seed)
+            types = columnar.CLEANED_TYPES[entity]
+            csv_seconds = None
+            for fmt in FORMATS:
+                path = os.path.join(tmp, f'{entity}_cleaned.{fmt}')
+                started = time.perf_counter()
+                columnar.write_frame(frame, path, types)
+                written = time.perf_counter() - started
+
+                read = best(lambda: columnar.read_frame(path), args.repeat)
+                table = (f"{best(lambda: columnar.read_table(path), args.repeat):>16.3f}"
+                         if fmt != 'csv' else f"{'-':>16}")
+                csv_seconds = csv_seconds or read
+                back = columnar.read_frame(path)
+                kinds = ', '.join(f"{column}={back[column].dtype}" for column in ('age', 'price')
+                                  if column in back.columns)
+                if 'price' in back.columns:
+                    kinds += f" ({type(back['price'].dropna().iloc[0]).__name__})"
+                del back
+                print(f"{os.path.basename(path):<30}{os.path.getsize(path) / 2**20:>8.0f}"
+                      f"{written:>11.2f}{read:>16.3f}{table}{csv_seconds / read:>7.1f}x  {kinds}")
+                os.remove(path)
+            print(f"  {len(frame):,} cleaned {entity} rows\n")
+            del frame
+
+
+if __name__ == '__main__':
+    main()
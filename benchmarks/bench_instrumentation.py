@@ -0,0 +1,112 @@
+"""
+Overhead of pages.instrumentation: the same requests with and without
+InstrumentationMiddleware.
+
+    python benchmarks/bench_instrumentation.py --requests 200 --rounds 5
+
+Runs against the database configured by the PDB_* variables through
+Django's test client as a superuser. Rounds alternate between the two
+settings (taking turns going first) and the medians per request are
+compared. Without the middleware the query/template hooks stay installed but return at once
+(no request is being measured), as they would if it were removed.
+
+On a busy machine the end-to-end difference is within the noise, so the
+middleware's own cost per request and per query is timed in isolation first.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.test import Client, RequestFactory, modify_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import resolve, reverse  # noqa: E402
+
+from pages import instrumentation  # noqa: E402
+
+
+def urls():
+    return {
+        'storefront': reverse('pages:index'),
+        'search': reverse('pages:search') + '?q=tea',
+        'product changelist': reverse('admin:AnJuShop_product_changelist'),
+        'api products': reverse('api:product_list') + '?limit=200',
+    }
+
+
+def fixed_costs(calls=100_000):
+    """Microseconds the middleware adds per request (view doing nothing) and per query."""
+    request = RequestFactory().get('/')
+    request.resolver_match = resolve(reverse('pages:index'))
+    middleware = instrumentation.InstrumentationMiddleware(lambda request: None)
+    started = time.perf_counter()
+    for _ in range(calls):
+        middleware(request)
+    per_request = (time.perf_counter() - started) / calls * 1e6
+
+    def execute(sql, params, many, context):
+        return None
+    token = instrumentation._current.set(instrumentation.RequestCost())
+    started = time.perf_counter()
+    for _ in range(calls):
+        instrumentation.time_query(execute, 'SELECT 1', (), False, {})
+    per_query = (time.perf_counter() - started) / calls * 1e6
+    instrumentation._current.reset(token)
+    instrumentation.reset()
+    return per_request, per_query
+
+
+def per_request_ms(client, url, requests):
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise SystemExit(f"{url} answered {response.status_code}")
+    return (time.perf_counter() - started) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="instrumentation middleware overhead")
+    parser.add_argument('--requests', type=int, default=200, help="requests per round and URL")
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    logging.getLogger('pages.instrumentation').setLevel(logging.ERROR)  # slow queries still timed
+    superuser = User.objects.filter(is_superuser=True, is_active=True).first()
+    if superuser is None:
+        raise SystemExit("needs a superuser (manage.py createsuperuser)")
+    without = modify_settings(MIDDLEWARE={'remove': [instrumentation.MIDDLEWARE]})
+
+    per_request, per_query = fixed_costs()
+    print(f"middleware: {per_request:.1f} us per request + {per_query:.2f} us per query\n")
+    print(f"{'url':<20}{'without (ms)':>14}{'with (ms)':>12}{'overhead':>10}")
+    for name, url in urls().items():
+        times = {'with': [], 'without': []}
+        for round_ in range(args.rounds):
+            for label in (('without', 'with') if round_ % 2 else ('with', 'without')):
+                if label == 'without':
+                    without.enable()
+                client = Client()
+                client.force_login(superuser)
+                client.get(url)  # warm up (caches, connection)
+                times[label].append(per_request_ms(client, url, args.requests))
+                if label == 'without':
+                    without.disable()
+        base, instrumented = (statistics.median(times[label]) for label in ('without', 'with'))
+        print(f"{name:<20}{base:>14.2f}{instrumented:>12.2f}{instrumented / base - 1:>+10.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Sales dashboard queries: raw Order joins vs. the DailySales rollup.
+
+    python benchmarks/bench_rollups.py --days 365
+
+Runs against the database configured in config/settings.py (set the PDB_*
+variables in .env; load orders first, e.g. with bench_admin_indexes.py
+--seed). The rollup is rebuilt from the orders before timing.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.db.models import Count, Sum  # noqa: E402
+
+from AnJuShop.models import DailySales, Order  # noqa: E402
+from AnJuShop.rollups import REVENUE, order_date_range, rebuild_daily_sales, sales_by  # noqa: E402
+
+RAW_FIELDS = {'day': 'order_date', 'category': 'product__category', 'city': 'customer__city'}
+
+
+def raw_sales_by(dimension, start, end):
+    field = RAW_FIELDS[dimension]
+    return list(Order.objects.filter(order_date__range=(start, end))
+                .values(field)
+                .annotate(total_orders=Count('id'), total_quantity=Sum('quantity'),
+                          total_revenue=Sum(REVENUE))
+                .order_by(field))
+
+
+def best_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard queries: raw joins vs DailySales rollup")
+    parser.add_argument('--days', type=int, default=365, help="dashboard window, ending at the last order")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    first, last = order_date_range()
+    if last is None:
+        sys.exit("No orders in the database")
+    start = max(first, last - timedelta(days=args.days - 1))
+
+    started = time.perf_counter()
+    rebuild_daily_sales()
+    rebuild_time = time.perf_counter() - started
+    print(f"{connection.vendor}: {Order.objects.count():,} orders → "
+          f"{DailySales.objects.count():,} rollup rows (rebuilt in {rebuild_time:.2f}s)")
+    print(f"window {start} .. {last}\n")
+
+    print(f"{'revenue by':<10} {'raw best/median (ms)':>22} {'rollup best/median (ms)':>25} {'speedup':>8}")
+    for dimension in RAW_FIELDS:
+        raw = best_time(lambda: raw_sales_by(dimension, start, last), args.repeat)
+        rollup = best_time(lambda: sales_by(dimension, start, last), args.repeat)
+        print(f"{dimension:<10} {raw[0] * 1000:>10.1f} / {raw[1] * 1000:<9.1f} "
+              f"{rollup[0] * 1000:>12.1f} / {rollup[1] * 1000:<10.1f} {raw[0] / rollup[0]:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Product search at catalog scale: the admin's icontains search vs the
+full-text index (AnJuShop.search).
+
+    python benchmarks/bench_search.py --products 1000000
+
+Inserts --products generated products into the configured database (PDB_*)
+inside a transaction that is rolled back at the end, so the data is left as
+it was. The index (FTS5 triggers / generated tsvector column) is maintained
+while inserting, so the insert time includes it.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from AnJuShop import search  # noqa: E402
+from AnJuShop.models import Product  # noqa: E402
+
+
+ADJECTIVES = ['Stainless', 'Wireless', 'Organic', 'Ergonomic', 'Portable', 'Vintage', 'Smart',
+              'Bamboo', 'Ceramic', 'Waterproof', 'Compact', 'Deluxe', 'Classic', 'Foldable']
+NOUNS = ['Bottle', 'Headphones', 'Tea', 'Chair', 'Speaker', 'Lamp', 'Backpack', 'Mat', 'Mug',
+         'Keyboard', 'Jacket', 'Blender', 'Notebook', 'Tent', 'Watch', 'Pillow']
+CATEGORIES = ['Home & Kitchen', 'Electronics', 'Sports & Outdoors', 'Food', 'Office', 'Fashion']
+
+PAGE = 100  # admin list_per_page
+
+QUERIES = ['tea', 'wireless speak', 'cera mug', 'zz9']
+
+
+def generate(count, seed=1):
+    rng = random.Random(seed)
+    for n in range(count):
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice('ABCDEFGHJK')}{n % 997}"
+        yield Product(name=name, category=rng.choice(CATEGORIES),
+                      price=Decimal(rng.randint(100, 50000)) / 100)
+
+
+def best_of(repeat, function):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, result
+
+
+def icontains(term):
+    condition = Q()
+    for word in term.split():  # what the admin does for search_fields
+        condition &= Q(name__icontains=word) | Q(category__icontains=word)
+    return Product.objects.filter(condition)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="icontains vs full-text product search")
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if not search.is_installed(connection, Product):
+        raise SystemExit("no search index: run `manage.py migrate` (PostgreSQL, or SQLite with FTS5)")
+
+    with transaction.atomic():
+        started = time.perf_counter()
+        batch = []
+        for product in generate(args.products):
+            batch.append(product)
+            if len(batch) == args.batch_size:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+        print(f"{args.products:,} products inserted (and indexed) in "
+              f"{time.perf_counter() - started:.1f}s on {connection.vendor}; "
+              f"{Product.objects.count():,} in total\n")
+
+        print(f"{'query':<16}{'matches':>10}{'icontains count+page':>24}{'full-text count+page':>24}"
+              f"{'ranked top 24':>16}")
+        for term in QUERIES:
+            old_ms, matches = best_of(args.repeat, lambda: (
+                icontains(term).count(), list(icontains(term).order_by('-id')[:PAGE]))[0])
+            new_ms, _ = best_of(args.repeat, lambda: (
+                search.filter_search(Product.objects.all(), term).count(),
+                list(search.filter_search(Product.objects.all(), term).order_by('-id')[:PAGE])))
+            ranked_ms, _ = best_of(args.repeat, lambda: search.ranked(Product, term, 24))
+            print(f"{term!r:<16}{matches:>10,}{old_ms:>21.1f} ms{new_ms:>21.1f} ms{ranked_ms:>13.1f} ms")
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Startup time and request latency of the development and production settings
+profiles (DJANGO_PROFILE, see config/settings.py).
+
+    python benchmarks/bench_settings_profiles.py --requests 300
+
+Each profile runs in a fresh subprocess against the database configured by
+the PDB_* variables. Requests come from 127.0.0.1, like a developer's
+browser, so the development profile shows the debug toolbar as it does
+today. The production profile needs collected static files: they are
+collected into a temporary STATIC_ROOT first. The admin changelist
+scenario uses the first superuser in the database (skipped when there is
+none).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PATHS = ['/', '/admin/AnJuShop/product/']
+
+
+def child(requests):
+    started = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.test import Client
+    setup_time = time.perf_counter() - started
+
+    client = Client(REMOTE_ADDR='127.0.0.1', HTTP_ACCEPT_ENCODING='gzip')
+    first = time.perf_counter()
+    client.get('/')
+    first_request = time.perf_counter() - first
+
+    results = {'profile': settings.DJANGO_PROFILE, 'setup': setup_time,
+               'first_request': first_request, 'paths': {}}
+    admin = User.objects.filter(is_superuser=True).first()
+    for path in PATHS:
+        if path.startswith('/admin/'):
+            if admin is None:
+                continue
+            client.force_login(admin)
+        times = []
+        size = 0
+        for _ in range(requests):
+            t = time.perf_counter()
+            response = client.get(path)
+            times.append(time.perf_counter() - t)
+            size = len(response.content)
+        times.sort()
+        results['paths'][path] = {'status': response.status_code, 'median': statistics.median(times),
+                                  'p95': times[int(len(times) * 0.95) - 1], 'bytes': size}
+    print(json.dumps(results))
+
+
+def run_profile(profile, requests, static_root):
+    env = dict(os.environ, DJANGO_PROFILE=profile, STATIC_ROOT=static_root,
+               ALLOWED_HOSTS='testserver,localhost')
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, __file__, '--child', '--requests', str(requests)],
+                            env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    results = json.loads(output.strip().splitlines()[-1])
+    results['process'] = time.perf_counter() - started
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Development vs production settings profile")
+    parser.add_argument('--requests', type=int, default=200, help="requests per page and profile")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.requests)
+        return
+
+    with tempfile.TemporaryDirectory(prefix='bench_static_') as static_root:
+        subprocess.run([sys.executable, 'manage.py', 'collectstatic', '--noinput', '-v0'],
+                       env=dict(os.environ, DJANGO_PROFILE='production', STATIC_ROOT=static_root),
+                       cwd=ROOT, check=True, capture_output=True)
+        profiles = [run_profile(profile, args.requests, static_root)
+                    for profile in ('development', 'production')]
+
+    print(f"{'':<34}" + ''.join(f"{p['profile']:>14}" for p in profiles))
+    print(f"{'whole run (s)':<34}" + ''.join(f"{p['process']:>14.2f}" for p in profiles))
+    print(f"{'django.setup() (ms)':<34}" + ''.join(f"{p['setup'] * 1000:>14.1f}" for p in profiles))
+    print(f"{'first request (ms)':<34}" + ''.join(f"{p['first_request'] * 1000:>14.1f}" for p in profiles))
+    for path in PATHS:
+        if not all(path in p['paths'] for p in profiles):
+            continue
+        for key, label in (('median', 'median'), ('p95', 'p95')):
+            print(f"{f'{path} {label} (ms)':<34}"
+                  + ''.join(f"{p['paths'][path][key] * 1000:>14.2f}" for p in profiles))
+        print(f"{f'{path} body (bytes)':<34}" + ''.join(f"{p['paths'][path]['bytes']:>14,}" for p in profiles))
+
+
+if __name__ == '__main__':
+    main()
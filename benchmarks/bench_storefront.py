@@ -0,0 +1,157 @@
+"""
+Requests/sec for the storefront index: plain render, full-page cache and
+conditional GET (304).
+
+    python benchmarks/bench_storefront.py --seconds 5
+    python benchmarks/bench_storefront.py --url http://127.0.0.1:8000/ --concurrency 16
+
+Without --url the requests go straight through Django's WSGI handler in this
+process (no network or server overhead). With --url they are sent to a
+running server (e.g. gunicorn config.wsgi) from --concurrency threads; start
+it with PAGES_CACHE_SECONDS set to compare the full-page cache there.
+"""
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+
+# ────────────────────────────────────────────────
+# In-process WSGI
+# ────────────────────────────────────────────────
+
+def wsgi_environ(path, headers):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '10.0.0.1',  # not in INTERNAL_IPS: no debug toolbar
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr, 'wsgi.multithread': False, 'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def run_in_process(path, seconds, headers=None):
+    handler = WSGIHandler()
+    statuses = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        statuses[status] = statuses.get(status, 0) + 1
+
+    def request():
+        body = handler(wsgi_environ(path, headers or {}), start_response)
+        b''.join(body)
+        body.close()
+
+    request()  # warm the caches
+    statuses.clear()
+    count = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        request()
+        count += 1
+    return count / (time.perf_counter() - started), statuses
+
+
+def first_etag(path):
+    handler = WSGIHandler()
+    found = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        found.update(response_headers)
+
+    b''.join(handler(wsgi_environ(path, {}), start_response))
+    return found.get('ETag')
+
+
+# ────────────────────────────────────────────────
+# Running server
+# ────────────────────────────────────────────────
+
+def run_against_server(url, seconds, concurrency, headers=None):
+    parts = urlsplit(url)
+    counts = [0] * concurrency
+    deadline = time.perf_counter() + seconds
+
+    def worker(n):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+        while time.perf_counter() < deadline:
+            connection.request('GET', parts.path or '/', headers=headers or {})
+            connection.getresponse().read()
+            counts[n] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.perf_counter() - started)
+
+
+def server_etag(url):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80)
+    connection.request('GET', parts.path or '/')
+    response = connection.getresponse()
+    response.read()
+    return response.getheader('ETag')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storefront index requests/sec")
+    parser.add_argument('--seconds', type=float, default=5.0, help="duration of each scenario")
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--url', help="benchmark a running server instead of in-process WSGI")
+    parser.add_argument('--concurrency', type=int, default=8, help="client threads with --url")
+    args = parser.parse_args()
+
+    if args.url:
+        etag = server_etag(args.url)
+        scenarios = [('GET', None), ('GET If-None-Match (304)', {'If-None-Match': etag})]
+        print(f"{args.url}, {args.concurrency} client threads, {args.seconds:.0f}s each\n")
+        for label, headers in scenarios:
+            rate = run_against_server(args.url, args.seconds, args.concurrency, headers)
+            print(f"{label:<32} {rate:>10,.0f} req/s")
+        return
+
+    settings.ALLOWED_HOSTS = ['localhost']
+    print(f"in-process WSGI, DEBUG={settings.DEBUG}, {args.seconds:.0f}s each\n")
+    results = []
+    with override_settings(PAGES_CACHE_SECONDS=0):
+        results.append(('render (fragment caches only)', *run_in_process(args.path, args.seconds)))
+    with override_settings(PAGES_CACHE_SECONDS=60):
+        results.append(('full-page cache', *run_in_process(args.path, args.seconds)))
+    etag = first_etag(args.path)
+    results.append(('If-None-Match (304)',
+                    *run_in_process(args.path, args.seconds, {'If-None-Match': etag})))
+
+    baseline = results[0][1]
+    for label, rate, statuses in results:
+        codes = ', '.join(f"{status.split()[0]}×{count:,}" for status, count in statuses.items())
+        print(f"{label:<32} {rate:>10,.0f} req/s  {rate / baseline:>5.1f}x  ({codes})")
+
+
+if __name__ == '__main__':
+    main()
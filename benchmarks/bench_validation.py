@@ -0,0 +1,200 @@
+"""
+Benchmark: row-by-row (iterrows) validation vs the column-wise engine in
+FakeDataProcessed/validation.py.
+
+    python benchmarks/bench_validation.py --rows 1000000
+
+The iterrows reference is timed on --legacy-rows rows and scaled linearly
+to --rows (pass --legacy-rows 0 to time it on the full size).
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'FakeDataProcessed'))
+
+from Customer_Data_Clean_copy import customer_issues  # noqa: E402
+from Product_Data_Clean import product_issues  # noqa: E402
+from Vendors import vendor_issues  # noqa: E402
+from validation import EMAIL_PATTERN, NAME_PATTERN  # noqa: E402
+
+
+# ────────────────────────────────────────────────
+# Synthetic input
+# ────────────────────────────────────────────────
+
+def make_frames(rows, seed=0):
+    """Customers, products and vendors frames with ~5% bad values."""
+    rng = np.random.default_rng(seed)
+    names = np.array(['Alice Johnson', 'Bob Smith', "Conan O'Brien", 'Ann-Marie Lee',
+                      '', 'Tina Turner###', '蓝天贸易', 'x' * 120], dtype=object)
+    name_p = [0.3, 0.3, 0.1, 0.15, 0.05, 0.04, 0.05, 0.01]
+    emails = np.array(['alice@example.com', 'bob.smith@shop.co.uk', 'bad-email.com',
+                       None, 'x+y@mail.org'], dtype=object)
+    email_p = [0.4, 0.4, 0.05, 0.05, 0.1]
+    cities = np.array(['New York', 'Hong Kong', '', None, '北京'], dtype=object)
+    city_p = [0.4, 0.4, 0.05, 0.05, 0.1]
+
+    ages = rng.integers(-5, 95, rows).astype(float)
+    ages[rng.random(rows) < 0.05] = np.nan
+    ages[rng.random(rows) < 0.01] += 0.5
+    prices = np.round(rng.uniform(-10, 500, rows), 2)
+    prices[rng.random(rows) < 0.02] = np.nan
+
+    customers = pd.DataFrame({
+        'id': np.arange(rows),
+        'name': rng.choice(names, rows, p=name_p),
+        'email': rng.choice(emails, rows, p=email_p),
+        'age': ages,
+        'city': rng.choice(cities, rows, p=city_p),
+    })
+    products = pd.DataFrame({
+        'name': rng.choice(names, rows, p=name_p),
+        'category': rng.choice(np.array(['Books', 'Electronics', '', 'Groceries'], dtype=object), rows),
+        'price': prices,
+    })
+    vendors = customers[['id', 'name', 'email', 'city']]
+    return customers, products, vendors
+
+
+# ────────────────────────────────────────────────
+# The per-row loops the engine replaced (reference only)
+# ────────────────────────────────────────────────
+
+def _valid_email(email):
+    if pd.isna(email) or not isinstance(email, str):
+        return False
+    email = email.strip()
+    return bool(email) and bool(re.match(EMAIL_PATTERN, email))
+
+
+def legacy_customer_issues(df):
+    issues = []
+    for idx, row in df.iterrows():
+        problems = []
+        name = str(row.get('name')).strip() if pd.notna(row.get('name')) else ""
+        if not name:
+            problems.append("empty name")
+        elif len(name) > 100:
+            problems.append("name too long (>100 chars)")
+        elif not re.match(NAME_PATTERN, name):
+            problems.append("name contains unusual symbols")
+        if not _valid_email(row.get('email')):
+            problems.append("invalid or missing email")
+        city = str(row.get('city')).strip() if pd.notna(row.get('city')) else ""
+        if not city:
+            problems.append("empty city (allowed)")
+        elif len(city) > 100:
+            problems.append("city too long (>100 chars)")
+        age_raw = row.get('age')
+        if pd.notna(age_raw):
+            age_num = float(age_raw)
+            if age_num < 0:
+                problems.append("negative age")
+            if age_num != int(age_num):
+                problems.append("non-integer age")
+        if problems:
+            issues.append({'row': idx + 1, 'name': row.get('name'), 'email': row.get('email'),
+                           'age': row.get('age'), 'city': row.get('city'),
+                           'issues': '; '.join(problems)})
+    return pd.DataFrame(issues)
+
+
+def legacy_product_issues(df):
+    issues = []
+    for idx, row in df.iterrows():
+        problems = []
+        name = str(row.get('name', '')).strip()
+        if not name:
+            problems.append("empty/missing name")
+        elif len(name) > 100:
+            problems.append("name too long (>100 chars)")
+        category = str(row.get('category', '')).strip()
+        if not category:
+            problems.append("empty/missing category")
+        elif len(category) > 100:
+            problems.append("category too long (>100 chars)")
+        price_raw = row.get('price')
+        if pd.isna(price_raw):
+            problems.append("missing price")
+        elif float(price_raw) < 0:
+            problems.append("negative price")
+        if problems:
+            issues.append({'row_number': idx + 2, 'name': row.get('name'),
+                           'category': row.get('category'), 'price': row.get('price'),
+                           'issues': '; '.join(problems)})
+    return pd.DataFrame(issues)
+
+
+def legacy_vendor_issues(df):
+    issues = []
+    for idx, row in df.iterrows():
+        problems = []
+        name = str(row.get('name', '')).strip()
+        if not name:
+            problems.append("empty/missing name")
+        elif len(name) > 100:
+            problems.append("name too long (>100 chars)")
+        if not _valid_email(row.get('email')):
+            problems.append("invalid or missing email")
+        if len(str(row.get('city', '')).strip()) > 100:
+            problems.append("city too long (>100 chars)")
+        if problems:
+            issues.append({'row': idx + 1, 'name': row.get('name'), 'email': row.get('email'),
+                           'city': row.get('city'), 'issues': '; '.join(problems)})
+    return pd.DataFrame(issues)
+
+
+# ────────────────────────────────────────────────
+# Runner
+# ────────────────────────────────────────────────
+
+def timed(fn, df):
+    start = time.perf_counter()
+    result = fn(df)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--legacy-rows', type=int, default=50_000,
+                        help='rows to time the iterrows loop on (0 = all rows)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    customers, products, vendors = make_frames(args.rows, args.seed)
+    sample = args.legacy_rows or args.rows
+    cases = [
+        ('customers', customers, customer_issues, legacy_customer_issues),
+        ('products', products, product_issues, legacy_product_issues),
+        ('vendors', vendors, vendor_issues, legacy_vendor_issues),
+    ]
+
+    print(f"Validation benchmark at {args.rows:,} rows "
+          f"(iterrows timed on {min(sample, args.rows):,} rows, scaled)\n")
+    print(f"{'entity':<10} {'iterrows (s)':>13} {'engine (s)':>11} {'rows/s':>13} {'speedup':>9}")
+    for entity, df, engine, legacy in cases:
+        engine_time, report = timed(engine, df)
+
+        head = df.head(sample)
+        legacy_time, legacy_report = timed(legacy, head)
+        legacy_time *= len(df) / len(head)
+
+        # Both paths must agree on the sample before the numbers mean anything
+        expected = engine(head)
+        if not legacy_report.equals(expected):
+            print(f"{entity}: engine output differs from the iterrows reference!")
+
+        print(f"{entity:<10} {legacy_time:>13.2f} {engine_time:>11.2f} "
+              f"{len(df) / engine_time:>13,.0f} {legacy_time / engine_time:>8.0f}x")
+    print(f"\n{len(report):,} vendor issue rows found")
+
+
+if __name__ == '__main__':
+    main()
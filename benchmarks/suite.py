@@ -0,0 +1,329 @@
+"""
+The benchmark suite: cleaners, ingestion, admin changelists and the
+storefront in one run, results in a JSON file.
+
+    python benchmarks/suite.py                            # everything -> benchmark-results.json
+    python benchmarks/suite.py --quick                    # smaller sizes, for a quick check
+    python benchmarks/suite.py --only admin storefront --output new.json
+    python benchmarks/suite.py --baseline baseline.json   # run, then flag regressions
+    python benchmarks/suite.py --compare baseline.json new.json
+
+Database work happens in a scratch database created the way the test
+runner does it (test_<PDB_NAME>) and dropped afterwards. On SQLite that is
+a temporary file rather than the in-memory default, so the timings include
+disk I/O. The database is filled by the generator behind
+`manage.py generate_fake_data`, using --seed. Point PDB_* at a local
+PostgreSQL to benchmark that instead; nothing needs the network.
+
+Each result is {"value", "unit", "better": "higher" | "lower"}. A metric
+regresses when it is worse than the baseline by more than --tolerance
+(default 15%); with any regression the exit status is 1. Only compare runs
+from the same machine, database and DJANGO_PROFILE (printed when they
+differ).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'FakeDataProcessed'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib import admin  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+import pipeline  # noqa: E402
+from AnJuShop import bulk, data, loaders  # noqa: E402
+from AnJuShop.models import Customer, Product  # noqa: E402
+from bench_validation import make_frames  # noqa: E402
+
+
+SCALES = {
+    'quick': {'cleaning_rows': [10_000], 'customers': 5_000, 'products': 500, 'orders': 50_000,
+              'ingest_rows': 10_000, 'repeat': 3, 'requests': 50},
+    'full': {'cleaning_rows': [10_000, 1_000_000], 'customers': 50_000, 'products': 5_000,
+             'orders': 500_000, 'ingest_rows': 100_000, 'repeat': 5, 'requests': 200},
+}
+
+GROUPS = ('cleaning', 'ingestion', 'admin', 'storefront')
+
+DEFAULT_OUTPUT = 'benchmark-results.json'
+TOLERANCE = 0.15
+
+# meta fields that must match for a comparison to mean anything
+COMPARABLE = ('database', 'profile', 'machine', 'cpus', 'scale')
+
+
+def label(rows):
+    return f'{rows // 1_000_000}M' if rows >= 1_000_000 else f'{rows // 1000}k'
+
+
+def median_ms(repeat, function):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+class Results(dict):
+    def record(self, name, value, unit, better='higher'):
+        self[name] = {'value': round(value, 3), 'unit': unit, 'better': better}
+        print(f"  {name:<52}{value:>14,.1f} {unit}")
+
+
+# ────────────────────────────────────────────────
+# Benchmarks (each adds to results)
+# ────────────────────────────────────────────────
+
+def bench_cleaning(scale, results, seed, tmp):
+    """pipeline.clean_partition (read, report issues, clean, write) over a whole file."""
+    for rows in scale['cleaning_rows']:
+        frames = dict(zip(('customers', 'products', 'vendors'), make_frames(rows, seed)))
+        for entity, frame in frames.items():
+            path = os.path.join(tmp, f'{entity}_raw.csv')
+            frame.to_csv(path, index=False)
+            header, ranges = pipeline.partition_file(path, os.path.getsize(path) + 1)
+            started = time.perf_counter()
+            for start, end in ranges:
+                pipeline.clean_partition(entity, path, header, start, end,
+                                         os.path.join(tmp, f'{entity}_clean.csv'))
+            results.record(f'cleaning.{entity}.{label(rows)}', rows / (time.perf_counter() - started),
+                           'rows/s')
+
+
+def bench_ingestion(scale, results, seed):
+    """The loaders (CSV rows) and the bulk API path, on top of the generated data."""
+    rng = np.random.default_rng(seed)
+    rows = scale['ingest_rows']
+    first = Customer.objects.order_by('-id').values_list('id', flat=True).first() + 1
+    customers = [{'name': f'Load Test {n}', 'email': f'load.{n}@example.org', 'age': str(20 + n % 50),
+                  'city': 'Hong Kong'} for n in range(first, first + rows)]
+    started = time.perf_counter()
+    loaders.load_customers(customers)
+    results.record('ingestion.load_customers', rows / (time.perf_counter() - started), 'rows/s')
+
+    customer_ids = np.fromiter(Customer.objects.values_list('id', flat=True), np.int64)
+    product_ids = np.fromiter(Product.objects.values_list('id', flat=True), np.int64)
+    picked_customers = rng.choice(customer_ids, rows).tolist()
+    picked_products = rng.choice(product_ids, rows).tolist()
+    days = rng.integers(0, 365, rows).tolist()
+    quantities = rng.integers(1, 5, rows).tolist()
+    start = date(2025, 1, 1)
+    orders = [{'customer_name': str(customer), 'product_name': str(product), 'quantity': str(quantity),
+               'order_date': (start + timedelta(days=day)).strftime(settings.DATE_STRING_FORMAT)}
+              for customer, product, quantity, day in zip(picked_customers, picked_products,
+                                                          quantities, days)]
+    started = time.perf_counter()
+    loaders.load_orders_fast(orders)
+    results.record('ingestion.load_orders_fast', rows / (time.perf_counter() - started), 'rows/s')
+
+    items = [{'customer_id': customer, 'product_id': product, 'quantity': quantity,
+              'order_date': (start + timedelta(days=day)).isoformat()}
+             for customer, product, quantity, day in zip(picked_customers, picked_products,
+                                                         quantities, days)]
+    started = time.perf_counter()
+    for offset in range(0, rows, bulk.BULK_LIMIT):
+        bulk.create_orders(items[offset:offset + bulk.BULK_LIMIT])
+    results.record('ingestion.bulk_create_orders', rows / (time.perf_counter() - started), 'rows/s')
+
+
+def bench_admin(scale, results, client):
+    """Median latency of every registered ModelAdmin's changelist (first page)."""
+    for model in admin.site._registry:
+        opts = model._meta
+        url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+        response = client.get(url)  # warm up
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} answered {response.status_code}")
+        results.record(f'admin.{opts.app_label}.{opts.model_name}.changelist',
+                       median_ms(scale['repeat'], lambda: client.get(url)), 'ms', 'lower')
+
+
+def bench_storefront(scale, results, client):
+    """pages.views.index requests per second, from the cache and rebuilt every time."""
+    url = reverse('pages:index')
+    requests = scale['requests']
+    for name, before in (('warm', lambda: None), ('cold', cache.clear)):
+        client.get(url)
+        started = time.perf_counter()
+        for _ in range(requests):
+            before()
+            response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} answered {response.status_code}")
+        results.record(f'storefront.index.{name}', requests / (time.perf_counter() - started), 'req/s')
+
+
+# ────────────────────────────────────────────────
+# Runner
+# ────────────────────────────────────────────────
+
+@contextmanager
+def scratch_database(tmp):
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    if connection.vendor == 'sqlite' and not test_settings.get('NAME'):
+        test_settings['NAME'] = os.path.join(tmp, 'benchmark.sqlite3')
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def database_version():
+    if connection.vendor == 'sqlite':
+        return f'sqlite {connection.Database.sqlite_version}'
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT version()')
+        return cursor.fetchone()[0].split(',')[0]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(groups, scale_name, seed):
+    scale = SCALES[scale_name]
+    results = Results()
+    meta = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'scale': scale_name,
+        'seed': seed,
+        'groups': list(groups),
+        'profile': settings.DJANGO_PROFILE,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'pandas': pd.__version__,
+        'machine': platform.node(),
+        'cpus': os.cpu_count(),
+    }
+    setup_test_environment(debug=False)
+    cache_settings = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                  'LOCATION': 'benchmark-suite'}}
+    with tempfile.TemporaryDirectory(prefix='anjushop_bench_') as tmp, \
+            override_settings(CACHES=cache_settings):
+        if 'cleaning' in groups:
+            print("cleaning")
+            bench_cleaning(scale, results, seed, tmp)
+        if not set(groups) - {'cleaning'}:
+            return {'meta': meta, 'results': results}
+
+        with scratch_database(tmp):
+            meta['database'] = database_version()
+            print(f"generating data on {meta['database']}")
+            started = time.perf_counter()
+            written = data.generate(customers=scale['customers'], products=scale['products'],
+                                    vendors=scale['products'] // 10, orders=scale['orders'], seed=seed,
+                                    start=date(2024, 1, 1), end=date(2025, 12, 31))
+            elapsed = time.perf_counter() - started
+            if 'ingestion' in groups:
+                results.record('ingestion.generate_fake_data', sum(written.values()) / elapsed, 'rows/s')
+
+            client = Client()
+            client.force_login(User.objects.create_superuser('benchmark', 'benchmark@example.com', 'x'))
+            if 'admin' in groups:
+                print("admin")
+                bench_admin(scale, results, client)
+            if 'storefront' in groups:
+                print("storefront")
+                bench_storefront(scale, results, client)
+            # last: it adds rows, and the other groups should see the same data whatever runs
+            if 'ingestion' in groups:
+                print("ingestion")
+                bench_ingestion(scale, results, seed)
+    return {'meta': meta, 'results': results}
+
+
+def compare(baseline, current, tolerance=TOLERANCE):
+    """Print current against baseline; returns the names of the regressed metrics."""
+    for key in COMPARABLE:
+        if baseline['meta'].get(key) != current['meta'].get(key):
+            print(f"warning: {key} differs: {baseline['meta'].get(key)!r} (baseline) vs "
+                  f"{current['meta'].get(key)!r}")
+
+    regressions = []
+    print(f"\n{'metric':<52}{'baseline':>14}{'current':>14}{'change':>9}")
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            print(f"{name:<52}{'-':>14}{result['value']:>14,.1f}{'new':>9}")
+            continue
+        change = result['value'] / old['value'] - 1 if old['value'] else 0.0
+        worse = -change if result['better'] == 'higher' else change
+        flag = ''
+        if worse > tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif -worse > tolerance:
+            flag = '  improved'
+        print(f"{name:<52}{old['value']:>14,.1f}{result['value']:>14,.1f}{change:>+9.0%}{flag}")
+    for name in sorted(baseline['results'].keys() - current['results'].keys()):
+        print(f"{name:<52}{'(not run)':>14}")
+
+    print(f"\n{len(regressions)} regression(s) beyond {tolerance:.0%}" if regressions
+          else f"\nno regressions beyond {tolerance:.0%}")
+    return regressions
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AnJuShop benchmark suite")
+    parser.add_argument('--only', nargs='+', choices=GROUPS, default=list(GROUPS),
+                        help="run only these groups")
+    parser.add_argument('--quick', action='store_true', help="smaller sizes (10k-row cleaning)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="where to write the results")
+    parser.add_argument('--baseline', help="results file to compare this run against")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="compare two results files without running anything")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="relative slowdown that counts as a regression (default 0.15)")
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = map(load, args.compare)
+    else:
+        baseline = load(args.baseline) if args.baseline else None
+        current = run(args.only, 'quick' if args.quick else 'full', args.seed)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nresults written to {args.output}")
+    if baseline is not None and compare(baseline, current, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
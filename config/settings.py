@@ -26,10 +26,18 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('SECRET_KEY')
 
+## settings profile: DJANGO_PROFILE=production turns off DEBUG and the debug
+## toolbar, keeps database connections open, caches templates and gzips responses
+DJANGO_PROFILE = os.getenv('DJANGO_PROFILE', 'development')
+if DJANGO_PROFILE not in ('development', 'production'):
+    raise ValueError(f"DJANGO_PROFILE must be 'development' or 'production', not {DJANGO_PROFILE!r}")
+PRODUCTION = DJANGO_PROFILE == 'production'
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not PRODUCTION
 
-ALLOWED_HOSTS = []
+# comma separated, e.g. ALLOWED_HOSTS=shop.example.com,www.shop.example.com
+ALLOWED_HOSTS = [host for host in os.getenv('ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -52,13 +60,16 @@ APPLICATIONS_APPS=[ 'pages.apps.PagesConfig','AnJuShop.apps.AnjushopConfig',]
 #pip install django-import-export
 # 'import_export',
 # pip install django-taggit
-THIRD_PARTY_APPS = ['debug_toolbar','taggit','import_export']
+THIRD_PARTY_APPS = ['taggit','import_export']
+if not PRODUCTION:
+    THIRD_PARTY_APPS.append('debug_toolbar')
 
 
 INSTALLED_APPS=DJAGNGO_APPS +APPLICATIONS_APPS+THIRD_PARTY_APPS
 
 
 DJANGO_MIDDLEWARE = [
+    'pages.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,9 +80,12 @@ DJANGO_MIDDLEWARE = [
 ]
 
 
-THIRD_PARTY_MIDDLEWARE = ['debug_toolbar.middleware.DebugToolbarMiddleware',]
+THIRD_PARTY_MIDDLEWARE = [] if PRODUCTION else ['debug_toolbar.middleware.DebugToolbarMiddleware',]
 
 MIDDLEWARE = DJANGO_MIDDLEWARE + THIRD_PARTY_MIDDLEWARE 
+if PRODUCTION:
+    # outermost, so it compresses what every other middleware produced
+    MIDDLEWARE.insert(0, 'django.middleware.gzip.GZipMiddleware')
 
 ROOT_URLCONF = 'config.urls'
 
@@ -85,10 +99,20 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'pages.context_processors.storefront',
             ],
         },
     },
 ]
+if PRODUCTION:
+    # compiled templates are kept for the life of the process (no reloading)
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
@@ -105,6 +129,9 @@ DATABASES = {
         'PASSWORD'  : os.getenv('PDB_PASSWORD'),
         'HOST'      : os.getenv('PDB_HOST'),
         'PORT'      : os.getenv('PDB_PORT'),
+        # production: reuse connections for PDB_CONN_MAX_AGE seconds, checked before reuse
+        'CONN_MAX_AGE'       : int(os.getenv('PDB_CONN_MAX_AGE', '600' if PRODUCTION else '0')),
+        'CONN_HEALTH_CHECKS' : PRODUCTION,
     },
 }
 
@@ -144,7 +171,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
-STATIC_ROOT=os.path.join(BASE_DIR,'static')
+STATIC_ROOT=os.getenv('STATIC_ROOT', os.path.join(BASE_DIR,'static'))
 STATIC_URL='static/'
 STATICFILES_DIRS=[
      os.path.join(BASE_DIR,'config/static')
@@ -153,6 +180,16 @@ STATICFILES_DIRS=[
 
 ]
 
+## with DEBUG off, collectstatic bundles, minifies, hashes and pre-compresses
+## the assets (pages.assets) and the app serves them from STATIC_ROOT
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': ('django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+                    else 'pages.assets.BundledStaticFilesStorage'),
+    },
+}
+
 
 
 # Default primary key field type
@@ -166,6 +203,31 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
 
+## cache for the storefront data and template fragments (5 minute TTL)
+## local memory by default: each worker process has its own copy, and a
+## Product change only invalidates the copy of the process that made it.
+## Set CACHE_DIR to share one file-based cache between the workers of a host.
+CACHE_DIR = os.getenv('CACHE_DIR')
+CACHES = {
+    'default': {
+        'BACKEND': ('django.core.cache.backends.filebased.FileBasedCache' if CACHE_DIR
+                    else 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': CACHE_DIR or 'anjushop',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+## optional full-page cache for the storefront views (pages.caching), 0 = off
+PAGES_CACHE_SECONDS = int(os.getenv('PAGES_CACHE_SECONDS', '0'))
+
+
+## request instrumentation (pages.instrumentation): log requests and queries
+## slower than these many milliseconds, 0 = never
+INSTRUMENTATION_SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '1000'))
+INSTRUMENTATION_SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))
+
+
 ## add a location for default data files
 DEFAULT_DATA_ROOT = os.path.join(BASE_DIR, 'default_data')
 
@@ -14,16 +14,35 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf.urls.static import static
 from django.conf import settings
-from debug_toolbar.toolbar import debug_toolbar_urls
+
+from pages.assets import serve_static
+from pages.instrumentation import stats_view
 
 urlpatterns = [
     path('',include('pages.urls',namespace='pages')),
+    # before admin.site.urls, whose catch-all view would take it
+    path('admin/instrumentation/', stats_view, name='instrumentation'),
     path('admin/', admin.site.urls),
-]+ static(settings.MEDIA_URL,document_root=settings.MEDIA_ROOT) + debug_toolbar_urls()
+    path('api/', include('AnJuShop.urls', namespace='api')),
+]+ static(settings.MEDIA_URL,document_root=settings.MEDIA_ROOT)
+
+# The debug toolbar is only installed in the development profile
+if 'debug_toolbar' in settings.INSTALLED_APPS:
+    from debug_toolbar.toolbar import debug_toolbar_urls
+    urlpatterns += debug_toolbar_urls()
+
+# Without DEBUG, runserver no longer serves static files: serve the collected,
+# hashed and pre-compressed ones (see pages.assets)
+if not settings.DEBUG:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static),
+    ]
 
 
 
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class PagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pages'
+
+    def ready(self):
+        from AnJuShop.models import Product
+        from . import instrumentation
+        from .storefront import invalidate_storefront
+
+        # Product changes alter the storefront data and its fragments. Orders
+        # do not invalidate it (they arrive all the time): the bestsellers and
+        # top categories catch up when the version expires (STOREFRONT_TIMEOUT)
+        post_save.connect(invalidate_storefront, sender=Product,
+                          dispatch_uid='storefront_Product_save')
+        post_delete.connect(invalidate_storefront, sender=Product,
+                            dispatch_uid='storefront_Product_delete')
+
+        instrumentation.install()
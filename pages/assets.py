@@ -0,0 +1,187 @@
+"""
+Static asset pipeline for the storefront templates.
+
+`collectstatic` with BundledStaticFilesStorage (the staticfiles storage
+when DEBUG is off):
+1. concatenates and minifies each BUNDLES entry from the collected files;
+2. gives every file a content-hashed name (ManifestStaticFilesStorage),
+   url() references in the CSS bundle included;
+3. writes .gz (and .br when the `brotli` package is installed) siblings of
+   the text files.
+
+serve_static() serves STATIC_ROOT with those siblings and a one-year
+immutable Cache-Control for hashed names. The {% bundle %} tag
+(pages/templatetags/assets.py) links one bundle instead of its source files.
+"""
+import gzip
+import logging
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:  # optional: JS sources are concatenated as they are
+    rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+
+# Source files in the order base.html used to load them
+BUNDLES = {
+    'css/site.css': ['css/all.css', 'css/bootstrap.css', 'css/lightbox.min.css', 'css/style.css'],
+    'js/site.js': ['js/jquery-3.3.1.min.js', 'js/bootstrap.bundle.min.js', 'js/lightbox.min.js',
+                   'js/main.js', 'modal.js'],
+}
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.xml', '.html', '.map', '.ttf', '.eot', '.ico')
+COMPRESS_MIN_SIZE = 512
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+MUTABLE_MAX_AGE = 60 * 60
+
+
+# ────────────────────────────────────────────────
+# Bundling / minifying
+# ────────────────────────────────────────────────
+
+SOURCE_MAP = re.compile(r'^\s*(?://[#@] sourceMappingURL=.*|/\*[#@] sourceMappingURL=.*?\*/)\s*$', re.M)
+CSS_STRING = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+CSS_TOKENS = re.compile(rf'({CSS_STRING})|/\*.*?\*/|\s+', re.S)
+CSS_STRINGS = re.compile(rf'({CSS_STRING})')
+CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(css):
+    """Drop comments and collapse whitespace; strings are left as they are."""
+    def token(match):
+        if match.group(1):
+            return match.group(1)
+        return '' if match.group(0).startswith('/*') else ' '
+
+    # Comments are gone now: odd pieces are strings, the rest is CSS
+    pieces = CSS_STRINGS.split(CSS_TOKENS.sub(token, css))
+    return ''.join(piece if n % 2 else CSS_PUNCTUATION.sub(r'\1', piece).replace(';}', '}')
+                   for n, piece in enumerate(pieces)).strip()
+
+
+def minify_js(js):
+    return rjsmin.jsmin(js) if rjsmin else js
+
+
+def build_bundle(name, read):
+    """Bundle `name` from its sources; read(path) returns a source file's text."""
+    sources = [SOURCE_MAP.sub('', read(path)) for path in BUNDLES[name]]
+    if name.endswith('.css'):
+        return '\n'.join(minify_css(source) for source in sources)
+    # ';' keeps a file without a trailing semicolon from running into the next
+    return '\n;'.join(minify_js(source).strip() for source in sources) + '\n'
+
+
+# ────────────────────────────────────────────────
+# collectstatic storage
+# ────────────────────────────────────────────────
+
+class BundledStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def url_converter(self, name, hashed_files, template=None):
+        convert = super().url_converter(name, hashed_files, template)
+
+        def converter(matchobj):
+            try:
+                return convert(matchobj)
+            except ValueError:
+                # e.g. lightbox.min.css points at ../images/loading.gif, which we do not ship
+                logger.warning("%s: leaving missing reference %s unchanged", name, matchobj[0])
+                return matchobj[0]
+        return converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in BUNDLES:
+            if self.exists(name):
+                self.delete(name)
+            self._save(name, ContentFile(build_bundle(name, self._read_text).encode()))
+            paths[name] = (self, name)
+            yield name, name, True
+
+        yield from super().post_process(paths, dry_run, **options)
+
+        for name in sorted(set(self.hashed_files.values())):
+            for compressed in self._compress(name):
+                yield name, compressed, True
+
+    def _read_text(self, name):
+        with self.open(name) as f:
+            return f.read().decode('utf-8')
+
+    def _compress(self, name):
+        if not name.endswith(COMPRESSIBLE) or not self.exists(name):
+            return
+        with self.open(name) as f:
+            data = f.read()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return
+        encoders = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            if len(compressed) < len(data):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+                yield name + suffix
+
+
+# ────────────────────────────────────────────────
+# Serving
+# ────────────────────────────────────────────────
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def serve_static(request, path):
+    """
+    Serve a collected static file, pre-compressed when the client accepts it.
+    Content-hashed names never change, so they are cached for a year.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404(path)
+    if not os.path.isfile(full_path):
+        raise Http404(path)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    accepted = {part.split(';')[0].strip()
+                for part in request.headers.get('Accept-Encoding', '').split(',')}
+    encoding = None
+    for name, suffix in ENCODINGS:
+        if name in accepted and os.path.isfile(full_path + suffix):
+            encoding, full_path = name, full_path + suffix
+            break
+
+    response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if HASHED_NAME.search(path):
+        response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = f'public, max-age={MUTABLE_MAX_AGE}'
+    return response
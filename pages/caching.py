@@ -0,0 +1,116 @@
+"""
+HTTP caching for the storefront views.
+
+storefront_page adds
+- conditional GET: ETag and Last-Modified come from the storefront version
+  token (the time of the last Product change or expiry, see pages.storefront),
+  so revisits get a 304 without rendering anything;
+- an optional full-response cache (settings.PAGES_CACHE_SECONDS, 0 = off)
+  keyed by URL, language and storefront version.
+Both decorators accept sync and async views. The cache is in-process
+(LocMem/FileBased), so async views read it synchronously as well.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from .storefront import storefront_version
+
+
+# Templates may change on deploy: pages are never older than the process
+STARTED_NS = time.time_ns()
+
+
+def _version(request):
+    # Read once per request: the ETag, Last-Modified and page cache key share it
+    if not hasattr(request, '_storefront_version'):
+        request._storefront_version = storefront_version()
+    return request._storefront_version
+
+
+def _changed_ns(request):
+    return max(int(_version(request)), STARTED_NS)
+
+
+def storefront_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(_changed_ns(request) // 1_000_000_000, tz=timezone.utc)
+
+
+def storefront_etag(request, *args, **kwargs):
+    return hashlib.md5(f'{_changed_ns(request)}:{get_language()}'.encode()).hexdigest()
+
+
+def _page_cache_key(request):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'storefront:page:{_version(request)}:{get_language()}:{url}'
+
+
+def _cacheable(request):
+    """Page cache key and lifetime, or (None, 0) when the page cache is off."""
+    seconds = getattr(settings, 'PAGES_CACHE_SECONDS', 0)
+    if not seconds or request.method not in ('GET', 'HEAD'):
+        return None, 0
+    return _page_cache_key(request), seconds
+
+
+def _store(key, response, seconds):
+    # Never share a response that sets cookies (session, CSRF)
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        cache.set(key, response, seconds)
+
+
+def full_page_cache(view):
+    """Cache whole GET/HEAD responses for settings.PAGES_CACHE_SECONDS."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapped(request, *args, **kwargs):
+            key, seconds = _cacheable(request)
+            response = cache.get(key) if key else None
+            if response is None:
+                response = await view(request, *args, **kwargs)
+                if key:
+                    _store(key, response, seconds)
+            return response
+        return async_wrapped
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        key, seconds = _cacheable(request)
+        response = cache.get(key) if key else None
+        if response is None:
+            response = view(request, *args, **kwargs)
+            if key:
+                _store(key, response, seconds)
+        return response
+    return wrapped
+
+
+def _revalidate(response):
+    # Browsers keep the page but check back with If-None-Match every time
+    patch_cache_control(response, max_age=0, must_revalidate=True)
+    return response
+
+
+def storefront_page(view):
+    """Conditional GET in front of the (optional) full-page cache; sync or async views."""
+    cached_view = condition(etag_func=storefront_etag,
+                            last_modified_func=storefront_last_modified)(full_page_cache(view))
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapped(request, *args, **kwargs):
+            return _revalidate(await cached_view(request, *args, **kwargs))
+        return async_wrapped
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        return _revalidate(cached_view(request, *args, **kwargs))
+    return wrapped
@@ -0,0 +1,16 @@
+from django.utils.functional import SimpleLazyObject
+
+from .storefront import get_storefront, storefront_version
+
+
+def storefront(request):
+    """
+    `storefront_version` (vary-on key for the {% cache %} fragments) and the
+    cached `storefront` data. Both are lazy: pages whose fragments are
+    already cached never touch them.
+    """
+    version = SimpleLazyObject(storefront_version)
+    return {
+        'storefront_version': version,
+        'storefront': SimpleLazyObject(lambda: get_storefront(str(version))),
+    }
@@ -0,0 +1,316 @@
+"""
+Per-request cost accounting that is cheap enough for production.
+
+InstrumentationMiddleware measures, for every request:
+- wall time of the view (and the middleware inside this one);
+- the number of database queries and the time spent in them;
+- template render time. This includes queries run lazily while rendering,
+  and nested {% include %}s are counted once.
+
+Queries are timed by a connection execute wrapper and templates by a
+wrapper around Template.render. Both are installed once by install(),
+called from PagesConfig.ready, and do nothing outside an instrumented
+request. The request's totals live in a ContextVar, which sync_to_async
+carries into the ORM's threads, so async views are covered too.
+
+A streamed response (StreamingHttpResponse: the admin exports, large API
+pages) is measured until its body has been sent: its content is wrapped so
+that the queries and templates run while it is read count for the request,
+and the totals are recorded when the iteration ends (or is abandoned). Its
+wall time therefore includes the time spent waiting on the client.
+
+Requests slower than settings.INSTRUMENTATION_SLOW_REQUEST_MS and queries
+slower than INSTRUMENTATION_SLOW_QUERY_MS (0 = never) are logged as
+warnings on the 'pages.instrumentation' logger. A slow query is logged with
+its SQL and the innermost call site in project code. For async code this is
+the innermost synchronous frame: the awaiting coroutine is not on the
+stack of the ORM's thread.
+
+Per view (URL name), the totals go into fixed-bucket histograms that
+stats_view serves as JSON to superusers at /admin/instrumentation/ (POST
+resets them). Like the LocMem cache, the histograms belong to one process:
+with several workers, each answers for itself (see "pid").
+"""
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.decorators import user_passes_test
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+MIDDLEWARE = 'pages.instrumentation.InstrumentationMiddleware'
+
+# upper bounds of the histogram buckets (the last bucket is everything above)
+MS_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+SLOW_QUERY_LOG_SIZE = 50
+SQL_LOG_LENGTH = 2000
+
+_current = ContextVar('instrumented_request', default=None)
+
+
+class RequestCost:
+    __slots__ = ('queries', 'db_seconds', 'template_seconds', 'rendering')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.rendering = False
+
+
+# ────────────────────────────────────────────────
+# Histograms
+# ────────────────────────────────────────────────
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def add(self, value):
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                break
+        else:
+            index = len(self.bounds)
+        self.counts[index] += 1
+        self.total += value
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding that fraction of the values (None above the last)."""
+        wanted = fraction * sum(self.counts)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= wanted:
+                return self.bounds[index] if index < len(self.bounds) else None
+        return None
+
+    def as_dict(self):
+        requests = sum(self.counts)
+        return {
+            'buckets': [*self.bounds, None],
+            'counts': self.counts,
+            'mean': self.total / requests if requests else None,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+        }
+
+
+METRICS = {
+    'wall_ms': MS_BUCKETS,
+    'db_ms': MS_BUCKETS,
+    'template_ms': MS_BUCKETS,
+    'queries': QUERY_BUCKETS,
+}
+
+_lock = threading.Lock()
+_views = {}
+_slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+
+def record(view, values):
+    with _lock:
+        histograms = _views.get(view)
+        if histograms is None:
+            histograms = _views[view] = {name: Histogram(bounds) for name, bounds in METRICS.items()}
+        for name, value in values.items():
+            histograms[name].add(value)
+
+
+def snapshot():
+    with _lock:
+        return {
+            'pid': os.getpid(),
+            'views': {view: {'requests': sum(histograms['wall_ms'].counts),
+                             **{name: histogram.as_dict() for name, histogram in histograms.items()}}
+                      for view, histograms in sorted(_views.items())},
+            'slow_queries': list(_slow_queries),
+        }
+
+
+def reset():
+    with _lock:
+        _views.clear()
+        _slow_queries.clear()
+
+
+# ────────────────────────────────────────────────
+# Query and template timing
+# ────────────────────────────────────────────────
+
+def call_site():
+    """'path:line in function' of the innermost frame in project code."""
+    root = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(root) and frame.filename != __file__:
+            return f'{os.path.relpath(frame.filename, root)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def time_query(execute, sql, params, many, context):
+    cost = _current.get()
+    if cost is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        cost.queries += 1
+        cost.db_seconds += elapsed
+        threshold = settings.INSTRUMENTATION_SLOW_QUERY_MS
+        if threshold and elapsed * 1000 >= threshold:
+            where = call_site()
+            _slow_queries.append({'ms': round(elapsed * 1000, 1), 'sql': sql[:SQL_LOG_LENGTH],
+                                  'call_site': where, 'at': time.time()})
+            logger.warning("slow query (%.0f ms) at %s: %s", elapsed * 1000, where,
+                           sql[:SQL_LOG_LENGTH])
+
+
+def _add_query_timer(sender, connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def _timed_render(render):
+    @wraps(render)
+    def timed(self, context):
+        cost = _current.get()
+        if cost is None or cost.rendering:
+            return render(self, context)
+        cost.rendering = True
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            cost.template_seconds += time.perf_counter() - started
+            cost.rendering = False
+    timed.instrumented = True
+    return timed
+
+
+def install():
+    """Hook the query and template timers (once; a no-op without the middleware)."""
+    if MIDDLEWARE not in settings.MIDDLEWARE:
+        return
+    connection_created.connect(_add_query_timer, dispatch_uid='instrumentation_query_timer')
+    if not getattr(Template.render, 'instrumented', False):
+        Template.render = _timed_render(Template.render)
+
+
+# ────────────────────────────────────────────────
+# Middleware and endpoint
+# ────────────────────────────────────────────────
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        cost = RequestCost()
+        token = _current.set(cost)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.measured(request, response, cost, started)
+
+    async def __acall__(self, request):
+        cost = RequestCost()
+        token = _current.set(cost)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.measured(request, response, cost, started)
+
+    def measured(self, request, response, cost, started):
+        """Record the request now, or for a streamed response once its body has been read."""
+        def finish():
+            self.finish(request, cost, time.perf_counter() - started)
+
+        if not response.streaming:
+            finish()
+        elif response.is_async:
+            response.streaming_content = _ameasured_stream(response.streaming_content, cost, finish)
+        else:
+            response.streaming_content = _measured_stream(response.streaming_content, cost, finish)
+        return response
+
+    def finish(self, request, cost, elapsed):
+        match = request.resolver_match
+        view = match.view_name if match else '(unresolved)'
+        record(view, {'wall_ms': elapsed * 1000, 'db_ms': cost.db_seconds * 1000,
+                      'template_ms': cost.template_seconds * 1000, 'queries': cost.queries})
+        threshold = settings.INSTRUMENTATION_SLOW_REQUEST_MS
+        if threshold and elapsed * 1000 >= threshold:
+            logger.warning("slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, templates %.0f ms",
+                           request.method, request.path, view, elapsed * 1000, cost.queries,
+                           cost.db_seconds * 1000, cost.template_seconds * 1000)
+
+
+# The request's totals are current only while each chunk is produced: the
+# server reads the body outside the middleware, possibly in another context.
+
+def _measured_stream(content, cost, finish):
+    iterator = iter(content)
+    try:
+        while True:
+            token = _current.set(cost)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                _current.reset(token)
+            yield chunk
+    finally:
+        finish()
+
+
+async def _ameasured_stream(content, cost, finish):
+    iterator = aiter(content)
+    try:
+        while True:
+            token = _current.set(cost)
+            try:
+                chunk = await anext(iterator)
+            except StopAsyncIteration:
+                break
+            finally:
+                _current.reset(token)
+            yield chunk
+    finally:
+        finish()
+
+
+@user_passes_test(lambda user: user.is_active and user.is_superuser, login_url='admin:login')
+def stats_view(request):
+    """The histograms and recent slow queries as JSON; POST clears them."""
+    if request.method == 'POST':
+        reset()
+    return JsonResponse(snapshot())
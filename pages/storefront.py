@@ -0,0 +1,100 @@
+"""
+Storefront data (featured products, top categories, bestsellers) for the
+index page and the navbar.
+
+Everything is built with a few queries and cached as plain dicts/lists. The
+cache keys and the template fragment keys include a version token that is
+replaced whenever a Product is saved or deleted, so product edits show up at
+once. The token itself expires after STOREFRONT_TIMEOUT: orders (and bulk
+loads, which send no signals) reach the bestsellers and top categories then,
+so a steady stream of orders does not keep the cache cold.
+"""
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from AnJuShop.models import DailySales, Order, Product
+from AnJuShop.rollups import summarize
+
+
+STOREFRONT_TIMEOUT = 300
+VERSION_KEY = 'storefront:version'
+
+FEATURED_COUNT = 8
+BESTSELLER_COUNT = 8
+CATEGORY_COUNT = 6
+BESTSELLER_DAYS = 30
+
+
+def storefront_version():
+    """Current version token (part of every storefront cache key)."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), STOREFRONT_TIMEOUT)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_storefront(**kwargs):
+    cache.set(VERSION_KEY, time.time_ns(), STOREFRONT_TIMEOUT)
+
+
+def storefront_queries():
+    since = timezone.localdate() - timedelta(days=BESTSELLER_DAYS)
+    return {
+        'featured': Product.objects.order_by('-id')
+                    .values('id', 'name', 'category', 'price')[:FEATURED_COUNT],
+        'bestsellers': Order.objects.filter(order_date__gte=since)
+                       .values('product_id', 'product__name', 'product__category', 'product__price')
+                       .annotate(sold=Sum('quantity'))
+                       .order_by('-sold', 'product_id')[:BESTSELLER_COUNT],
+        # Category revenue comes from the daily rollup, not from the orders
+        'top_categories': summarize(DailySales.objects.filter(date__gte=since), 'category')
+                          .order_by('-total_revenue')[:CATEGORY_COUNT],
+    }
+
+
+def _storefront(featured, bestsellers, top_categories):
+    return {
+        'featured': featured,
+        'bestsellers': [{'id': row['product_id'], 'name': row['product__name'],
+                         'category': row['product__category'], 'price': row['product__price'],
+                         'sold': row['sold']} for row in bestsellers],
+        'top_categories': top_categories,
+    }
+
+
+def build_storefront():
+    return _storefront(**{name: list(queryset) for name, queryset in storefront_queries().items()})
+
+
+async def abuild_storefront():
+    rows = {}
+    for name, queryset in storefront_queries().items():
+        rows[name] = [row async for row in queryset]
+    return _storefront(**rows)
+
+
+def get_storefront(version=None):
+    key = f'storefront:{version or storefront_version()}'
+    data = cache.get(key)
+    if data is None:
+        data = build_storefront()
+        cache.set(key, data, STOREFRONT_TIMEOUT)
+    return data
+
+
+async def aget_storefront(version=None):
+    """
+    get_storefront() for async views: the queries go through the async ORM.
+    The cache is read synchronously, it is in-process (LocMem/FileBased).
+    """
+    key = f'storefront:{version or storefront_version()}'
+    data = cache.get(key)
+    if data is None:
+        data = await abuild_storefront()
+        cache.set(key, data, STOREFRONT_TIMEOUT)
+    return data
@@ -0,0 +1,24 @@
+from django import template
+from django.core.files.storage import storages
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from pages.assets import BUNDLES, BundledStaticFilesStorage
+
+register = template.Library()
+
+
+def bundles_enabled():
+    # Bundles only exist after collectstatic with the bundling storage
+    return isinstance(storages['staticfiles'], BundledStaticFilesStorage)
+
+
+@register.simple_tag
+def bundle(name):
+    """
+    <link>/<script> tag(s) for a BUNDLES entry: the hashed bundle when it is
+    built, its source files otherwise (DEBUG / runserver).
+    """
+    paths = [name] if bundles_enabled() else BUNDLES[name]
+    tag = '<link rel="stylesheet" href="{}">' if name.endswith('.css') else '<script src="{}"></script>'
+    return format_html_join('\n', tag, ((static(path),) for path in paths))
@@ -1,3 +1,214 @@
-from django.test import TestCase
+import os
+import re
+import runpy
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.conf import settings
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from AnJuShop.api import PAGE_LIMIT
+from AnJuShop.models import Customer, Order, Product
+
+from . import instrumentation, storefront
+from .assets import minify_css, serve_static
 
 # Create your tests here.
+
+
+class StorefrontCacheTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_index_is_served_from_cache_until_products_change(self):
+        customer = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        tea = Product.objects.create(name="Green Tea", category="Food", price=Decimal('2.50'))
+        Order.objects.create(customer=customer, product=tea, quantity=3, order_date=date.today())
+
+        response = self.client.get(reverse('pages:index'))
+        self.assertContains(response, "Green Tea")
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('pages:index'))
+
+        Product.objects.create(name="Oolong", category="Food", price=Decimal('4.00'))
+        self.assertContains(self.client.get(reverse('pages:index')), "Oolong")
+
+    def test_orders_wait_for_the_version_to_expire(self):
+        customer = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        tea = Product.objects.create(name="Green Tea", category="Food", price=Decimal('2.50'))
+        self.assertNotContains(self.client.get(reverse('pages:index')), "3 sold")
+
+        Order.objects.create(customer=customer, product=tea, quantity=3, order_date=date.today())
+        with self.assertNumQueries(0):
+            self.assertNotContains(self.client.get(reverse('pages:index')), "3 sold")
+
+        cache.delete(storefront.VERSION_KEY)  # what STOREFRONT_TIMEOUT does
+        self.assertContains(self.client.get(reverse('pages:index')), "3 sold")
+
+
+class ConditionalGetTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_revisit_gets_304_until_a_product_changes(self):
+        first = self.client.get(reverse('pages:index'))
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.has_header('Last-Modified'))
+        self.assertIn('must-revalidate', first['Cache-Control'])
+
+        revisit = self.client.get(reverse('pages:index'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(revisit.status_code, 304)
+        self.assertEqual(revisit.content, b'')
+
+        Product.objects.create(name="Oolong", category="Food", price=Decimal('4.00'))
+        changed = self.client.get(reverse('pages:index'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    @override_settings(PAGES_CACHE_SECONDS=60)
+    def test_full_page_cache(self):
+        self.client.get(reverse('pages:index'))
+        with self.assertTemplateNotUsed('pages/index.html'):
+            response = self.client.get(reverse('pages:index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "showcase")
+
+
+class AssetPipelineTest(TestCase):
+
+    def test_minify_css_keeps_strings(self):
+        self.assertEqual(minify_css('/* x */ a , b > c {\n  content: "a  ;}" ;\n  color: red ;\n}'),
+                         'a,b>c{content: "a  ;}";color: red}')
+
+    def test_collectstatic_builds_hashed_compressed_bundles(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        storages_setting = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'pages.assets.BundledStaticFilesStorage'},
+        }
+        with override_settings(STATIC_ROOT=static_root, STORAGES=storages_setting):
+            with self.assertLogs('pages.assets', 'WARNING'):  # references to files we do not ship
+                call_command('collectstatic', interactive=False, verbosity=0)
+
+            html = self.client.get(reverse('pages:index')).content.decode()
+            bundle = re.search(r'href="/static/(css/site\.[0-9a-f]{12}\.css)"', html).group(1)
+            self.assertNotIn('bootstrap.css', html)
+            self.assertTrue(os.path.exists(os.path.join(static_root, bundle + '.gz')))
+
+            response = serve_static(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip'), bundle)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Content-Type'], 'text/css')
+            self.assertIn('immutable', response['Cache-Control'])
+            response.close()
+
+
+class StorefrontSearchTest(TestCase):
+
+    def test_search_page_finds_products_by_prefix(self):
+        Product.objects.create(name="Green Tea", category="Food", price=Decimal('2.50'))
+        Product.objects.create(name="Teapot", category="Home", price=Decimal('30.00'))
+        Product.objects.create(name="Coffee", category="Food", price=Decimal('8.00'))
+
+        response = self.client.get(reverse('pages:search'), {'q': 'tea'})
+        self.assertCountEqual([product.name for product in response.context['products']],
+                              ["Green Tea", "Teapot"])
+        self.assertNotContains(response, "Coffee")
+
+
+class InstrumentationTest(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.reset()
+        self.addCleanup(instrumentation.reset)
+
+    def test_histograms_per_view_for_superusers_only(self):
+        Product.objects.create(name="Green Tea", category="Food", price=Decimal('2.50'))
+        self.client.get(reverse('pages:index'))
+        self.client.get(reverse('pages:search'), {'q': 'tea'})
+
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(reverse('instrumentation')).status_code, 302)
+
+        self.client.force_login(User.objects.create_superuser('admin', password='x'))
+        stats = self.client.get(reverse('instrumentation')).json()
+        index = stats['views']['pages:index']
+        self.assertEqual(index['requests'], 1)
+        self.assertGreater(index['queries']['mean'], 0)
+        self.assertGreater(index['template_ms']['mean'], 0)
+        self.assertEqual(sum(stats['views']['pages:search']['wall_ms']['counts']), 1)
+
+        self.client.post(reverse('instrumentation'))
+        self.assertNotIn('pages:index', self.client.get(reverse('instrumentation')).json()['views'])
+
+    @override_settings(INSTRUMENTATION_SLOW_QUERY_MS=1e-6, INSTRUMENTATION_SLOW_REQUEST_MS=1e-6)
+    def test_slow_requests_and_queries_are_logged_with_call_site(self):
+        with self.assertLogs('pages.instrumentation', 'WARNING') as logs:
+            self.client.get(reverse('pages:search'), {'q': 'tea'})
+        self.assertTrue(any('slow request GET /search/ (pages:search)' in line for line in logs.output))
+        self.assertTrue(any('slow query' in line and 'AnJuShop/search.py' in line for line in logs.output))
+        self.assertTrue(instrumentation.snapshot()['slow_queries'])
+
+    def test_streamed_responses_are_recorded_when_the_body_is_read(self):
+        Product.objects.bulk_create(Product(name=f"Tea {n}", category="Food", price=Decimal('2.50'))
+                                    for n in range(PAGE_LIMIT + 1))
+        customer = Customer.objects.create(name="Alice", email="alice@example.com", city="Paris")
+        self.client.force_login(User.objects.create_superuser('admin', password='x'))
+        requests = {
+            'api:product_list': reverse('api:product_list') + f'?limit={PAGE_LIMIT + 1}',
+            'admin:AnJuShop_customer_stream_export':
+                reverse('admin:AnJuShop_customer_stream_export', args=['csv']),
+        }
+        for view, url in requests.items():
+            with self.subTest(view=view):
+                response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                self.assertNotIn(view, instrumentation.snapshot()['views'])
+                body = b''.join(response.streaming_content)
+                self.assertIn(customer.email.encode() if 'export' in view else b'Tea 500', body)
+                stats = instrumentation.snapshot()['views'][view]
+                self.assertEqual(stats['requests'], 1)
+                self.assertGreater(stats['queries']['mean'], 0)
+
+
+class SettingsProfileTest(SimpleTestCase):
+
+    def load_settings(self, profile):
+        with mock.patch.dict(os.environ, {'DJANGO_PROFILE': profile}):
+            return runpy.run_path(os.path.join(settings.BASE_DIR, 'config', 'settings.py'))
+
+    def test_production_profile(self):
+        production = self.load_settings('production')
+        self.assertFalse(production['DEBUG'])
+        self.assertNotIn('debug_toolbar', production['INSTALLED_APPS'])
+        self.assertFalse([name for name in production['MIDDLEWARE'] if 'debug_toolbar' in name])
+        self.assertEqual(production['MIDDLEWARE'][0], 'django.middleware.gzip.GZipMiddleware')
+        templates = production['TEMPLATES'][0]
+        self.assertFalse(templates['APP_DIRS'])
+        self.assertEqual(templates['OPTIONS']['loaders'][0][0], 'django.template.loaders.cached.Loader')
+        self.assertGreater(production['DATABASES']['default']['CONN_MAX_AGE'], 0)
+        self.assertTrue(production['DATABASES']['default']['CONN_HEALTH_CHECKS'])
+
+    def test_development_profile(self):
+        development = self.load_settings('development')
+        self.assertTrue(development['DEBUG'])
+        self.assertIn('debug_toolbar', development['INSTALLED_APPS'])
+        self.assertNotIn('django.middleware.gzip.GZipMiddleware', development['MIDDLEWARE'])
+        self.assertNotIn('loaders', development['TEMPLATES'][0]['OPTIONS'])
+
+        with self.assertRaisesMessage(ValueError, 'DJANGO_PROFILE'):
+            self.load_settings('staging')
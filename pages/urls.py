@@ -11,6 +11,7 @@ app_name = 'pages'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('search/', views.search, name='search'),
     #path('about', views.about, name='about')
 ]
 
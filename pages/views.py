@@ -1,11 +1,24 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 
+from AnJuShop import search as product_search
+from AnJuShop.models import Product
+
+from .caching import storefront_page
+from .storefront import aget_storefront
+
 # Create your views here.
 
 
 
-def index (request):
-    return render(request, 'pages/index.html')
+@storefront_page
+async def index (request):
+    # Products, categories and bestsellers come from the cached storefront
+    # data (pages.storefront), loaded here through the async ORM so that
+    # rendering runs no queries. Under ASGI the page then needs no thread:
+    # keep request.user and the session out of these templates.
+    storefront = await aget_storefront()
+    return render(request, 'pages/index.html', {'storefront': storefront})
     # For multitables for mulit databse 
     
     
@@ -20,4 +33,18 @@ def about (request):
     #print(request,request.path)
     context={"doctors":doctors,"mvp_doctors":mvp_doctors}
     return render(request,'pages/about.html',context)
-'''
\ No newline at end of file
+'''
+
+
+SEARCH_RESULTS = 24
+
+
+async def search(request):
+    # Ranked full-text matches (AnJuShop.search); the raw SQL runs in a thread
+    query = request.GET.get('q', '').strip()
+    products = []
+    if query:
+        products = await sync_to_async(product_search.ranked)(Product, query, SEARCH_RESULTS)
+    storefront = await aget_storefront()
+    return render(request, 'pages/search.html',
+                  {'storefront': storefront, 'query': query, 'products': products})